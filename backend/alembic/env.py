@@ -10,13 +10,21 @@ from app.core.config import settings
 from app.core.database import Base
 from app.models import (  # noqa: F401 - Import all models for metadata
     Analysis,
+    CellDataset,
     Compound,
+    DoseResponseCurve,
     Experiment,
+    Feature,
     Image,
+    Job,
     Plate,
+    PlateFeature,
     Project,
+    Upload,
+    UploadPart,
     User,
     Well,
+    WellAggregate,
 )
 
 config = context.config
@@ -0,0 +1,53 @@
+"""screening_hierarchy_indexes
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "002"
+down_revision: str | None = "001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Foreign keys used as list filters and relationship loads
+    op.create_index("ix_projects_owner_id", "projects", ["owner_id"])
+    op.create_index("ix_experiments_project_id", "experiments", ["project_id"])
+    op.create_index("ix_plates_experiment_id", "plates", ["experiment_id"])
+    op.create_index("ix_wells_compound_id", "wells", ["compound_id"])
+
+    # Composite indexes whose leading column also serves the plain FK lookups
+    op.create_index(
+        "ix_wells_plate_id_row_column",
+        "wells",
+        ["plate_id", "row", "column"],
+        unique=True,
+    )
+    op.create_index(
+        "ix_images_well_id_channel_index_field_index",
+        "images",
+        ["well_id", "channel_index", "field_index"],
+    )
+    op.create_index(
+        "ix_analyses_well_id_analysis_type",
+        "analyses",
+        ["well_id", "analysis_type"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_analyses_well_id_analysis_type", "analyses")
+    op.drop_index("ix_images_well_id_channel_index_field_index", "images")
+    op.drop_index("ix_wells_plate_id_row_column", "wells")
+    op.drop_index("ix_wells_compound_id", "wells")
+    op.drop_index("ix_plates_experiment_id", "plates")
+    op.drop_index("ix_experiments_project_id", "experiments")
+    op.drop_index("ix_projects_owner_id", "projects")
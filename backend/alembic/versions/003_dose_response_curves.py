@@ -0,0 +1,55 @@
+"""dose_response_curves
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "003"
+down_revision: str | None = "002"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dose_response_curves",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("analysis_type", sa.String(100), nullable=False),
+        sa.Column("metric", sa.String(50), nullable=False),
+        sa.Column("n_points", sa.Integer(), nullable=False),
+        sa.Column("converged", sa.Boolean(), nullable=False),
+        sa.Column("bottom", sa.Float(), nullable=True),
+        sa.Column("top", sa.Float(), nullable=True),
+        sa.Column("ec50", sa.Float(), nullable=True),
+        sa.Column("hill_slope", sa.Float(), nullable=True),
+        sa.Column("r_squared", sa.Float(), nullable=True),
+        sa.Column("experiment_id", sa.UUID(), nullable=False),
+        sa.Column("compound_id", sa.UUID(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["experiment_id"], ["experiments.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["compound_id"], ["compounds.id"], ondelete="CASCADE"),
+        # Leading experiment_id also serves lookups of an experiment's curves
+        sa.UniqueConstraint(
+            "experiment_id",
+            "compound_id",
+            "analysis_type",
+            name="uq_dose_response_curves_experiment_compound_type",
+        ),
+    )
+    op.create_index("ix_dose_response_curves_compound_id", "dose_response_curves", ["compound_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_dose_response_curves_compound_id", "dose_response_curves")
+    op.drop_table("dose_response_curves")
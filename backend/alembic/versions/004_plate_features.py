@@ -0,0 +1,49 @@
+"""features and plate_features
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "004"
+down_revision: str | None = "003"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "features",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.create_table(
+        "plate_features",
+        sa.Column("plate_id", sa.UUID(), nullable=False),
+        sa.Column("feature_id", sa.Integer(), nullable=False),
+        # rows * columns little-endian float32 values in row-major well order
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("plate_id", "feature_id"),
+        sa.ForeignKeyConstraint(["plate_id"], ["plates.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["feature_id"], ["features.id"], ondelete="CASCADE"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("plate_features")
+    op.drop_table("features")
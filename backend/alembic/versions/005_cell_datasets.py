@@ -0,0 +1,43 @@
+"""cell_datasets
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "005"
+down_revision: str | None = "004"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cell_datasets",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("analysis_type", sa.String(100), nullable=True),
+        sa.Column("storage_key", sa.String(500), nullable=False),
+        sa.Column("cell_count", sa.BigInteger(), nullable=False),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("features", sa.JSON(), nullable=False),
+        sa.Column("plate_id", sa.UUID(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["plate_id"], ["plates.id"], ondelete="CASCADE"),
+        # Leading plate_id also serves listing a plate's datasets
+        sa.UniqueConstraint("plate_id", "name", name="uq_cell_datasets_plate_name"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("cell_datasets")
@@ -0,0 +1,66 @@
+"""well_aggregates
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "006"
+down_revision: str | None = "005"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+METRICS = (
+    "cell_count",
+    "mean_intensity",
+    "median_intensity",
+    "std_intensity",
+    "z_score",
+    "percent_effect",
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "well_aggregates",
+        sa.Column("well_id", sa.UUID(), nullable=False),
+        sa.Column("analysis_type", sa.String(100), nullable=False),
+        sa.Column("plate_id", sa.UUID(), nullable=False),
+        sa.Column("analysis_count", sa.Integer(), nullable=False),
+        *(sa.Column(metric, sa.Float(), nullable=True) for metric in METRICS),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("well_id", "analysis_type"),
+        sa.ForeignKeyConstraint(["well_id"], ["wells.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["plate_id"], ["plates.id"], ondelete="CASCADE"),
+    )
+    op.create_index(
+        "ix_well_aggregates_plate_id_analysis_type",
+        "well_aggregates",
+        ["plate_id", "analysis_type"],
+    )
+
+    # Aggregate the analyses stored so far
+    metrics = ", ".join(METRICS)
+    averages = ", ".join(f"avg(a.{metric})" for metric in METRICS)
+    op.execute(
+        f"""
+        INSERT INTO well_aggregates (well_id, analysis_type, plate_id, analysis_count, {metrics})
+        SELECT a.well_id, a.analysis_type, w.plate_id, count(*), {averages}
+        FROM analyses a JOIN wells w ON w.id = a.well_id
+        GROUP BY a.well_id, a.analysis_type, w.plate_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_well_aggregates_plate_id_analysis_type", table_name="well_aggregates")
+    op.drop_table("well_aggregates")
@@ -0,0 +1,37 @@
+"""well positions on well_aggregates
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "007"
+down_revision: str | None = "006"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("well_aggregates", sa.Column("row", sa.Integer(), nullable=True))
+    op.add_column("well_aggregates", sa.Column("column", sa.Integer(), nullable=True))
+    op.execute(
+        """
+        UPDATE well_aggregates g SET row = w.row, "column" = w."column"
+        FROM wells w WHERE w.id = g.well_id
+        """
+    )
+    op.alter_column("well_aggregates", "row", nullable=False)
+    op.alter_column("well_aggregates", "column", nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column("well_aggregates", "column")
+    op.drop_column("well_aggregates", "row")
@@ -0,0 +1,27 @@
+"""tile_levels on images
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "008"
+down_revision: str | None = "007"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("images", sa.Column("tile_levels", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("images", "tile_levels")
@@ -0,0 +1,38 @@
+"""job experiments
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "011"
+down_revision: str | None = "010"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("experiment_id", sa.UUID(), nullable=True))
+    op.create_foreign_key(
+        "jobs_experiment_id_fkey",
+        "jobs",
+        "experiments",
+        ["experiment_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+    op.create_index("ix_jobs_experiment_id", "jobs", ["experiment_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_experiment_id", table_name="jobs")
+    op.drop_constraint("jobs_experiment_id_fkey", "jobs", type_="foreignkey")
+    op.drop_column("jobs", "experiment_id")
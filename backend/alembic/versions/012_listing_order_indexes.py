@@ -0,0 +1,52 @@
+"""listing_order_indexes
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "012"
+down_revision: str | None = "011"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Listings are ordered by (created_at, id), optionally filtered by one foreign key
+# (see app.api.pagination); these indexes serve each page without a sort
+INDEXES = [
+    ("projects", []),
+    ("experiments", ["project_id"]),
+    ("plates", ["experiment_id"]),
+    ("wells", ["plate_id"]),
+    ("images", ["well_id"]),
+    ("analyses", ["well_id"]),
+    ("compounds", []),
+    ("jobs", ["experiment_id"]),
+]
+
+
+def upgrade() -> None:
+    for table, foreign_keys in INDEXES:
+        op.create_index(f"ix_{table}_created_at_id", table, ["created_at", "id"])
+        for column in foreign_keys:
+            op.create_index(
+                f"ix_{table}_{column}_created_at_id", table, [column, "created_at", "id"]
+            )
+    op.create_index(
+        "ix_dose_response_curves_experiment_id_created_at_id",
+        "dose_response_curves",
+        ["experiment_id", "created_at", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_dose_response_curves_experiment_id_created_at_id", "dose_response_curves")
+    for table, foreign_keys in reversed(INDEXES):
+        for column in foreign_keys:
+            op.drop_index(f"ix_{table}_{column}_created_at_id", table)
+        op.drop_index(f"ix_{table}_created_at_id", table)
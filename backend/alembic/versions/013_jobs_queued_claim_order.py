@@ -0,0 +1,40 @@
+"""jobs_queued_claim_order
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "013"
+down_revision: str | None = "012"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Match the claim's ORDER BY priority DESC, run_at, id so it reads the index in order
+    op.drop_index("ix_jobs_queued", "jobs")
+    op.create_index(
+        "ix_jobs_queued",
+        "jobs",
+        [sa.text("priority DESC"), "run_at", "id"],
+        postgresql_where=sa.text("status = 'queued'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_queued", "jobs")
+    op.create_index(
+        "ix_jobs_queued",
+        "jobs",
+        ["priority", "run_at"],
+        postgresql_where=sa.text("status = 'queued'"),
+    )
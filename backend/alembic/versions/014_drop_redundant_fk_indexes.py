@@ -0,0 +1,35 @@
+"""drop_redundant_fk_indexes
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-18
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "014"
+down_revision: str | None = "013"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Single-column foreign key indexes that lead a listing-order index from 012
+# (ix_<table>_<column>_created_at_id), which serves the same lookups
+INDEXES = [
+    ("experiments", "project_id"),
+    ("plates", "experiment_id"),
+    ("jobs", "experiment_id"),
+]
+
+
+def upgrade() -> None:
+    for table, column in INDEXES:
+        op.drop_index(f"ix_{table}_{column}", table)
+
+
+def downgrade() -> None:
+    for table, column in reversed(INDEXES):
+        op.create_index(f"ix_{table}_{column}", table, [column])
@@ -1,20 +1,34 @@
-from collections.abc import AsyncGenerator
-from typing import Annotated
+from collections.abc import AsyncGenerator, Callable, Collection
+from typing import Annotated, Any
+from uuid import UUID
 
-from fastapi import Depends, HTTPException, Query, status
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.core.database import async_session_maker
-from app.core.security import decode_access_token
+from sqlalchemy import Connection, event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Mapper, ORMExecuteState, Session, object_session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import async_read_session_maker, async_session_maker
+from app.core.response_cache import invalidate_committed
+from app.core.security import decode_access_token_claims
 from app.models.user import User
 from app.schemas.pagination import PaginationParams
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login/form")
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+# Methods served from the read replica without a commit
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Request session: read-only for safe methods, committed at the end otherwise."""
+    if request.method in READ_METHODS:
+        async with async_read_session_maker() as session:
+            yield session
+        return
     async with async_session_maker() as session:
         try:
             yield session
@@ -22,37 +36,143 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         except Exception:
             await session.rollback()
             raise
+        await invalidate_committed(session)
+
+
+def get_session_maker() -> async_sessionmaker[AsyncSession]:
+    """Session factory for endpoints that open short sessions of their own."""
+    return async_session_maker
 
 
 def get_pagination(
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(
+        default=None,
+        description="Opaque next_cursor from a previous page; switches to keyset pagination",
+    ),
+    with_total: bool = Query(default=True, description="Include the total item count"),
+    estimate_total: bool = Query(
+        default=False,
+        description="Estimate the total of unfiltered listings from table statistics",
+    ),
 ) -> PaginationParams:
-    return PaginationParams(page=page, page_size=page_size)
+    params = PaginationParams(
+        page=page,
+        page_size=page_size,
+        cursor=cursor,
+        with_total=with_total,
+        estimate_total=estimate_total,
+    )
+    try:
+        params.after  # noqa: B018 - validate the cursor up front
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        ) from exc
+    return params
+
+
+def include_param(allowed: Collection[str]) -> Callable[[str | None], frozenset[str]]:
+    """Build a dependency parsing a comma-separated ``include`` query parameter."""
+
+    def get_include(
+        include: str | None = Query(
+            default=None,
+            description=f"Comma-separated relations to expand: {', '.join(sorted(allowed))}",
+        ),
+    ) -> frozenset[str]:
+        if not include:
+            return frozenset()
+        requested = frozenset(part.strip() for part in include.split(",") if part.strip())
+        unknown = requested - set(allowed)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown include: {', '.join(sorted(unknown))}",
+            )
+        return requested
+
+    return get_include
 
 
 DbSession = AsyncSession
 
 
+# Column values of active users by id, so authenticated requests skip the users lookup
+user_cache: TTLCache[str, dict[str, Any]] = TTLCache(
+    maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl_seconds
+)
+USER_COLUMNS = tuple(attr.key for attr in User.__mapper__.column_attrs)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _forget_changed_user(mapper: Mapper[User], connection: Connection, target: User) -> None:
+    user_id = str(target.id)
+    user_cache.pop(user_id)
+    # Forget it again on commit, in case a concurrent request re-cached the old row
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_users", set()).add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_committed_users(session: Session) -> None:
+    for user_id in session.info.pop("changed_users", ()):
+        user_cache.pop(user_id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _forget_bulk_changed_users(state: ORMExecuteState) -> None:
+    if (state.is_update or state.is_delete) and state.bind_mapper is User.__mapper__:
+        user_cache.clear()
+
+
 async def get_current_user(
     db: Annotated[AsyncSession, Depends(get_db)],
     token: Annotated[str, Depends(oauth2_scheme)],
 ) -> User:
-    """Get the current authenticated user from the JWT token."""
+    """Get the current authenticated user from the JWT token.
+
+    Active users are served from ``user_cache``. With
+    ``settings.auth_trust_token_claims`` the signed claims of short-lived
+    tokens are used instead, and the returned user only carries ``id``,
+    ``is_active`` and ``is_superuser``.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    user_id = decode_access_token(token)
-    if user_id is None:
+    claims = decode_access_token_claims(token)
+    user_id = claims.get("sub") if claims else None
+    if claims is None or user_id is None:
         raise credentials_exception
+    try:
+        user_uuid = UUID(user_id)
+    except ValueError as exc:
+        raise credentials_exception from exc
+
+    cached = user_cache.get(user_id)
+    if settings.auth_trust_token_claims and "active" in claims:
+        user = User(
+            id=user_uuid,
+            is_active=bool(claims["active"]),
+            is_superuser=bool(claims.get("superuser", False)),
+        )
+    elif cached is not None:
+        user = User(**cached)
+    else:
+        result = await db.execute(select(User).where(User.id == user_uuid))
+        found = result.scalar_one_or_none()
+        if found is None:
+            raise credentials_exception
+        if found.is_active:
+            user_cache.set(user_id, {key: getattr(found, key) for key in USER_COLUMNS})
+        user = found
 
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-
-    if user is None:
-        raise credentials_exception
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,75 @@
+"""Relationship loader profiles for API endpoints.
+
+Model relationships are declared ``lazy="raise"``, so every query states the
+relations it needs here: nothing by default, the relations named in an
+``include`` parameter for expanded reads, and the full cascade tree for deletes.
+"""
+
+from collections.abc import Collection
+from typing import Any
+
+from sqlalchemy.orm import noload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from app.models.experiment import Experiment
+from app.models.plate import Plate
+from app.models.project import Project
+from app.models.well import Well
+
+WELL_INCLUDES = frozenset({"compound", "images", "analyses"})
+PLATE_INCLUDES = WELL_INCLUDES | {"wells"}
+EXPERIMENT_INCLUDES = frozenset({"plates"})
+PROJECT_INCLUDES = frozenset({"experiments"})
+
+
+def _well_relation_options(include: Collection[str]) -> list[Any]:
+    # Relations that were not requested are noloaded so that expanded schemas
+    # serialize them as empty instead of raising.
+    relations = {
+        "compound": Well.compound,
+        "images": Well.images,
+        "analyses": Well.analyses,
+    }
+    return [
+        selectinload(attr) if name in include else noload(attr) for name, attr in relations.items()
+    ]
+
+
+def well_loader_options(include: Collection[str]) -> list[LoaderOption]:
+    """Loader options for a well query expanded with ``include``."""
+    if not include:
+        return []
+    return _well_relation_options(include)
+
+
+def plate_loader_options(include: Collection[str]) -> list[LoaderOption]:
+    """Loader options for a plate query; any well relation implies ``wells``."""
+    if not include:
+        return []
+    return [selectinload(Plate.wells).options(*_well_relation_options(include))]
+
+
+def experiment_loader_options(include: Collection[str]) -> list[LoaderOption]:
+    """Loader options for an experiment query expanded with ``include``."""
+    return [selectinload(Experiment.plates)] if "plates" in include else []
+
+
+def project_loader_options(include: Collection[str]) -> list[LoaderOption]:
+    """Loader options for a project query expanded with ``include``."""
+    return [selectinload(Project.experiments)] if "experiments" in include else []
+
+
+# Deleting through the ORM cascades to children, which must be loaded first.
+_WELL_CASCADE = (selectinload(Well.images), selectinload(Well.analyses))
+
+WELL_DELETE_OPTIONS = list(_WELL_CASCADE)
+PLATE_DELETE_OPTIONS = [selectinload(Plate.wells).options(*_WELL_CASCADE)]
+EXPERIMENT_DELETE_OPTIONS = [
+    selectinload(Experiment.plates).selectinload(Plate.wells).options(*_WELL_CASCADE)
+]
+PROJECT_DELETE_OPTIONS = [
+    selectinload(Project.experiments)
+    .selectinload(Experiment.plates)
+    .selectinload(Plate.wells)
+    .options(*_WELL_CASCADE)
+]
@@ -0,0 +1,124 @@
+"""Shared list-endpoint pagination over ``(created_at, id)``.
+
+Results are always ordered by ``(created_at, id)``. Offset pages remain
+available for backwards compatibility, while ``cursor`` switches to keyset
+pagination whose cost does not grow with the page depth. Totals can be skipped
+or estimated from planner statistics so deep listings avoid a full count.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from pydantic import BaseModel as Schema
+from pydantic import TypeAdapter
+from sqlalchemy import Row, Select, func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.base import BaseModel
+from app.schemas.pagination import PaginatedResponse, PaginationParams, encode_cursor
+
+
+@dataclass
+class Page[T]:
+    items: list[T]
+    total: int | None
+    next_cursor: str | None
+
+
+async def count_total(
+    db: AsyncSession,
+    query: Select[Any],
+    model: type[BaseModel],
+    params: PaginationParams,
+) -> int | None:
+    """Return the total row count requested by ``params`` for ``query``."""
+    if not params.with_total:
+        return None
+
+    # pg_class.reltuples only describes whole tables, so filtered queries are counted
+    if (
+        params.estimate_total
+        and query.whereclause is None
+        and db.get_bind().dialect.name == "postgresql"
+    ):
+        estimate = await db.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+            {"table": model.__tablename__},
+        )
+        # reltuples is -1 until the table has been vacuumed or analyzed
+        if estimate is not None and estimate >= 0:
+            return int(estimate)
+
+    count_query = select(func.count()).select_from(query.order_by(None).subquery())
+    return await db.scalar(count_query) or 0
+
+
+def _page_query(
+    query: Select[Any], model: type[BaseModel], params: PaginationParams
+) -> Select[Any]:
+    page_query = query.order_by(model.created_at, model.id)
+    after = params.after
+    if after is not None:
+        page_query = page_query.where(tuple_(model.created_at, model.id) > after)
+    else:
+        page_query = page_query.offset(params.offset)
+    # Fetch one extra row to learn whether another page exists
+    return page_query.limit(params.limit + 1)
+
+
+def _next_cursor(rows: list[Any], params: PaginationParams) -> str | None:
+    if len(rows) <= params.limit:
+        return None
+    last = rows[params.limit - 1]
+    return encode_cursor(last.created_at, last.id)
+
+
+async def paginate[M: BaseModel](
+    db: AsyncSession,
+    query: Select[tuple[M]],
+    model: type[M],
+    params: PaginationParams,
+) -> Page[M]:
+    """Fetch one page of ``query`` plus an opaque cursor for the following page."""
+    result = await db.execute(_page_query(query, model, params))
+    rows = list(result.scalars().all())
+    total = await count_total(db, query, model, params)
+    return Page(items=rows[: params.limit], total=total, next_cursor=_next_cursor(rows, params))
+
+
+async def paginate_rows(
+    db: AsyncSession,
+    query: Select[Any],
+    model: type[BaseModel],
+    params: PaginationParams,
+) -> Page[Row[Any]]:
+    """Like ``paginate`` for a query selecting columns of ``model``, returning plain rows.
+
+    The columns must include ``created_at`` and ``id``. Rows skip ORM identity
+    map bookkeeping, which dominates the cost of wide listings.
+    """
+    result = await db.execute(_page_query(query, model, params))
+    rows = list(result.all())
+    total = await count_total(db, query, model, params)
+    return Page(items=rows[: params.limit], total=total, next_cursor=_next_cursor(rows, params))
+
+
+@lru_cache
+def _items_adapter[S: Schema](schema: type[S]) -> TypeAdapter[list[S]]:
+    return TypeAdapter(list[schema])  # type: ignore[valid-type]
+
+
+def page_response[S: Schema](
+    schema: type[S], page: Page[Any], params: PaginationParams
+) -> PaginatedResponse[S]:
+    """Build the response for a page of entities or rows, validating each item once."""
+    adapter = _items_adapter(schema)
+    if page.items and isinstance(page.items[0], Row):
+        # Mappings validate in pydantic-core without an attribute lookup per field
+        items = adapter.validate_python([row._asdict() for row in page.items])
+    else:
+        items = adapter.validate_python(page.items, from_attributes=True)
+    return PaginatedResponse[schema].create(  # type: ignore[valid-type]
+        items=items, total=page.total, params=params, next_cursor=page.next_cursor
+    )
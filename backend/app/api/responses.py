@@ -0,0 +1,217 @@
+"""Responses that serve stored objects and cached reads with HTTP caching support."""
+
+import hashlib
+from collections.abc import AsyncIterator, Awaitable, Callable, Collection, Sequence
+from typing import Any
+from urllib.parse import urlencode
+from uuid import UUID
+
+from fastapi import Request, status
+from fastapi.responses import FileResponse, RedirectResponse, Response, StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base
+from app.core.response_cache import (
+    COMPOUNDS_TAG,
+    IMAGES_TAG,
+    PLATES_TAG,
+    CachedResponse,
+    get_response_cache,
+    plate_tag,
+)
+from app.core.storage import StorageBackend
+
+# Cached reads can change after writes, so clients revalidate with If-None-Match
+CACHED_READ_CACHE_CONTROL = "private, no-cache"
+
+
+class RangeNotSatisfiableError(Exception):
+    """The requested byte range starts beyond the end of the object."""
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Parse a single-range ``Range`` header into a half-open ``(start, end)``.
+
+    Returns None for headers that should be ignored (other units, multiple
+    ranges, malformed values), in which case the whole object is sent.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash or not (first or last):
+        return None
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise RangeNotSatisfiableError(header)
+            return max(0, size - length), size
+        start = int(first)
+        end = int(last) + 1 if last else size
+    except ValueError:
+        return None
+    if end <= start and last:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiableError(header)
+    return start, min(end, size)
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    """Weak comparison of an ``If-None-Match`` header against a quoted ETag."""
+    if header is None:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+async def storage_response(
+    request: Request,
+    storage: StorageBackend,
+    key: str,
+    media_type: str | None = None,
+    redirect: bool = False,
+) -> Response:
+    """Stream an object without buffering it, honouring conditional and range requests.
+
+    With ``redirect`` set and a backend that can presign URLs, the client is
+    redirected to the object store instead. Raises ``ObjectNotFoundError``.
+    """
+    if redirect:
+        url = await storage.presign(key, settings.storage_presign_expires)
+        if url is not None:
+            return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+    info = await storage.head(key)
+    etag = f'"{info.etag}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": settings.image_cache_control,
+        "Accept-Ranges": "bytes",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    media_type = media_type or info.content_type or "application/octet-stream"
+    path = storage.local_path(key)
+    if path is not None:
+        # Starlette serves ranges and If-Range itself and hands whole files to the
+        # server's sendfile when it supports the ASGI pathsend extension
+        return FileResponse(path, media_type=media_type, headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # A stale If-Range validator means the client's partial copy is outdated: send it all
+    if range_header is not None and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(range_header, info.size)
+        except RangeNotSatisfiableError:
+            return Response(
+                status_code=status.HTTP_416_RANGE_NOT_SATISFIABLE,
+                headers={**headers, "Content-Range": f"bytes */{info.size}"},
+            )
+
+    if byte_range is None:
+        headers["Content-Length"] = str(info.size)
+        return StreamingResponse(storage.stream(key), media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Length"] = str(end - start)
+    headers["Content-Range"] = f"bytes {start}-{end - 1}/{info.size}"
+    return StreamingResponse(
+        storage.stream(key, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+def event_stream_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Send Server-Sent Events as they are produced, unbuffered by proxies."""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def json_response(content: BaseModel) -> Response:
+    """Serialize a response model once, in pydantic-core, and send it as is.
+
+    Returning the model itself would make FastAPI validate it again against
+    the route's ``response_model`` before encoding it.
+    """
+    return Response(content.model_dump_json(), media_type="application/json")
+
+
+def schema_columns(model: type[Base], schema: type[BaseModel]) -> list[Any]:
+    """The columns of ``model`` behind the fields of ``schema``, to select rows, not entities."""
+    columns = model.__mapper__.column_attrs
+    return [getattr(model, name) for name in schema.model_fields if name in columns]
+
+
+def plate_cache_tags(plate_id: UUID, include: Collection[str] = ()) -> list[str]:
+    """Cache tags of a response built from one plate and the relations in ``include``.
+
+    Analyses are covered by the plate tag; compounds and images are written
+    without reference to a plate and have their own tags.
+    """
+    tags = [PLATES_TAG, plate_tag(plate_id)]
+    if "compound" in include:
+        tags.append(COMPOUNDS_TAG)
+    if "images" in include:
+        tags.append(IMAGES_TAG)
+    return tags
+
+
+def _json_response(request: Request, cached: CachedResponse) -> Response:
+    headers = {"ETag": cached.etag, "Cache-Control": CACHED_READ_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(cached.body, media_type="application/json", headers=headers)
+
+
+async def cached_response(
+    request: Request,
+    tags: Sequence[str],
+    build: Callable[[AsyncSession], Awaitable[BaseModel]],
+    db: AsyncSession,
+    session_maker: async_sessionmaker[AsyncSession],
+) -> Response:
+    """Serve a GET from the response cache, calling ``build`` on a miss.
+
+    The entry is keyed by path, query and the generations of ``tags`` (see
+    ``app.core.response_cache``); it carries an ETag so unchanged responses
+    are answered with 304. Errors raised by ``build`` are not cached.
+
+    Misses are built in a session of ``session_maker``, on the primary: a
+    lagging read replica could return rows older than a commit whose
+    invalidation has already been applied, and they would be cached under the
+    new generations. Without a cache, ``build`` reads the request's ``db``.
+    """
+    cache = get_response_cache()
+    if cache is None:
+        return json_response(await build(db))
+
+    generations = await cache.generations(tags)
+    query = urlencode(sorted(request.query_params.multi_items()))
+    key = "|".join(
+        [
+            request.url.path,
+            query,
+            *(f"{tag}={gen}" for tag, gen in zip(tags, generations, strict=True)),
+        ]
+    )
+    cached = await cache.get(key)
+    if cached is None:
+        async with session_maker() as session:
+            body = (await build(session)).model_dump_json().encode()
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        cached = CachedResponse(etag=etag, body=body)
+        await cache.set(key, cached)
+    return _json_response(request, cached)
@@ -3,12 +3,16 @@ from fastapi import APIRouter
 from app.api.routes import (
     analyses,
     auth,
+    cells,
     compounds,
     experiments,
+    features,
     health,
     images,
+    jobs,
     plates,
     projects,
+    uploads,
     wells,
 )
 
@@ -23,3 +27,7 @@ api_router.include_router(wells.router, prefix="/wells", tags=["wells"])
 api_router.include_router(images.router, prefix="/images", tags=["images"])
 api_router.include_router(compounds.router, prefix="/compounds", tags=["compounds"])
 api_router.include_router(analyses.router, prefix="/analyses", tags=["analyses"])
+api_router.include_router(features.router, prefix="/features", tags=["features"])
+api_router.include_router(cells.router, prefix="/cells", tags=["cells"])
+api_router.include_router(uploads.router, prefix="/uploads", tags=["uploads"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
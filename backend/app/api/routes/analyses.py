@@ -1,54 +1,70 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.api.deps import get_db, get_pagination
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.deps import get_db, get_pagination, get_session_maker
+from app.api.pagination import page_response, paginate_rows
+from app.api.responses import cached_response, json_response, schema_columns
+from app.core.response_cache import ANALYSES_TAG, invalidate_on_commit, plate_tag
 from app.models.analysis import Analysis
+from app.models.well import Well
 from app.schemas.analysis import AnalysisCreate, AnalysisRead, AnalysisUpdate
 from app.schemas.pagination import PaginatedResponse, PaginationParams
+from app.services.well_aggregates import refresh_well_aggregates
 
 router = APIRouter()
 
 
+async def _analyses_changed(db: AsyncSession, well_id: UUID) -> None:
+    """Refresh the well's aggregates and invalidate cached responses; call after a flush."""
+    plate_id = await db.scalar(select(Well.plate_id).where(Well.id == well_id))
+    # Plate responses embed their analyses too
+    invalidate_on_commit(db, ANALYSES_TAG, *([plate_tag(plate_id)] if plate_id else []))
+    if plate_id is not None:
+        await refresh_well_aggregates(db, plate_id, well_ids=[well_id])
+
+
 @router.get("", response_model=PaginatedResponse[AnalysisRead])
 async def list_analyses(
+    request: Request,
     well_id: UUID | None = None,
     db: AsyncSession = Depends(get_db),
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_session_maker),
     pagination: PaginationParams = Depends(get_pagination),
-) -> PaginatedResponse[AnalysisRead]:
-    base_query = select(Analysis)
-    if well_id:
-        base_query = base_query.where(Analysis.well_id == well_id)
+) -> Response:
+    async def build(db: AsyncSession) -> PaginatedResponse[AnalysisRead]:
+        base_query = select(*schema_columns(Analysis, AnalysisRead))
+        if well_id:
+            base_query = base_query.where(Analysis.well_id == well_id)
 
-    count_query = select(func.count()).select_from(base_query.subquery())
-    total = await db.scalar(count_query) or 0
+        page = await paginate_rows(db, base_query, Analysis, pagination)
+        return page_response(AnalysisRead, page, pagination)
 
-    query = base_query.offset(pagination.offset).limit(pagination.limit)
-    result = await db.execute(query)
-    analyses = result.scalars().all()
-
-    return PaginatedResponse.create(
-        items=[AnalysisRead.model_validate(a) for a in analyses],
-        total=total,
-        params=pagination,
-    )
+    if well_id is None:
+        return json_response(await build(db))
+    return await cached_response(request, [ANALYSES_TAG], build, db, session_maker)
 
 
 @router.get("/{analysis_id}", response_model=AnalysisRead)
 async def get_analysis(
     analysis_id: UUID,
+    request: Request,
     db: AsyncSession = Depends(get_db),
-) -> AnalysisRead:
-    query = select(Analysis).where(Analysis.id == analysis_id)
-    result = await db.execute(query)
-    analysis = result.scalar_one_or_none()
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_session_maker),
+) -> Response:
+    async def build(db: AsyncSession) -> AnalysisRead:
+        query = select(Analysis).where(Analysis.id == analysis_id)
+        result = await db.execute(query)
+        analysis = result.scalar_one_or_none()
 
-    if analysis is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Analysis not found")
+        if analysis is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Analysis not found")
 
-    return AnalysisRead.model_validate(analysis)
+        return AnalysisRead.model_validate(analysis)
+
+    return await cached_response(request, [ANALYSES_TAG], build, db, session_maker)
 
 
 @router.post("", response_model=AnalysisRead, status_code=status.HTTP_201_CREATED)
@@ -59,6 +75,7 @@ async def create_analysis(
     analysis = Analysis(**analysis_in.model_dump())
     db.add(analysis)
     await db.flush()
+    await _analyses_changed(db, analysis.well_id)
     await db.refresh(analysis)
     return AnalysisRead.model_validate(analysis)
 
@@ -81,6 +98,7 @@ async def update_analysis(
         setattr(analysis, field, value)
 
     await db.flush()
+    await _analyses_changed(db, analysis.well_id)
     await db.refresh(analysis)
     return AnalysisRead.model_validate(analysis)
 
@@ -98,3 +116,5 @@ async def delete_analysis(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Analysis not found")
 
     await db.delete(analysis)
+    await db.flush()
+    await _analyses_changed(db, analysis.well_id)
@@ -1,12 +1,17 @@
+import ipaddress
+import math
+from datetime import timedelta
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import CurrentUser, get_db
-from app.core.security import create_access_token, verify_password
+from app.core.config import settings
+from app.core.rate_limit import RateLimiter
+from app.core.security import HashingBusyError, create_access_token, verify_password_async
 from app.models.user import User
 from app.schemas.auth import LoginRequest, Token
 from app.schemas.user import UserRead
@@ -14,16 +19,71 @@ from app.schemas.user import UserRead
 router = APIRouter()
 
 
-@router.post("/login", response_model=Token)
-async def login(
-    db: Annotated[AsyncSession, Depends(get_db)],
-    login_data: LoginRequest,
-) -> Token:
-    """Login with email and password, returns access token."""
-    result = await db.execute(select(User).where(User.email == login_data.email))
+def _access_token(user: User) -> str:
+    if not settings.auth_trust_token_claims:
+        return create_access_token(subject=str(user.id))
+    # Claims are trusted until expiry, so these tokens are kept short-lived
+    return create_access_token(
+        subject=str(user.id),
+        expires_delta=timedelta(minutes=settings.trusted_token_expire_minutes),
+        claims={"active": user.is_active, "superuser": user.is_superuser},
+    )
+
+
+# Attempts are limited per client address and per email, so one client cannot
+# flood the hashing pool and one account cannot be guessed from many addresses
+login_limiter = RateLimiter(
+    attempts=settings.login_rate_limit_attempts,
+    window=settings.login_rate_limit_window_seconds,
+)
+
+
+def _trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in ipaddress.ip_network(proxy) for proxy in settings.trusted_proxies)
+
+
+def client_address(request: Request) -> str:
+    """The client's address, read from X-Forwarded-For past ``settings.trusted_proxies``."""
+    address = request.client.host if request.client else "unknown"
+    hops = [
+        hop.strip()
+        for header in request.headers.getlist("x-forwarded-for")
+        for hop in header.split(",")
+    ]
+    # Each proxy appends its peer: walk back from the nearest hop while it is trusted
+    while hops and _trusted_proxy(address):
+        address = hops.pop()
+    return address
+
+
+async def _authenticate(request: Request, db: AsyncSession, email: str, password: str) -> User:
+    client = client_address(request)
+    retry_after = max(
+        login_limiter.hit(f"ip:{client}"), login_limiter.hit(f"email:{email.lower()}")
+    )
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+    result = await db.execute(select(User).where(User.email == email))
     user = result.scalar_one_or_none()
 
-    if user is None or not verify_password(login_data.password, user.hashed_password):
+    try:
+        valid = user is not None and await verify_password_async(password, user.hashed_password)
+    except HashingBusyError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent logins, try again shortly",
+            headers={"Retry-After": "1"},
+        ) from exc
+    if user is None or not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -35,13 +95,23 @@ async def login(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user",
         )
+    return user
 
-    access_token = create_access_token(subject=str(user.id))
-    return Token(access_token=access_token)
+
+@router.post("/login", response_model=Token)
+async def login(
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    login_data: LoginRequest,
+) -> Token:
+    """Login with email and password, returns access token."""
+    user = await _authenticate(request, db, login_data.email, login_data.password)
+    return Token(access_token=_access_token(user))
 
 
 @router.post("/login/form", response_model=Token)
 async def login_form(
+    request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
 ) -> Token:
@@ -50,27 +120,20 @@ async def login_form(
     This endpoint is for compatibility with OAuth2 password flow used by
     Swagger UI's Authorize button.
     """
-    result = await db.execute(select(User).where(User.email == form_data.username))
-    user = result.scalar_one_or_none()
-
-    if user is None or not verify_password(form_data.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Inactive user",
-        )
-
-    access_token = create_access_token(subject=str(user.id))
-    return Token(access_token=access_token)
+    user = await _authenticate(request, db, form_data.username, form_data.password)
+    return Token(access_token=_access_token(user))
 
 
 @router.get("/me", response_model=UserRead)
-async def get_current_user_info(current_user: CurrentUser) -> User:
+async def get_current_user_info(
+    current_user: CurrentUser,
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> User:
     """Get current authenticated user information."""
-    return current_user
+    if current_user.email is not None:
+        return current_user
+    # Users built from trusted token claims only carry id and flags
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return user
@@ -0,0 +1,168 @@
+import asyncio
+from pathlib import Path
+from uuid import UUID
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import CurrentUser, get_db
+from app.api.responses import json_response
+from app.core.storage import ObjectNotFoundError, StorageBackend, get_storage
+from app.models.cell_dataset import CellDataset
+from app.models.plate import Plate
+from app.schemas.cell_dataset import CellDatasetRead, CellHistogram, CellSummary
+from app.services.cells import (
+    CellDataError,
+    Wells,
+    cell_histogram,
+    cell_summary,
+    local_cell_file,
+    parse_wells,
+    stream_cells,
+)
+from app.services.export import EXPORT_MEDIA_TYPES, ExportFormat
+
+router = APIRouter()
+
+
+async def _get_dataset(db: AsyncSession, dataset_id: UUID) -> tuple[CellDataset, Plate]:
+    query = (
+        select(CellDataset, Plate)
+        .join(Plate, Plate.id == CellDataset.plate_id)
+        .where(CellDataset.id == dataset_id)
+    )
+    row = (await db.execute(query)).one_or_none()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cell dataset not found")
+    dataset, plate = row
+    return dataset, plate
+
+
+def _check_features(dataset: CellDataset, features: list[str]) -> None:
+    for feature in features:
+        if feature not in dataset.features:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown feature {feature!r}"
+            )
+
+
+def _wells(wells: str | None) -> Wells | None:
+    if wells is None:
+        return None
+    try:
+        return parse_wells(wells)
+    except CellDataError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+async def _local_file(storage: StorageBackend, dataset: CellDataset) -> Path:
+    try:
+        return await local_cell_file(storage, dataset.storage_key)
+    except ObjectNotFoundError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Cell data not found"
+        ) from exc
+
+
+@router.get("/{dataset_id}", response_model=CellDatasetRead)
+async def get_cell_dataset(
+    dataset_id: UUID,
+    _current_user: CurrentUser,
+    db: AsyncSession = Depends(get_db),
+) -> CellDatasetRead:
+    dataset, _ = await _get_dataset(db, dataset_id)
+    return CellDatasetRead.model_validate(dataset)
+
+
+@router.get("/{dataset_id}/histogram", response_model=CellHistogram)
+async def get_cell_histogram(
+    dataset_id: UUID,
+    feature: str,
+    _current_user: CurrentUser,
+    bins: int = Query(50, ge=1, le=1000),
+    low: float | None = None,
+    high: float | None = None,
+    wells: str | None = None,
+    db: AsyncSession = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+) -> Response:
+    """Histogram of one feature per well, e.g. nuclear area, computed from every cell.
+
+    ``wells`` limits it to a comma-separated list such as ``A1,B03``. Without
+    ``low`` and ``high`` the bins span the feature's whole range, so every
+    well shares the same edges.
+    """
+    dataset, plate = await _get_dataset(db, dataset_id)
+    _check_features(dataset, [feature])
+    well_filter = _wells(wells)
+    path = await _local_file(storage, dataset)
+
+    histogram = await asyncio.to_thread(
+        cell_histogram, path, dataset_id, feature, bins, low, high, plate, well_filter
+    )
+    return json_response(histogram)
+
+
+@router.get("/{dataset_id}/summary", response_model=CellSummary)
+async def get_cell_summary(
+    dataset_id: UUID,
+    feature: str,
+    _current_user: CurrentUser,
+    wells: str | None = None,
+    db: AsyncSession = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+) -> Response:
+    """Cell count, mean, standard deviation, minimum and maximum of one feature per well."""
+    dataset, plate = await _get_dataset(db, dataset_id)
+    _check_features(dataset, [feature])
+    well_filter = _wells(wells)
+    path = await _local_file(storage, dataset)
+
+    summary = await asyncio.to_thread(cell_summary, path, dataset_id, feature, plate, well_filter)
+    return json_response(summary)
+
+
+@router.get("/{dataset_id}/cells", response_class=StreamingResponse)
+async def get_cells(
+    dataset_id: UUID,
+    wells: str,
+    _current_user: CurrentUser,
+    columns: str | None = None,
+    format: ExportFormat = "arrow",
+    db: AsyncSession = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+) -> StreamingResponse:
+    """Stream the cells of some wells, e.g. to plot one well's cells in a scatter plot.
+
+    ``wells`` is a comma-separated list such as ``A1,B03`` and ``columns`` an
+    optional comma-separated list of features (all by default).
+    """
+    dataset, _ = await _get_dataset(db, dataset_id)
+    features = dataset.features if columns is None else columns.split(",")
+    _check_features(dataset, features)
+    well_filter = _wells(wells) or set()
+    path = await _local_file(storage, dataset)
+
+    return StreamingResponse(
+        stream_cells(path, features, well_filter, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="cells-{dataset_id}.{format}"'},
+    )
+
+
+@router.delete("/{dataset_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_cell_dataset(
+    dataset_id: UUID,
+    background_tasks: BackgroundTasks,
+    _current_user: CurrentUser,
+    db: AsyncSession = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+) -> None:
+    dataset, _ = await _get_dataset(db, dataset_id)
+    await db.delete(dataset)
+    # Background tasks run before get_db commits: commit first, so a failed
+    # commit keeps the row and its file
+    await db.commit()
+    background_tasks.add_task(storage.delete_many, [dataset.storage_key])
@@ -1,10 +1,13 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db, get_pagination
+from app.api.pagination import page_response, paginate_rows
+from app.api.responses import json_response, schema_columns
+from app.core.response_cache import COMPOUNDS_TAG, PLATES_TAG, invalidate_on_commit
 from app.models.compound import Compound
 from app.schemas.compound import CompoundCreate, CompoundRead, CompoundUpdate
 from app.schemas.pagination import PaginatedResponse, PaginationParams
@@ -16,19 +19,10 @@ router = APIRouter()
 async def list_compounds(
     db: AsyncSession = Depends(get_db),
     pagination: PaginationParams = Depends(get_pagination),
-) -> PaginatedResponse[CompoundRead]:
-    count_query = select(func.count()).select_from(Compound)
-    total = await db.scalar(count_query) or 0
-
-    query = select(Compound).offset(pagination.offset).limit(pagination.limit)
-    result = await db.execute(query)
-    compounds = result.scalars().all()
-
-    return PaginatedResponse.create(
-        items=[CompoundRead.model_validate(c) for c in compounds],
-        total=total,
-        params=pagination,
-    )
+) -> Response:
+    query = select(*schema_columns(Compound, CompoundRead))
+    page = await paginate_rows(db, query, Compound, pagination)
+    return json_response(page_response(CompoundRead, page, pagination))
 
 
 @router.get("/{compound_id}", response_model=CompoundRead)
@@ -74,6 +68,7 @@ async def update_compound(
     update_data = compound_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(compound, field, value)
+    invalidate_on_commit(db, COMPOUNDS_TAG)
 
     await db.flush()
     await db.refresh(compound)
@@ -92,4 +87,6 @@ async def delete_compound(
     if compound is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Compound not found")
 
+    # Wells referencing the compound change too
+    invalidate_on_commit(db, COMPOUNDS_TAG, PLATES_TAG)
     await db.delete(compound)
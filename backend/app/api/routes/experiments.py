@@ -1,13 +1,51 @@
+from typing import Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.api.deps import CurrentUser, get_db, get_pagination
+from app.api.deps import CurrentUser, get_db, get_pagination, get_session_maker, include_param
+from app.api.loaders import (
+    EXPERIMENT_DELETE_OPTIONS,
+    EXPERIMENT_INCLUDES,
+    experiment_loader_options,
+)
+from app.api.pagination import paginate
+from app.api.responses import event_stream_response, json_response
+from app.core.config import settings
+from app.core.response_cache import ANALYSES_TAG, PLATES_TAG, invalidate_on_commit
+from app.models.dose_response import DoseResponseCurve
 from app.models.experiment import Experiment
-from app.schemas.experiment import ExperimentCreate, ExperimentRead, ExperimentUpdate
+from app.models.feature import Feature
+from app.models.job import Job
+from app.schemas.analysis import AnalysisMetric
+from app.schemas.dose_response import (
+    DoseResponseCurveRead,
+    DoseResponseFit,
+    DoseResponseFitCreate,
+)
+from app.schemas.experiment import (
+    ExperimentCreate,
+    ExperimentRead,
+    ExperimentReadWithPlates,
+    ExperimentUpdate,
+)
+from app.schemas.feature import FeatureValues
+from app.schemas.job import JobEvent
 from app.schemas.pagination import PaginatedResponse, PaginationParams
+from app.schemas.plate import ExperimentHeatmap
+from app.services.dose_response import refresh_experiment_curves
+from app.services.export import EXPORT_MEDIA_TYPES, ExportFormat, stream_experiment_export
+from app.services.features import experiment_feature_values
+from app.services.job_events import experiment_topic, job_events, stream_job_events
+from app.services.well_aggregates import (
+    HEATMAP_MEDIA_TYPE,
+    experiment_heatmap,
+    experiment_heatmap_plates,
+    pack_experiment_heatmap,
+)
 
 router = APIRouter()
 
@@ -23,36 +61,204 @@ async def list_experiments(
     if project_id:
         base_query = base_query.where(Experiment.project_id == project_id)
 
-    count_query = select(func.count()).select_from(base_query.subquery())
-    total = await db.scalar(count_query) or 0
-
-    query = base_query.offset(pagination.offset).limit(pagination.limit)
-    result = await db.execute(query)
-    experiments = result.scalars().all()
+    page = await paginate(db, base_query, Experiment, pagination)
 
     return PaginatedResponse.create(
-        items=[ExperimentRead.model_validate(e) for e in experiments],
-        total=total,
+        items=[ExperimentRead.model_validate(e) for e in page.items],
+        total=page.total,
         params=pagination,
+        next_cursor=page.next_cursor,
     )
 
 
-@router.get("/{experiment_id}", response_model=ExperimentRead)
+@router.get("/{experiment_id}", response_model=ExperimentRead | ExperimentReadWithPlates)
 async def get_experiment(
     experiment_id: UUID,
     _current_user: CurrentUser,
     db: AsyncSession = Depends(get_db),
-) -> ExperimentRead:
-    query = select(Experiment).where(Experiment.id == experiment_id)
+    include: frozenset[str] = Depends(include_param(EXPERIMENT_INCLUDES)),
+) -> ExperimentRead | ExperimentReadWithPlates:
+    query = (
+        select(Experiment)
+        .where(Experiment.id == experiment_id)
+        .options(*experiment_loader_options(include))
+    )
     result = await db.execute(query)
     experiment = result.scalar_one_or_none()
 
     if experiment is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Experiment not found")
 
+    if include:
+        return ExperimentReadWithPlates.model_validate(experiment)
     return ExperimentRead.model_validate(experiment)
 
 
+@router.get("/{experiment_id}/export", response_class=StreamingResponse)
+async def export_experiment(
+    experiment_id: UUID,
+    _current_user: CurrentUser,
+    format: ExportFormat = "parquet",
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    """Download every plate, well, compound and analysis metric of an experiment as one table.
+
+    The table is streamed in batches (see ``app.services.export``), so large
+    screens load straight into pandas or Polars without paging through JSON.
+    """
+    exists = await db.scalar(select(Experiment.id).where(Experiment.id == experiment_id))
+    if exists is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Experiment not found")
+
+    return StreamingResponse(
+        stream_experiment_export(db, experiment_id, format, settings.export_batch_size),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="experiment-{experiment_id}.{format}"'
+        },
+    )
+
+
+@router.get("/{experiment_id}/jobs/events", response_class=StreamingResponse)
+async def stream_experiment_jobs(
+    experiment_id: UUID,
+    _current_user: CurrentUser,
+    db: AsyncSession = Depends(get_db),
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_session_maker),
+) -> StreamingResponse:
+    """Stream the state changes of an experiment's jobs as Server-Sent Events.
+
+    The stream starts with a ``job`` event for each queued or running job,
+    then sends one for every change (see ``app.services.job_events``).
+    """
+    # The stream outlives the request's session; don't hold its connection
+    await db.close()
+    try:
+        subscription = await job_events.subscribe(session_maker, experiment_topic(experiment_id))
+    except TimeoutError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Job events are unavailable"
+        ) from exc
+    try:
+        async with session_maker() as session:
+            exists = await session.scalar(
+                select(Experiment.id).where(Experiment.id == experiment_id)
+            )
+            if exists is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="Experiment not found"
+                )
+            jobs = await session.scalars(
+                select(Job)
+                .where(Job.experiment_id == experiment_id, Job.status.in_(["queued", "running"]))
+                .order_by(Job.created_at)
+            )
+            snapshots = [JobEvent.model_validate(job) for job in jobs]
+    except BaseException:
+        subscription.close()
+        raise
+    return event_stream_response(stream_job_events(subscription, snapshots))
+
+
+@router.get("/{experiment_id}/features/{feature_name}", response_model=FeatureValues)
+async def get_experiment_feature(
+    experiment_id: UUID,
+    feature_name: str,
+    _current_user: CurrentUser,
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """Read one feature for every well of an experiment, as parallel arrays."""
+    exists = await db.scalar(select(Experiment.id).where(Experiment.id == experiment_id))
+    if exists is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Experiment not found")
+    feature = await db.scalar(select(Feature).where(Feature.name == feature_name))
+    if feature is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Feature not found")
+
+    return json_response(await experiment_feature_values(db, experiment_id, feature))
+
+
+@router.get(
+    "/{experiment_id}/heatmap",
+    response_model=ExperimentHeatmap,
+    responses={200: {"content": {HEATMAP_MEDIA_TYPE: {}}}},
+)
+async def get_experiment_heatmap(
+    experiment_id: UUID,
+    analysis_type: str,
+    _current_user: CurrentUser,
+    metric: AnalysisMetric = "mean_intensity",
+    format: Literal["json", "binary"] = "json",
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """Read one analysis metric per well for every plate, from the precomputed well aggregates.
+
+    With ``format=binary`` the plates are packed as float32 behind a small
+    JSON header (see ``app.services.well_aggregates.pack_experiment_heatmap``),
+    so a campaign of hundreds of plates is one compact response.
+    """
+    exists = await db.scalar(select(Experiment.id).where(Experiment.id == experiment_id))
+    if exists is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Experiment not found")
+
+    plates = await experiment_heatmap_plates(db, experiment_id, analysis_type, metric)
+    if format == "binary":
+        return Response(
+            pack_experiment_heatmap(experiment_id, analysis_type, metric, plates),
+            media_type=HEATMAP_MEDIA_TYPE,
+        )
+    return json_response(experiment_heatmap(experiment_id, analysis_type, metric, plates))
+
+
+@router.get(
+    "/{experiment_id}/dose-response", response_model=PaginatedResponse[DoseResponseCurveRead]
+)
+async def list_dose_response_curves(
+    experiment_id: UUID,
+    _current_user: CurrentUser,
+    analysis_type: str | None = None,
+    compound_id: UUID | None = None,
+    db: AsyncSession = Depends(get_db),
+    pagination: PaginationParams = Depends(get_pagination),
+) -> PaginatedResponse[DoseResponseCurveRead]:
+    """List the stored dose-response curves of an experiment."""
+    base_query = select(DoseResponseCurve).where(DoseResponseCurve.experiment_id == experiment_id)
+    if analysis_type:
+        base_query = base_query.where(DoseResponseCurve.analysis_type == analysis_type)
+    if compound_id:
+        base_query = base_query.where(DoseResponseCurve.compound_id == compound_id)
+
+    page = await paginate(db, base_query, DoseResponseCurve, pagination)
+
+    return PaginatedResponse.create(
+        items=[DoseResponseCurveRead.model_validate(c) for c in page.items],
+        total=page.total,
+        params=pagination,
+        next_cursor=page.next_cursor,
+    )
+
+
+@router.post("/{experiment_id}/dose-response", response_model=list[DoseResponseFit])
+async def fit_dose_response_curves(
+    experiment_id: UUID,
+    fit_in: DoseResponseFitCreate,
+    _current_user: CurrentUser,
+    db: AsyncSession = Depends(get_db),
+) -> list[DoseResponseFit]:
+    """Fit a 4PL curve per compound across all plates of an experiment and store it.
+
+    Stored curves of the same analysis type are replaced; read them back with
+    ``GET /{experiment_id}/dose-response``.
+    """
+    exists = await db.scalar(select(Experiment.id).where(Experiment.id == experiment_id))
+    if exists is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Experiment not found")
+
+    return await refresh_experiment_curves(
+        db, experiment_id, fit_in.analysis_type, metric=fit_in.metric
+    )
+
+
 @router.post("", response_model=ExperimentRead, status_code=status.HTTP_201_CREATED)
 async def create_experiment(
     experiment_in: ExperimentCreate,
@@ -95,11 +301,15 @@ async def delete_experiment(
     _current_user: CurrentUser,
     db: AsyncSession = Depends(get_db),
 ) -> None:
-    query = select(Experiment).where(Experiment.id == experiment_id)
+    query = (
+        select(Experiment).where(Experiment.id == experiment_id).options(*EXPERIMENT_DELETE_OPTIONS)
+    )
     result = await db.execute(query)
     experiment = result.scalar_one_or_none()
 
     if experiment is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Experiment not found")
 
+    # Deleting cascades to plates and their analyses
+    invalidate_on_commit(db, PLATES_TAG, ANALYSES_TAG)
     await db.delete(experiment)
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import CurrentUser, get_db
+from app.models.feature import Feature
+from app.schemas.feature import FeatureRead
+
+router = APIRouter()
+
+
+@router.get("", response_model=list[FeatureRead])
+async def list_features(
+    _current_user: CurrentUser,
+    search: str | None = None,
+    db: AsyncSession = Depends(get_db),
+) -> list[FeatureRead]:
+    """List the feature dictionary by name, optionally only names containing ``search``."""
+    query = select(Feature).order_by(Feature.name)
+    if search:
+        query = query.where(Feature.name.icontains(search, autoescape=True))
+    result = await db.execute(query)
+    return [FeatureRead.model_validate(f) for f in result.scalars()]
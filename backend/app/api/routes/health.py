@@ -1,8 +1,16 @@
 from fastapi import APIRouter
 
+from app.core.security import hashing_stats
+
 router = APIRouter()
 
 
 @router.get("/health")
 async def health_check() -> dict[str, str]:
     return {"status": "healthy"}
+
+
+@router.get("/health/hashing")
+async def hashing_health() -> dict[str, float | int]:
+    """Password hashing pool load: running and queued hashes and their waiting time."""
+    return hashing_stats.snapshot()
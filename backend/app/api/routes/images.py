@@ -1,13 +1,27 @@
+import mimetypes
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import Response
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import CurrentUser, get_db, get_pagination
+from app.api.pagination import page_response, paginate_rows
+from app.api.responses import json_response, schema_columns, storage_response
+from app.core.response_cache import IMAGES_TAG, invalidate_on_commit
+from app.core.storage import ObjectNotFoundError, StorageBackend, get_storage
 from app.models.image import Image
-from app.schemas.image import ImageCreate, ImageRead, ImageUpdate
+from app.schemas.image import ImageCreate, ImageRead, ImageTiles, ImageUpdate
 from app.schemas.pagination import PaginatedResponse, PaginationParams
+from app.services.imaging import tile_grid
+from app.services.thumbnails import (
+    DEFAULT_THUMBNAIL_SIZE,
+    THUMBNAIL_SIZES,
+    TILE_SIZE,
+    thumbnail_key,
+    tile_key,
+)
 
 router = APIRouter()
 
@@ -18,23 +32,13 @@ async def list_images(
     well_id: UUID | None = None,
     db: AsyncSession = Depends(get_db),
     pagination: PaginationParams = Depends(get_pagination),
-) -> PaginatedResponse[ImageRead]:
-    base_query = select(Image)
+) -> Response:
+    base_query = select(*schema_columns(Image, ImageRead))
     if well_id:
         base_query = base_query.where(Image.well_id == well_id)
 
-    count_query = select(func.count()).select_from(base_query.subquery())
-    total = await db.scalar(count_query) or 0
-
-    query = base_query.offset(pagination.offset).limit(pagination.limit)
-    result = await db.execute(query)
-    images = result.scalars().all()
-
-    return PaginatedResponse.create(
-        items=[ImageRead.model_validate(i) for i in images],
-        total=total,
-        params=pagination,
-    )
+    page = await paginate_rows(db, base_query, Image, pagination)
+    return json_response(page_response(ImageRead, page, pagination))
 
 
 @router.get("/{image_id}", response_model=ImageRead)
@@ -53,6 +57,152 @@ async def get_image(
     return ImageRead.model_validate(image)
 
 
+@router.get("/{image_id}/content", response_class=Response)
+async def get_image_content(
+    image_id: UUID,
+    request: Request,
+    _current_user: CurrentUser,
+    redirect: bool = False,
+    db: AsyncSession = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+) -> Response:
+    """Stream the source image, honouring ``Range`` and ``If-None-Match``.
+
+    With ``redirect=true`` the client is sent to a presigned object store URL
+    when the storage backend supports it.
+    """
+    query = select(Image.s3_key, Image.filename).where(Image.id == image_id)
+    image = (await db.execute(query)).one_or_none()
+
+    if image is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+    # get_db closes the session only after the body is sent; don't hold its
+    # connection for the transfer
+    await db.close()
+
+    try:
+        return await storage_response(
+            request,
+            storage,
+            image.s3_key,
+            media_type=mimetypes.guess_type(image.filename)[0],
+            redirect=redirect,
+        )
+    except ObjectNotFoundError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Image content not found"
+        ) from exc
+
+
+@router.get("/{image_id}/thumbnail", response_class=Response)
+async def get_image_thumbnail(
+    image_id: UUID,
+    request: Request,
+    _current_user: CurrentUser,
+    size: int = DEFAULT_THUMBNAIL_SIZE,
+    redirect: bool = False,
+    db: AsyncSession = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+) -> Response:
+    """Stream a PNG thumbnail; ``size`` is the longest edge and one of 64, 256 or 1024."""
+    if size not in THUMBNAIL_SIZES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Thumbnail size must be one of {', '.join(map(str, THUMBNAIL_SIZES))}",
+        )
+
+    query = select(Image.thumbnail_s3_key).where(Image.id == image_id)
+    image = (await db.execute(query)).one_or_none()
+
+    if image is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+    if image.thumbnail_s3_key is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Thumbnail not found")
+    # get_db closes the session only after the body is sent; don't hold its
+    # connection for the transfer
+    await db.close()
+
+    try:
+        return await storage_response(
+            request,
+            storage,
+            thumbnail_key(image_id, size),
+            media_type="image/png",
+            redirect=redirect,
+        )
+    except ObjectNotFoundError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Thumbnail not found"
+        ) from exc
+
+
+async def _tiled_image(db: AsyncSession, image_id: UUID) -> ImageTiles:
+    query = select(Image.width, Image.height, Image.tile_levels).where(Image.id == image_id)
+    image = (await db.execute(query)).one_or_none()
+
+    if image is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+    if image.tile_levels is None or image.width is None or image.height is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tiles not found")
+
+    return ImageTiles(
+        image_id=image_id,
+        width=image.width,
+        height=image.height,
+        tile_size=TILE_SIZE,
+        levels=image.tile_levels,
+    )
+
+
+@router.get("/{image_id}/tiles", response_model=ImageTiles)
+async def get_image_tiles(
+    image_id: UUID,
+    _current_user: CurrentUser,
+    db: AsyncSession = Depends(get_db),
+) -> ImageTiles:
+    """Describe the image's tile pyramid once it is generated (``POST /plates/{id}/tiles``)."""
+    return await _tiled_image(db, image_id)
+
+
+@router.get("/{image_id}/tiles/{level}/{x}/{y}", response_class=Response)
+async def get_image_tile(
+    image_id: UUID,
+    level: int,
+    x: int,
+    y: int,
+    request: Request,
+    _current_user: CurrentUser,
+    redirect: bool = False,
+    db: AsyncSession = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+) -> Response:
+    """Stream one PNG tile of the DeepZoom pyramid.
+
+    Level 0 is a single pixel and the last level is full resolution; ``x`` and
+    ``y`` count tiles from the top left. Regenerating the pyramid rewrites tiles
+    under the same URL, so they are revalidated with their ETag.
+    """
+    tiles = await _tiled_image(db, image_id)
+    # As for image content: tiles are fetched in parallel, each request holding none
+    await db.close()
+    if not 0 <= level < tiles.levels:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tile not found")
+    columns, rows = tile_grid(tiles.width, tiles.height, level, tiles.tile_size)
+    if not (0 <= x < columns and 0 <= y < rows):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tile not found")
+
+    try:
+        return await storage_response(
+            request,
+            storage,
+            tile_key(image_id, level, x, y),
+            media_type="image/png",
+            redirect=redirect,
+        )
+    except ObjectNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tile not found") from exc
+
+
 @router.post("", response_model=ImageRead, status_code=status.HTTP_201_CREATED)
 async def create_image(
     image_in: ImageCreate,
@@ -61,6 +211,7 @@ async def create_image(
 ) -> ImageRead:
     image = Image(**image_in.model_dump())
     db.add(image)
+    invalidate_on_commit(db, IMAGES_TAG)
     await db.flush()
     await db.refresh(image)
     return ImageRead.model_validate(image)
@@ -83,6 +234,7 @@ async def update_image(
     update_data = image_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(image, field, value)
+    invalidate_on_commit(db, IMAGES_TAG)
 
     await db.flush()
     await db.refresh(image)
@@ -102,4 +254,5 @@ async def delete_image(
     if image is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
 
+    invalidate_on_commit(db, IMAGES_TAG)
     await db.delete(image)
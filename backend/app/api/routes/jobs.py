@@ -0,0 +1,84 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.deps import CurrentUser, get_db, get_pagination, get_session_maker
+from app.api.pagination import page_response, paginate_rows
+from app.api.responses import event_stream_response, json_response, schema_columns
+from app.models.job import Job
+from app.schemas.job import JobEvent, JobRead, JobStatus
+from app.schemas.pagination import PaginatedResponse, PaginationParams
+from app.services.job_events import job_events, job_topic, stream_job_events
+
+router = APIRouter()
+
+
+@router.get("", response_model=PaginatedResponse[JobRead])
+async def list_jobs(
+    _current_user: CurrentUser,
+    status: JobStatus | None = None,
+    kind: str | None = None,
+    experiment_id: UUID | None = None,
+    db: AsyncSession = Depends(get_db),
+    pagination: PaginationParams = Depends(get_pagination),
+) -> Response:
+    base_query = select(*schema_columns(Job, JobRead))
+    if status:
+        base_query = base_query.where(Job.status == status)
+    if kind:
+        base_query = base_query.where(Job.kind == kind)
+    if experiment_id:
+        base_query = base_query.where(Job.experiment_id == experiment_id)
+
+    page = await paginate_rows(db, base_query, Job, pagination)
+    return json_response(page_response(JobRead, page, pagination))
+
+
+@router.get("/{job_id}", response_model=JobRead)
+async def get_job(
+    job_id: UUID,
+    _current_user: CurrentUser,
+    db: AsyncSession = Depends(get_db),
+) -> JobRead:
+    """A job's status and progress, e.g. the one queued by ``POST /plates/{id}/thumbnails``."""
+    job = await db.scalar(select(Job).where(Job.id == job_id))
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return JobRead.model_validate(job)
+
+
+@router.get("/{job_id}/events", response_class=StreamingResponse)
+async def stream_job(
+    job_id: UUID,
+    _current_user: CurrentUser,
+    db: AsyncSession = Depends(get_db),
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_session_maker),
+) -> StreamingResponse:
+    """Stream a job's state as Server-Sent Events until it has finished.
+
+    The first ``job`` event is the current state, each later one a change
+    (see ``app.services.job_events``).
+    """
+    # The stream outlives the request's session; don't hold its connection
+    await db.close()
+    try:
+        subscription = await job_events.subscribe(session_maker, job_topic(job_id))
+    except TimeoutError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Job events are unavailable"
+        ) from exc
+    try:
+        # From the primary, which the events come from, not a lagging replica
+        async with session_maker() as session:
+            job = await session.scalar(select(Job).where(Job.id == job_id))
+        if job is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    except BaseException:
+        subscription.close()
+        raise
+    return event_stream_response(
+        stream_job_events(subscription, [JobEvent.model_validate(job)], until_finished=True)
+    )
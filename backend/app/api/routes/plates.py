@@ -1,16 +1,75 @@
+from typing import Any, Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.api.deps import CurrentUser, get_db, get_pagination
+from app.api.deps import CurrentUser, get_db, get_pagination, get_session_maker, include_param
+from app.api.loaders import PLATE_DELETE_OPTIONS, PLATE_INCLUDES, plate_loader_options
+from app.api.pagination import page_response, paginate_rows
+from app.api.responses import cached_response, json_response, plate_cache_tags, schema_columns
+from app.core.response_cache import ANALYSES_TAG, invalidate_on_commit, plate_tag
+from app.core.storage import StorageBackend, get_storage
+from app.models.cell_dataset import CellDataset
+from app.models.image import Image
 from app.models.plate import Plate
+from app.models.well import Well
+from app.models.well_aggregate import WellAggregate
+from app.schemas.analysis import AnalysisMetric
+from app.schemas.cell_dataset import CellDatasetRead
+from app.schemas.dose_response import DoseResponseFit
+from app.schemas.feature import FeatureUploadResult
 from app.schemas.pagination import PaginatedResponse, PaginationParams
-from app.schemas.plate import PlateCreate, PlateRead, PlateUpdate
+from app.schemas.plate import (
+    PlateCreate,
+    PlateImportResult,
+    PlateLayout,
+    PlateRead,
+    PlateReadWithWells,
+    PlateStatsCreate,
+    PlateStatsRead,
+    PlateThumbnailsRead,
+    PlateTilesRead,
+    PlateUpdate,
+)
+from app.services.cells import (
+    CELL_CONTENT_TYPES,
+    CellDataError,
+    CellUploadTooLargeError,
+    store_cell_dataset,
+)
+from app.services.dose_response import fit_dose_response
+from app.services.export import ExportFormat
+from app.services.features import parse_feature_record, upload_plate_features
+from app.services.jobs import enqueue_job
+from app.services.plate_import import (
+    PlateImportError,
+    import_plate,
+    iter_lines,
+    iter_raw_records,
+    parse_records,
+)
+from app.services.plate_stats import update_plate_statistics
+from app.services.thumbnails import THUMBNAIL_SIZES, TILE_SIZE
 
 router = APIRouter()
 
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "jsonl",
+    "application/jsonl": "jsonl",
+}
+
 
 @router.get("", response_model=PaginatedResponse[PlateRead])
 async def list_plates(
@@ -18,31 +77,118 @@ async def list_plates(
     experiment_id: UUID | None = None,
     db: AsyncSession = Depends(get_db),
     pagination: PaginationParams = Depends(get_pagination),
-) -> PaginatedResponse[PlateRead]:
-    base_query = select(Plate)
+) -> Response:
+    base_query = select(*schema_columns(Plate, PlateRead))
     if experiment_id:
         base_query = base_query.where(Plate.experiment_id == experiment_id)
 
-    count_query = select(func.count()).select_from(base_query.subquery())
-    total = await db.scalar(count_query) or 0
+    page = await paginate_rows(db, base_query, Plate, pagination)
+    return json_response(page_response(PlateRead, page, pagination))
 
-    query = base_query.offset(pagination.offset).limit(pagination.limit)
-    result = await db.execute(query)
-    plates = result.scalars().all()
 
-    return PaginatedResponse.create(
-        items=[PlateRead.model_validate(p) for p in plates],
-        total=total,
-        params=pagination,
+@router.get("/{plate_id}", response_model=PlateRead | PlateReadWithWells)
+async def get_plate(
+    plate_id: UUID,
+    request: Request,
+    _current_user: CurrentUser,
+    db: AsyncSession = Depends(get_db),
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_session_maker),
+    include: frozenset[str] = Depends(include_param(PLATE_INCLUDES)),
+) -> Response:
+    async def build(db: AsyncSession) -> PlateRead | PlateReadWithWells:
+        query = select(Plate).where(Plate.id == plate_id).options(*plate_loader_options(include))
+        result = await db.execute(query)
+        plate = result.scalar_one_or_none()
+
+        if plate is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plate not found")
+
+        if include:
+            return PlateReadWithWells.model_validate(plate)
+        return PlateRead.model_validate(plate)
+
+    return await cached_response(
+        request, plate_cache_tags(plate_id, include), build, db, session_maker
     )
 
 
-@router.get("/{plate_id}", response_model=PlateRead)
-async def get_plate(
+@router.get("/{plate_id}/layout", response_model=PlateLayout)
+async def get_plate_layout(
     plate_id: UUID,
+    request: Request,
     _current_user: CurrentUser,
+    analysis_type: str | None = None,
+    metric: AnalysisMetric = "mean_intensity",
     db: AsyncSession = Depends(get_db),
-) -> PlateRead:
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_session_maker),
+) -> Response:
+    """Return every well of a plate as columnar arrays in a single response.
+
+    Only the columns needed to render the plate heatmap are selected. The
+    optional metric is the well's average for the given analysis type, read
+    from the precomputed well aggregates.
+    """
+
+    async def build(db: AsyncSession) -> PlateLayout:
+        plate_query = select(Plate.rows, Plate.columns).where(Plate.id == plate_id)
+        plate = (await db.execute(plate_query)).one_or_none()
+
+        if plate is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plate not found")
+
+        query: Select[Any] = (
+            select(Well.row, Well.column, Well.well_type, Well.compound_id, Well.concentration)
+            .where(Well.plate_id == plate_id)
+            .order_by(Well.row, Well.column)
+        )
+        if analysis_type is not None:
+            query = query.add_columns(getattr(WellAggregate, metric)).outerjoin(
+                WellAggregate,
+                (WellAggregate.well_id == Well.id) & (WellAggregate.analysis_type == analysis_type),
+            )
+        rows = (await db.execute(query)).all()
+        fields = list(zip(*rows, strict=True)) if rows else [()] * len(query.selected_columns)
+
+        return PlateLayout(
+            plate_id=plate_id,
+            rows=plate.rows,
+            columns=plate.columns,
+            analysis_type=analysis_type,
+            metric=metric if analysis_type is not None else None,
+            row=list(fields[0]),
+            column=list(fields[1]),
+            well_type=list(fields[2]),
+            compound_id=list(fields[3]),
+            concentration=list(fields[4]),
+            values=list(fields[5]) if analysis_type is not None else None,
+        )
+
+    return await cached_response(request, plate_cache_tags(plate_id), build, db, session_maker)
+
+
+@router.post(
+    "/{plate_id}/import",
+    response_model=PlateImportResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {content_type: {} for content_type in IMPORT_CONTENT_TYPES},
+        }
+    },
+)
+async def import_plate_data(
+    plate_id: UUID,
+    request: Request,
+    _current_user: CurrentUser,
+    format: Literal["csv", "jsonl"] | None = None,
+    db: AsyncSession = Depends(get_db),
+) -> PlateImportResult:
+    """Import a whole plate's wells, compounds and analysis values in one request.
+
+    The body is CSV or JSON lines with one record per well (see
+    ``app.services.plate_import``); the format is taken from ``format`` or the
+    Content-Type header. Existing wells are updated in place.
+    """
     query = select(Plate).where(Plate.id == plate_id)
     result = await db.execute(query)
     plate = result.scalar_one_or_none()
@@ -50,7 +196,266 @@ async def get_plate(
     if plate is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plate not found")
 
-    return PlateRead.model_validate(plate)
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    import_format = format or IMPORT_CONTENT_TYPES.get(content_type)
+    if import_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv or application/x-ndjson, or pass ?format=",
+        )
+
+    invalidate_on_commit(db, plate_tag(plate_id), ANALYSES_TAG)
+    try:
+        records = await parse_records(iter_lines(request.stream()), import_format)
+        return await import_plate(db, plate, records)
+    except PlateImportError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+@router.post(
+    "/{plate_id}/features",
+    response_model=FeatureUploadResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {content_type: {} for content_type in IMPORT_CONTENT_TYPES},
+        }
+    },
+)
+async def upload_features(
+    plate_id: UUID,
+    request: Request,
+    _current_user: CurrentUser,
+    format: Literal["csv", "jsonl"] | None = None,
+    db: AsyncSession = Depends(get_db),
+) -> FeatureUploadResult:
+    """Store per-well feature values of a plate, one CSV or JSON-lines record per well.
+
+    Every field other than the well position is a feature named after the
+    field (see ``app.services.features``). Values replace earlier uploads of
+    the same wells and features.
+    """
+    query = select(Plate).where(Plate.id == plate_id)
+    result = await db.execute(query)
+    plate = result.scalar_one_or_none()
+
+    if plate is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plate not found")
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    upload_format = format or IMPORT_CONTENT_TYPES.get(content_type)
+    if upload_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv or application/x-ndjson, or pass ?format=",
+        )
+
+    try:
+        records = [
+            parse_feature_record(raw, line)
+            async for line, raw in iter_raw_records(iter_lines(request.stream()), upload_format)
+        ]
+        return await upload_plate_features(db, plate, records)
+    except PlateImportError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+@router.post(
+    "/{plate_id}/cells",
+    response_model=CellDatasetRead,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {content_type: {} for content_type in CELL_CONTENT_TYPES},
+        }
+    },
+)
+async def upload_cells(
+    plate_id: UUID,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    _current_user: CurrentUser,
+    name: str = Query(..., min_length=1, max_length=100),
+    analysis_type: str | None = Query(None, max_length=100),
+    format: ExportFormat | None = None,
+    db: AsyncSession = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+) -> CellDatasetRead:
+    """Store object-level measurements of a plate, one Parquet, Arrow or CSV record per cell.
+
+    Each cell has its well and any numeric measurements (see
+    ``app.services.cells``). Uploading a dataset ``name`` again replaces it.
+    """
+    query = select(Plate).where(Plate.id == plate_id)
+    result = await db.execute(query)
+    plate = result.scalar_one_or_none()
+
+    if plate is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plate not found")
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    upload_format = format or CELL_CONTENT_TYPES.get(content_type)
+    if upload_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Send one of {', '.join(CELL_CONTENT_TYPES)}, or pass ?format=",
+        )
+
+    try:
+        dataset, replaced = await store_cell_dataset(
+            db, storage, plate, name, analysis_type, upload_format, request.stream()
+        )
+    except CellUploadTooLargeError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(exc)
+        ) from exc
+    except CellDataError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    if replaced is not None:
+        # Background tasks run before get_db commits: commit first, so a failed
+        # commit keeps the old row and its file
+        await db.commit()
+        background_tasks.add_task(storage.delete_many, [replaced])
+    return CellDatasetRead.model_validate(dataset)
+
+
+@router.get("/{plate_id}/cells", response_model=list[CellDatasetRead])
+async def list_cell_datasets(
+    plate_id: UUID,
+    _current_user: CurrentUser,
+    db: AsyncSession = Depends(get_db),
+) -> list[CellDatasetRead]:
+    exists = await db.scalar(select(Plate.id).where(Plate.id == plate_id))
+    if exists is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plate not found")
+
+    query = select(CellDataset).where(CellDataset.plate_id == plate_id).order_by(CellDataset.name)
+    result = await db.execute(query)
+    return [CellDatasetRead.model_validate(d) for d in result.scalars()]
+
+
+@router.post("/{plate_id}/stats", response_model=PlateStatsRead)
+async def compute_plate_stats(
+    plate_id: UUID,
+    stats_in: PlateStatsCreate,
+    _current_user: CurrentUser,
+    db: AsyncSession = Depends(get_db),
+) -> PlateStatsRead:
+    """Compute Z', SSMD, Z-scores and percent effect for one analysis type on a plate.
+
+    The per-well Z-score and percent effect are written back to the analyses.
+    """
+    exists = await db.scalar(select(Plate.id).where(Plate.id == plate_id))
+    if exists is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plate not found")
+
+    invalidate_on_commit(db, plate_tag(plate_id), ANALYSES_TAG)
+    return await update_plate_statistics(
+        db,
+        plate_id,
+        stats_in.analysis_type,
+        metric=stats_in.metric,
+        robust=stats_in.robust,
+    )
+
+
+@router.post(
+    "/{plate_id}/thumbnails",
+    response_model=PlateThumbnailsRead,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def generate_thumbnails(
+    plate_id: UUID,
+    _current_user: CurrentUser,
+    overwrite: bool = False,
+    db: AsyncSession = Depends(get_db),
+) -> PlateThumbnailsRead:
+    """Queue thumbnail generation for a plate's images.
+
+    Images that already have a thumbnail are skipped unless ``overwrite`` is set.
+    """
+    experiment_id = await db.scalar(select(Plate.experiment_id).where(Plate.id == plate_id))
+    if experiment_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plate not found")
+
+    count_query = (
+        select(func.count()).select_from(Image).join(Well).where(Well.plate_id == plate_id)
+    )
+    if not overwrite:
+        count_query = count_query.where(Image.thumbnail_s3_key.is_(None))
+    images = await db.scalar(count_query) or 0
+
+    job = None
+    if images:
+        job = await enqueue_job(
+            db,
+            "thumbnails",
+            {"plate_id": str(plate_id), "overwrite": overwrite},
+            experiment_id=experiment_id,
+        )
+    return PlateThumbnailsRead(
+        plate_id=plate_id,
+        images=images,
+        sizes=list(THUMBNAIL_SIZES),
+        job_id=job.id if job else None,
+    )
+
+
+@router.post(
+    "/{plate_id}/tiles",
+    response_model=PlateTilesRead,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def generate_tiles(
+    plate_id: UUID,
+    _current_user: CurrentUser,
+    overwrite: bool = False,
+    db: AsyncSession = Depends(get_db),
+) -> PlateTilesRead:
+    """Queue generation of the full-resolution tile pyramids of a plate's images.
+
+    Images that already have tiles are skipped unless ``overwrite`` is set.
+    """
+    experiment_id = await db.scalar(select(Plate.experiment_id).where(Plate.id == plate_id))
+    if experiment_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plate not found")
+
+    count_query = (
+        select(func.count()).select_from(Image).join(Well).where(Well.plate_id == plate_id)
+    )
+    if not overwrite:
+        count_query = count_query.where(Image.tile_levels.is_(None))
+    images = await db.scalar(count_query) or 0
+
+    job = None
+    if images:
+        job = await enqueue_job(
+            db,
+            "tiles",
+            {"plate_id": str(plate_id), "overwrite": overwrite},
+            experiment_id=experiment_id,
+        )
+    return PlateTilesRead(
+        plate_id=plate_id, images=images, tile_size=TILE_SIZE, job_id=job.id if job else None
+    )
+
+
+@router.get("/{plate_id}/dose-response", response_model=list[DoseResponseFit])
+async def get_plate_dose_response(
+    plate_id: UUID,
+    analysis_type: str,
+    _current_user: CurrentUser,
+    metric: AnalysisMetric = "mean_intensity",
+    db: AsyncSession = Depends(get_db),
+) -> list[DoseResponseFit]:
+    """Fit a 4PL curve per compound on a single plate; the result is not stored."""
+    exists = await db.scalar(select(Plate.id).where(Plate.id == plate_id))
+    if exists is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plate not found")
+
+    return await fit_dose_response(db, analysis_type, metric, plate_id=plate_id)
 
 
 @router.post("", response_model=PlateRead, status_code=status.HTTP_201_CREATED)
@@ -83,6 +488,7 @@ async def update_plate(
     update_data = plate_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(plate, field, value)
+    invalidate_on_commit(db, plate_tag(plate_id))
 
     await db.flush()
     await db.refresh(plate)
@@ -95,11 +501,12 @@ async def delete_plate(
     _current_user: CurrentUser,
     db: AsyncSession = Depends(get_db),
 ) -> None:
-    query = select(Plate).where(Plate.id == plate_id)
+    query = select(Plate).where(Plate.id == plate_id).options(*PLATE_DELETE_OPTIONS)
     result = await db.execute(query)
     plate = result.scalar_one_or_none()
 
     if plate is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plate not found")
 
+    invalidate_on_commit(db, plate_tag(plate_id), ANALYSES_TAG)
     await db.delete(plate)
@@ -1,13 +1,21 @@
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import CurrentUser, get_db, get_pagination
+from app.api.deps import CurrentUser, get_db, get_pagination, include_param
+from app.api.loaders import PROJECT_DELETE_OPTIONS, PROJECT_INCLUDES, project_loader_options
+from app.api.pagination import paginate
+from app.core.response_cache import ANALYSES_TAG, PLATES_TAG, invalidate_on_commit
 from app.models.project import Project
 from app.schemas.pagination import PaginatedResponse, PaginationParams
-from app.schemas.project import ProjectCreate, ProjectRead, ProjectUpdate
+from app.schemas.project import (
+    ProjectCreate,
+    ProjectRead,
+    ProjectReadWithExperiments,
+    ProjectUpdate,
+)
 
 router = APIRouter()
 
@@ -18,33 +26,34 @@ async def list_projects(
     db: AsyncSession = Depends(get_db),
     pagination: PaginationParams = Depends(get_pagination),
 ) -> PaginatedResponse[ProjectRead]:
-    count_query = select(func.count()).select_from(Project)
-    total = await db.scalar(count_query) or 0
-
-    query = select(Project).offset(pagination.offset).limit(pagination.limit)
-    result = await db.execute(query)
-    projects = result.scalars().all()
+    page = await paginate(db, select(Project), Project, pagination)
 
     return PaginatedResponse.create(
-        items=[ProjectRead.model_validate(p) for p in projects],
-        total=total,
+        items=[ProjectRead.model_validate(p) for p in page.items],
+        total=page.total,
         params=pagination,
+        next_cursor=page.next_cursor,
     )
 
 
-@router.get("/{project_id}", response_model=ProjectRead)
+@router.get("/{project_id}", response_model=ProjectRead | ProjectReadWithExperiments)
 async def get_project(
     project_id: UUID,
     _current_user: CurrentUser,
     db: AsyncSession = Depends(get_db),
-) -> ProjectRead:
-    query = select(Project).where(Project.id == project_id)
+    include: frozenset[str] = Depends(include_param(PROJECT_INCLUDES)),
+) -> ProjectRead | ProjectReadWithExperiments:
+    query = (
+        select(Project).where(Project.id == project_id).options(*project_loader_options(include))
+    )
     result = await db.execute(query)
     project = result.scalar_one_or_none()
 
     if project is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
 
+    if include:
+        return ProjectReadWithExperiments.model_validate(project)
     return ProjectRead.model_validate(project)
 
 
@@ -90,11 +99,13 @@ async def delete_project(
     _current_user: CurrentUser,
     db: AsyncSession = Depends(get_db),
 ) -> None:
-    query = select(Project).where(Project.id == project_id)
+    query = select(Project).where(Project.id == project_id).options(*PROJECT_DELETE_OPTIONS)
     result = await db.execute(query)
     project = result.scalar_one_or_none()
 
     if project is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
 
+    # Deleting cascades to plates and their analyses
+    invalidate_on_commit(db, PLATES_TAG, ANALYSES_TAG)
     await db.delete(project)
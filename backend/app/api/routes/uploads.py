@@ -0,0 +1,142 @@
+from uuid import UUID
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    Header,
+    HTTPException,
+    Path,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.deps import CurrentUser, get_db, get_session_maker
+from app.core.storage import ObjectNotFoundError, StorageBackend, get_storage
+from app.models.upload import Upload
+from app.schemas.upload import SHA256_PATTERN, UploadCreate, UploadPartRead, UploadRead
+from app.services.uploads import (
+    MAX_UPLOAD_PARTS,
+    UploadConflictError,
+    UploadError,
+    UploadNotFoundError,
+    complete_upload,
+    create_upload,
+    store_upload_part,
+    upload_read,
+)
+
+router = APIRouter()
+
+
+def _upload_error(exc: UploadError | UploadNotFoundError) -> HTTPException:
+    if isinstance(exc, UploadNotFoundError):
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+    if isinstance(exc, UploadConflictError):
+        return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+async def _get_upload(db: AsyncSession, upload_id: UUID) -> Upload:
+    upload = await db.scalar(select(Upload).where(Upload.id == upload_id))
+    if upload is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+    return upload
+
+
+@router.post("", response_model=UploadRead, status_code=status.HTTP_201_CREATED)
+async def start_upload(
+    upload_in: UploadCreate,
+    response: Response,
+    _current_user: CurrentUser,
+    db: AsyncSession = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+) -> UploadRead:
+    """Start a resumable upload (see ``app.services.uploads``).
+
+    Content uploaded before is answered with 200 and the existing upload:
+    finished, or with ``parts_received`` listing the parts not to send again.
+    """
+    try:
+        upload, created = await create_upload(db, storage, upload_in)
+    except UploadError as exc:
+        raise _upload_error(exc) from exc
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    return await upload_read(db, upload)
+
+
+@router.get("/{upload_id}", response_model=UploadRead)
+async def get_upload(
+    upload_id: UUID,
+    _current_user: CurrentUser,
+    db: AsyncSession = Depends(get_db),
+) -> UploadRead:
+    return await upload_read(db, await _get_upload(db, upload_id))
+
+
+@router.put("/{upload_id}/parts/{part_number}", response_model=UploadPartRead)
+async def put_upload_part(
+    upload_id: UUID,
+    request: Request,
+    _current_user: CurrentUser,
+    part_number: int = Path(ge=1, le=MAX_UPLOAD_PARTS),
+    checksum: str = Header(alias="X-Checksum-SHA256", pattern=SHA256_PATTERN),
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_session_maker),
+    storage: StorageBackend = Depends(get_storage),
+) -> UploadPartRead:
+    """Upload one part as the raw request body, with its hex SHA-256 in ``X-Checksum-SHA256``.
+
+    Every part but the last is exactly ``part_size`` bytes. Sending a part
+    again replaces it.
+    """
+    try:
+        return await store_upload_part(
+            session_maker, storage, upload_id, part_number, checksum, request.stream()
+        )
+    except (UploadError, UploadNotFoundError) as exc:
+        raise _upload_error(exc) from exc
+    except ObjectNotFoundError as exc:
+        # The storage backend no longer has the multipart upload
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="The upload was aborted"
+        ) from exc
+
+
+@router.post("/{upload_id}/complete", response_model=UploadRead)
+async def finish_upload(
+    upload_id: UUID,
+    _current_user: CurrentUser,
+    db: AsyncSession = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+) -> UploadRead:
+    """Join the parts into ``storage_key`` once every part is received."""
+    try:
+        upload = await complete_upload(db, storage, upload_id)
+    except (UploadError, UploadNotFoundError) as exc:
+        raise _upload_error(exc) from exc
+    return await upload_read(db, upload)
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload(
+    upload_id: UUID,
+    background_tasks: BackgroundTasks,
+    _current_user: CurrentUser,
+    db: AsyncSession = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+) -> None:
+    """Discard an unfinished upload and the parts received so far."""
+    upload = await _get_upload(db, upload_id)
+    if upload.multipart_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Finished uploads cannot be aborted"
+        )
+    await db.delete(upload)
+    # Background tasks run before get_db commits: commit first, so a failed
+    # commit keeps the row and its multipart upload
+    await db.commit()
+    background_tasks.add_task(storage.abort_multipart, upload.storage_key, upload.multipart_id)
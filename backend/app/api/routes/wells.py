@@ -1,58 +1,130 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.api.deps import CurrentUser, get_db, get_pagination
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.deps import CurrentUser, get_db, get_pagination, get_session_maker, include_param
+from app.api.loaders import WELL_DELETE_OPTIONS, WELL_INCLUDES, well_loader_options
+from app.api.pagination import page_response, paginate, paginate_rows
+from app.api.responses import (
+    CACHED_READ_CACHE_CONTROL,
+    cached_response,
+    etag_matches,
+    json_response,
+    plate_cache_tags,
+    schema_columns,
+)
+from app.core.response_cache import invalidate_on_commit, plate_tag
+from app.core.storage import ObjectNotFoundError, StorageBackend, get_storage
 from app.models.well import Well
 from app.schemas.pagination import PaginatedResponse, PaginationParams
-from app.schemas.well import WellCreate, WellRead, WellUpdate
+from app.schemas.well import WellCreate, WellRead, WellReadWithRelations, WellUpdate
+from app.services.composites import (
+    COMPOSITE_MEDIA_TYPES,
+    CompositeError,
+    CompositeFormat,
+    CompositeNotFoundError,
+    composite_content,
+    parse_channels,
+    plan_composite,
+)
 
 router = APIRouter()
 
 
-@router.get("", response_model=PaginatedResponse[WellRead])
+@router.get("", response_model=PaginatedResponse[WellRead | WellReadWithRelations])
 async def list_wells(
+    request: Request,
     _current_user: CurrentUser,
     plate_id: UUID | None = None,
     db: AsyncSession = Depends(get_db),
+    session_maker: async_sessionmaker[AsyncSession] = Depends(get_session_maker),
     pagination: PaginationParams = Depends(get_pagination),
-) -> PaginatedResponse[WellRead]:
-    base_query = select(Well)
-    if plate_id:
-        base_query = base_query.where(Well.plate_id == plate_id)
-
-    count_query = select(func.count()).select_from(base_query.subquery())
-    total = await db.scalar(count_query) or 0
-
-    query = base_query.offset(pagination.offset).limit(pagination.limit)
-    result = await db.execute(query)
-    wells = result.scalars().all()
-
-    return PaginatedResponse.create(
-        items=[WellRead.model_validate(w) for w in wells],
-        total=total,
-        params=pagination,
+    include: frozenset[str] = Depends(include_param(WELL_INCLUDES)),
+) -> Response:
+    async def build(
+        db: AsyncSession,
+    ) -> PaginatedResponse[WellRead] | PaginatedResponse[WellReadWithRelations]:
+        filters = [Well.plate_id == plate_id] if plate_id else []
+        if include:
+            query = select(Well).where(*filters).options(*well_loader_options(include))
+            return page_response(
+                WellReadWithRelations, await paginate(db, query, Well, pagination), pagination
+            )
+        # Without relations, rows are validated straight into WellRead
+        rows = select(*schema_columns(Well, WellRead)).where(*filters)
+        return page_response(WellRead, await paginate_rows(db, rows, Well, pagination), pagination)
+
+    # Only one plate's wells are cached; an unfiltered listing changes with every plate
+    if plate_id is None:
+        return json_response(await build(db))
+    return await cached_response(
+        request, plate_cache_tags(plate_id, include), build, db, session_maker
     )
 
 
-@router.get("/{well_id}", response_model=WellRead)
+@router.get("/{well_id}", response_model=WellRead | WellReadWithRelations)
 async def get_well(
     well_id: UUID,
     _current_user: CurrentUser,
     db: AsyncSession = Depends(get_db),
-) -> WellRead:
-    query = select(Well).where(Well.id == well_id)
+    include: frozenset[str] = Depends(include_param(WELL_INCLUDES)),
+) -> WellRead | WellReadWithRelations:
+    query = select(Well).where(Well.id == well_id).options(*well_loader_options(include))
     result = await db.execute(query)
     well = result.scalar_one_or_none()
 
     if well is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Well not found")
 
+    if include:
+        return WellReadWithRelations.model_validate(well)
     return WellRead.model_validate(well)
 
 
+@router.get("/{well_id}/composite", response_class=Response)
+async def get_well_composite(
+    well_id: UUID,
+    request: Request,
+    _current_user: CurrentUser,
+    channels: str | None = Query(
+        default=None,
+        description="NAME[:COLOR[:LOW-HIGH]],... e.g. DAPI:blue:100-3000,GFP:green; "
+        "every channel of the field, auto-contrasted, when omitted",
+    ),
+    field: int = Query(default=0, ge=0),
+    size: int = Query(default=512, ge=16, le=4096, description="Longest edge in pixels"),
+    format: CompositeFormat = "png",
+    db: AsyncSession = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+) -> Response:
+    """Render the channels of a field as one 8-bit RGB image (see ``app.services.composites``).
+
+    Colours are names (``blue``, ``green``, ...) or ``#rrggbb``; windows are raw
+    intensities. Images are never upscaled.
+    """
+    try:
+        plan = await plan_composite(
+            db, well_id, parse_channels(channels or ""), field, size, format
+        )
+    except CompositeError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except CompositeNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+
+    headers = {"ETag": plan.etag, "Cache-Control": CACHED_READ_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), plan.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    try:
+        content = await composite_content(storage, plan)
+    except ObjectNotFoundError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Image content not found"
+        ) from exc
+    return Response(content, media_type=COMPOSITE_MEDIA_TYPES[format], headers=headers)
+
+
 @router.post("", response_model=WellRead, status_code=status.HTTP_201_CREATED)
 async def create_well(
     well_in: WellCreate,
@@ -61,6 +133,7 @@ async def create_well(
 ) -> WellRead:
     well = Well(**well_in.model_dump())
     db.add(well)
+    invalidate_on_commit(db, plate_tag(well.plate_id))
     await db.flush()
     await db.refresh(well)
     return WellRead.model_validate(well)
@@ -83,6 +156,7 @@ async def update_well(
     update_data = well_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(well, field, value)
+    invalidate_on_commit(db, plate_tag(well.plate_id))
 
     await db.flush()
     await db.refresh(well)
@@ -95,11 +169,12 @@ async def delete_well(
     _current_user: CurrentUser,
     db: AsyncSession = Depends(get_db),
 ) -> None:
-    query = select(Well).where(Well.id == well_id)
+    query = select(Well).where(Well.id == well_id).options(*WELL_DELETE_OPTIONS)
     result = await db.execute(query)
     well = result.scalar_one_or_none()
 
     if well is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Well not found")
 
+    invalidate_on_commit(db, plate_tag(well.plate_id))
     await db.delete(well)
@@ -1,4 +1,3 @@
 from app.core.config import settings
-from app.core.database import get_db
 
-__all__ = ["settings", "get_db"]
+__all__ = ["settings"]
@@ -1,31 +1,62 @@
-from collections.abc import AsyncGenerator
-
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from typing import Any
+
+from sqlalchemy import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
 
 from app.core.config import settings
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,
-)
+
+def create_engine(url: str) -> AsyncEngine:
+    """Create an engine with the pool and statement cache settings.
+
+    Each process holds up to ``db_pool_size + db_max_overflow`` connections per
+    engine, so size these for the number of workers sharing one server.
+    """
+    options: dict[str, Any] = {"echo": settings.debug}
+    if make_url(url).get_backend_name() == "postgresql":
+        options |= {
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout": settings.db_pool_timeout,
+            "pool_recycle": settings.db_pool_recycle,
+            "pool_pre_ping": settings.db_pool_pre_ping,
+            # Prepared statements cached per connection (asyncpg); 0 behind PgBouncer
+            # in transaction mode
+            "connect_args": {
+                "prepared_statement_cache_size": settings.db_statement_cache_size,
+                "statement_cache_size": settings.db_statement_cache_size,
+            },
+        }
+    return create_async_engine(url, **options)
+
+
+engine = create_engine(settings.database_url)
+# Reads go to the replica when one is configured
+read_engine = create_engine(settings.database_read_url) if settings.database_read_url else engine
 
 async_session_maker = async_sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False,
 )
+async_read_session_maker = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
 
 
-class Base(DeclarativeBase):
-    pass
+async def dispose_engines() -> None:
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    async with async_session_maker() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
+class Base(DeclarativeBase):
+    pass
@@ -0,0 +1,36 @@
+"""In-process rate limiting."""
+
+import time
+
+from app.core.cache import TTLCache
+
+
+class RateLimiter:
+    """Token bucket per key: ``attempts`` per ``window`` seconds, refilled continuously.
+
+    Buckets idle for a whole window are full again and are dropped, so memory
+    is bounded by the keys seen recently (at most ``maxsize``). Like
+    ``TTLCache`` it is meant for one event loop and limits per process.
+    """
+
+    def __init__(self, attempts: int, window: float, maxsize: int = 65536) -> None:
+        self.attempts = attempts
+        self.window = window
+        self._buckets: TTLCache[str, tuple[float, float]] = TTLCache(maxsize, ttl=window)
+
+    def hit(self, key: str) -> float:
+        """Take one attempt for ``key``; return 0 if allowed, else seconds until it would be."""
+        if self.attempts <= 0:
+            return 0.0
+        rate = self.attempts / self.window
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key) or (float(self.attempts), now)
+        tokens = min(float(self.attempts), tokens + (now - updated) * rate)
+        if tokens < 1:
+            self._buckets.set(key, (tokens, now))
+            return (1 - tokens) / rate
+        self._buckets.set(key, (tokens - 1, now))
+        return 0.0
+
+    def clear(self) -> None:
+        self._buckets.clear()
@@ -0,0 +1,172 @@
+"""Cache of serialized GET responses, invalidated by tag.
+
+A cached response is stored under its URL plus the current *generation* of
+every tag it depends on, e.g. ``plate:<id>`` for everything derived from one
+plate. Writes bump the generations of the tags they touch, so entries built
+from older data are never looked up again and simply age out; nothing has
+to enumerate or delete them.
+
+The backend is chosen with ``settings.response_cache_backend``:
+
+- ``memory`` keeps entries in a per-process LRU; another worker's writes are
+  only seen once ``settings.response_cache_ttl_seconds`` has passed
+- ``redis`` shares entries and generations between workers through
+  ``settings.redis_url``; needs the ``redis`` extra
+- ``none`` disables caching
+"""
+
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# Everything derived from plates; bumped by writes reaching into many plates at once
+PLATES_TAG = "plates"
+# Responses embedding rows that are written independently of their plate
+ANALYSES_TAG = "analyses"
+COMPOUNDS_TAG = "compounds"
+IMAGES_TAG = "images"
+
+# Session.info key holding the tags to invalidate once the session commits
+PENDING_TAGS_KEY = "invalidate_response_tags"
+
+
+def plate_tag(plate_id: UUID) -> str:
+    return f"plate:{plate_id}"
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    # Quoted, ready for the ETag header
+    etag: str
+    body: bytes
+
+
+class ResponseCache(ABC):
+    @abstractmethod
+    async def generations(self, tags: Sequence[str]) -> list[int]:
+        """Return the current generation of each tag."""
+
+    @abstractmethod
+    async def bump(self, tags: Iterable[str]) -> None:
+        """Invalidate every entry stored under the current generation of ``tags``."""
+
+    @abstractmethod
+    async def get(self, key: str) -> CachedResponse | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, response: CachedResponse) -> None: ...
+
+    async def close(self) -> None:  # noqa: B027 - optional hook, a no-op by default
+        """Release connections held by the backend."""
+
+
+class MemoryResponseCache(ResponseCache):
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.entries: TTLCache[str, CachedResponse] = TTLCache(maxsize, ttl)
+        # One counter per tag ever written; they must never go back to an old value
+        self.tag_generations: dict[str, int] = {}
+
+    async def generations(self, tags: Sequence[str]) -> list[int]:
+        return [self.tag_generations.get(tag, 0) for tag in tags]
+
+    async def bump(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            self.tag_generations[tag] = self.tag_generations.get(tag, 0) + 1
+
+    async def get(self, key: str) -> CachedResponse | None:
+        return self.entries.get(key)
+
+    async def set(self, key: str, response: CachedResponse) -> None:
+        self.entries.set(key, response)
+
+
+class RedisResponseCache(ResponseCache):
+    """Entries and generations shared by all workers through Redis.
+
+    Entries expire after ``ttl`` seconds; generation counters do not expire.
+    """
+
+    def __init__(self, url: str, ttl: float, prefix: str = "screen-ai:") -> None:
+        try:
+            from redis.asyncio import Redis
+        except ImportError as exc:
+            raise RuntimeError(
+                "The redis cache needs the 'redis' extra: uv sync --extra redis"
+            ) from exc
+        self.client: Any = Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def generations(self, tags: Sequence[str]) -> list[int]:
+        if not tags:
+            return []
+        values = await self.client.mget([f"{self.prefix}gen:{tag}" for tag in tags])
+        return [int(value or 0) for value in values]
+
+    async def bump(self, tags: Iterable[str]) -> None:
+        async with self.client.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.incr(f"{self.prefix}gen:{tag}")
+            await pipe.execute()
+
+    async def get(self, key: str) -> CachedResponse | None:
+        value = await self.client.get(f"{self.prefix}response:{key}")
+        if value is None:
+            return None
+        etag, _, body = value.partition(b"\n")
+        return CachedResponse(etag=etag.decode(), body=body)
+
+    async def set(self, key: str, response: CachedResponse) -> None:
+        value = response.etag.encode() + b"\n" + response.body
+        await self.client.set(f"{self.prefix}response:{key}", value, px=int(self.ttl * 1000))
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+@lru_cache
+def get_response_cache() -> ResponseCache | None:
+    """The process-wide response cache, or None when caching is disabled."""
+    if settings.response_cache_backend == "none" or settings.response_cache_ttl_seconds <= 0:
+        return None
+    if settings.response_cache_backend == "redis":
+        return RedisResponseCache(settings.redis_url, settings.response_cache_ttl_seconds)
+    return MemoryResponseCache(settings.response_cache_size, settings.response_cache_ttl_seconds)
+
+
+async def close_response_cache() -> None:
+    if get_response_cache.cache_info().currsize:
+        cache = get_response_cache()
+        if cache is not None:
+            await cache.close()
+
+
+async def invalidate_tags(*tags: str) -> None:
+    """Invalidate cached responses now; for writes committed outside a request session."""
+    cache = get_response_cache()
+    if cache is not None and tags:
+        await cache.bump(tags)
+
+
+def invalidate_on_commit(session: AsyncSession, *tags: str) -> None:
+    """Invalidate cached responses once ``session`` commits (see ``invalidate_committed``).
+
+    Bumping only after the commit means a concurrent read cannot re-cache the
+    old rows under the new generation.
+    """
+    session.info.setdefault(PENDING_TAGS_KEY, set()).update(tags)
+
+
+async def invalidate_committed(session: AsyncSession) -> None:
+    """Apply the invalidations recorded on a session that has just committed."""
+    tags = session.info.pop(PENDING_TAGS_KEY, None)
+    if tags:
+        await invalidate_tags(*sorted(tags))
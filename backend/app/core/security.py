@@ -1,4 +1,10 @@
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import UTC, datetime, timedelta
+from typing import Any
 
 import bcrypt
 from jose import jwt
@@ -21,17 +27,119 @@ def get_password_hash(password: str) -> str:
     return hashed.decode("utf-8")
 
 
-def create_access_token(subject: str, expires_delta: timedelta | None = None) -> str:
-    """Create a JWT access token."""
+# bcrypt is deliberately slow (~250 ms) but releases the GIL, so async code runs
+# it in a small dedicated thread pool instead of blocking the event loop. The
+# pool is kept apart from the default executor so a burst of logins cannot
+# starve other to_thread work, and its queue is bounded.
+
+
+class HashingBusyError(RuntimeError):
+    """Raised when the password hashing queue is full."""
+
+
+@dataclass
+class HashingStats:
+    workers: int
+    max_queue: int
+    # Hashes submitted and not yet finished, running or queued
+    pending: int = 0
+    completed: int = 0
+    rejected: int = 0
+    wait_seconds_total: float = 0.0
+    hash_seconds_total: float = 0.0
+
+    def snapshot(self) -> dict[str, float | int]:
+        running = min(self.pending, self.workers)
+        return {
+            **asdict(self),
+            "running": running,
+            "queued": self.pending - running,
+            "wait_seconds_avg": self.wait_seconds_total / self.completed if self.completed else 0.0,
+        }
+
+
+_hashing_pool: ThreadPoolExecutor | None = None
+hashing_stats = HashingStats(
+    workers=settings.password_hash_workers, max_queue=settings.password_hash_max_queue
+)
+
+
+def get_hashing_pool() -> ThreadPoolExecutor:
+    """The shared password hashing pool, started on first use."""
+    global _hashing_pool
+    if _hashing_pool is None:
+        _hashing_pool = ThreadPoolExecutor(
+            max_workers=hashing_stats.workers, thread_name_prefix="password-hash"
+        )
+    return _hashing_pool
+
+
+def shutdown_hashing_pool() -> None:
+    global _hashing_pool
+    if _hashing_pool is not None:
+        _hashing_pool.shutdown(cancel_futures=True)
+        _hashing_pool = None
+
+
+def _timed[T](func: Callable[..., T], *args: Any) -> tuple[float, T]:
+    started = time.perf_counter()
+    return started, func(*args)
+
+
+async def _run_hashing[T](func: Callable[..., T], *args: Any) -> T:
+    stats = hashing_stats
+    if stats.pending >= stats.workers + stats.max_queue:
+        stats.rejected += 1
+        raise HashingBusyError("Password hashing queue is full")
+    stats.pending += 1
+    submitted = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        started, result = await loop.run_in_executor(get_hashing_pool(), _timed, func, *args)
+    finally:
+        stats.pending -= 1
+    stats.completed += 1
+    stats.wait_seconds_total += started - submitted
+    stats.hash_seconds_total += time.perf_counter() - started
+    return result
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """``verify_password`` in the hashing pool; raises ``HashingBusyError``."""
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """``get_password_hash`` in the hashing pool; raises ``HashingBusyError``."""
+    return await _run_hashing(get_password_hash, password)
+
+
+def create_access_token(
+    subject: str,
+    expires_delta: timedelta | None = None,
+    claims: dict[str, Any] | None = None,
+) -> str:
+    """Create a JWT access token, optionally carrying extra signed claims."""
     if expires_delta:
         expire = datetime.now(UTC) + expires_delta
     else:
         expire = datetime.now(UTC) + timedelta(minutes=settings.access_token_expire_minutes)
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {**(claims or {}), "exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.jwt_algorithm)
     return encoded_jwt
 
 
+def decode_access_token_claims(token: str) -> dict[str, Any] | None:
+    """Decode and verify a JWT access token and return all of its claims."""
+    try:
+        claims: dict[str, Any] = jwt.decode(
+            token, settings.secret_key, algorithms=[settings.jwt_algorithm]
+        )
+    except jwt.JWTError:
+        return None
+    return claims
+
+
 def decode_access_token(token: str) -> str | None:
     """Decode a JWT access token and return the subject (user id)."""
     try:
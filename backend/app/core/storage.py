@@ -0,0 +1,530 @@
+"""Object storage for source images and derived files.
+
+Keys are slash-separated paths, the same as S3 object keys. The backend is
+chosen with ``settings.storage_backend``:
+
+- ``local`` keeps objects as files below ``settings.storage_local_path``
+- ``s3`` uses ``settings.s3_bucket`` on AWS or an S3-compatible service such
+  as MinIO (``settings.s3_endpoint_url``); needs the ``s3`` extra
+- ``memory`` keeps objects in a dict, for tests and development
+
+One backend instance is shared by the whole process (``get_storage``) and
+bounds its concurrent I/O operations with ``settings.storage_max_concurrency``.
+
+Large files are written with multipart uploads: parts are streamed in one at
+a time, in any order, and joined into the object on completion. S3 uses its
+native multipart API; the local backend keeps parts under ``.multipart/`` in
+the storage root until they are joined.
+"""
+
+import asyncio
+import hashlib
+import mimetypes
+import mmap
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import batched
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from app.core.config import settings
+
+# Bytes read per chunk when streaming an object
+CHUNK_SIZE = 1024 * 1024
+# Keys per S3 DeleteObjects request (the API maximum)
+S3_DELETE_BATCH = 1000
+
+
+class ObjectNotFoundError(LookupError):
+    """Raised when a key does not exist in the storage backend."""
+
+
+@dataclass(frozen=True)
+class ObjectInfo:
+    size: int
+    # Opaque validator that changes whenever the content does (unquoted)
+    etag: str
+    content_type: str | None = None
+
+
+class StorageBackend(ABC):
+    def __init__(self, max_concurrency: int = 32) -> None:
+        # Bounds concurrent I/O operations (threads for local files, connections for S3)
+        self.limit = asyncio.Semaphore(max_concurrency)
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        """Return the whole object; raises ``ObjectNotFoundError``."""
+
+    @abstractmethod
+    async def put(self, key: str, data: bytes, content_type: str | None = None) -> None:
+        """Create or replace an object."""
+
+    @abstractmethod
+    async def head(self, key: str) -> ObjectInfo:
+        """Return the object's size and ETag; raises ``ObjectNotFoundError``."""
+
+    @abstractmethod
+    def stream(
+        self, key: str, start: int = 0, end: int | None = None, chunk_size: int = CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """Yield bytes ``[start, end)`` of the object in chunks; ``end=None`` reads to the end."""
+
+    @abstractmethod
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        """Delete objects; keys that do not exist are ignored."""
+
+    @abstractmethod
+    async def create_multipart(self, key: str, content_type: str | None = None) -> str:
+        """Start a multipart upload of ``key`` and return its upload ID."""
+
+    @abstractmethod
+    async def put_part(
+        self, key: str, upload_id: str, part_number: int, chunks: AsyncIterable[bytes]
+    ) -> str:
+        """Store part ``part_number`` (from 1) from a stream, replacing an earlier copy.
+
+        The earlier copy is only replaced once ``chunks`` is exhausted: if it
+        raises, e.g. on a checksum mismatch, the earlier copy is kept. Returns
+        the part's ETag, needed to complete the upload.
+        """
+
+    @abstractmethod
+    async def complete_multipart(
+        self, key: str, upload_id: str, parts: list[tuple[int, str]]
+    ) -> None:
+        """Join ``(part number, ETag)`` parts, in order, into the object ``key``."""
+
+    @abstractmethod
+    async def abort_multipart(self, key: str, upload_id: str) -> None:
+        """Discard an unfinished upload and its parts."""
+
+    async def presign(self, key: str, expires_in: int) -> str | None:
+        """Return a time-limited URL serving the object directly, if the backend has one."""
+        return None
+
+    def local_path(self, key: str) -> Path | None:
+        """Return the object's file when it lives on the local filesystem."""
+        return None
+
+    async def close(self) -> None:  # noqa: B027 - optional hook, a no-op by default
+        """Release connections held by the backend."""
+
+
+class LocalStorage(StorageBackend):
+    def __init__(self, root: str | Path, max_concurrency: int = 32) -> None:
+        super().__init__(max_concurrency)
+        self.root = Path(root).resolve()
+
+    def path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root):
+            raise ValueError(f"Storage key escapes the storage root: {key!r}")
+        return path
+
+    def local_path(self, key: str) -> Path:
+        return self.path(key)
+
+    async def get(self, key: str) -> bytes:
+        try:
+            async with self.limit:
+                return await asyncio.to_thread(self.path(key).read_bytes)
+        except FileNotFoundError as exc:
+            raise ObjectNotFoundError(key) from exc
+
+    async def put(self, key: str, data: bytes, content_type: str | None = None) -> None:
+        async with self.limit:
+            await asyncio.to_thread(self._write, self.path(key), data)
+
+    async def head(self, key: str) -> ObjectInfo:
+        try:
+            async with self.limit:
+                stat = await asyncio.to_thread(self.path(key).stat)
+        except FileNotFoundError as exc:
+            raise ObjectNotFoundError(key) from exc
+        # Objects are replaced by rename, so size and mtime change with the content
+        return ObjectInfo(
+            size=stat.st_size,
+            etag=f"{stat.st_size:x}-{stat.st_mtime_ns:x}",
+            content_type=mimetypes.guess_type(key)[0],
+        )
+
+    async def stream(
+        self, key: str, start: int = 0, end: int | None = None, chunk_size: int = CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """Stream from a read-only memory map instead of a thread hop per ``read``.
+
+        The kernel is asked to read ahead each next chunk while the current one
+        is sent, so page faults on a cold file rarely stall the event loop.
+        """
+        try:
+            async with self.limit:
+                handle = await asyncio.to_thread(self.path(key).open, "rb")
+        except FileNotFoundError as exc:
+            raise ObjectNotFoundError(key) from exc
+        with handle:
+            size = os.fstat(handle.fileno()).st_size
+            end = size if end is None else min(end, size)
+            if start >= end:
+                return
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for offset in range(start, end, chunk_size):
+                    upcoming = offset + chunk_size
+                    if upcoming < end and hasattr(mmap, "MADV_WILLNEED"):
+                        aligned = upcoming - upcoming % mmap.PAGESIZE
+                        length = min(chunk_size, end - aligned)
+                        mapped.madvise(mmap.MADV_WILLNEED, aligned, length)
+                    yield mapped[offset : min(upcoming, end)]
+
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        paths = [self.path(key) for key in keys]
+        async with self.limit:
+            await asyncio.to_thread(self._unlink, paths)
+
+    def _parts(self, upload_id: str) -> Path:
+        return self.root / ".multipart" / upload_id
+
+    async def create_multipart(self, key: str, content_type: str | None = None) -> str:
+        upload_id = uuid4().hex
+        async with self.limit:
+            await asyncio.to_thread(self._parts(upload_id).mkdir, parents=True)
+        return upload_id
+
+    async def put_part(
+        self, key: str, upload_id: str, part_number: int, chunks: AsyncIterable[bytes]
+    ) -> str:
+        part = self._parts(upload_id) / str(part_number)
+        partial = part.with_name(f".{part.name}.{uuid4().hex}.partial")
+        try:
+            handle = await asyncio.to_thread(partial.open, "wb")
+        except FileNotFoundError as exc:
+            raise ObjectNotFoundError(upload_id) from exc
+        try:
+            with handle:
+                async for chunk in chunks:
+                    async with self.limit:
+                        await asyncio.to_thread(handle.write, chunk)
+            stat = await asyncio.to_thread(partial.stat)
+            await asyncio.to_thread(partial.replace, part)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+        return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+    async def complete_multipart(
+        self, key: str, upload_id: str, parts: list[tuple[int, str]]
+    ) -> None:
+        paths = [self._parts(upload_id) / str(number) for number, _ in parts]
+        async with self.limit:
+            await asyncio.to_thread(self._join, paths, self.path(key))
+            await asyncio.to_thread(shutil.rmtree, self._parts(upload_id), ignore_errors=True)
+
+    async def abort_multipart(self, key: str, upload_id: str) -> None:
+        async with self.limit:
+            await asyncio.to_thread(shutil.rmtree, self._parts(upload_id), ignore_errors=True)
+
+    @staticmethod
+    def _join(paths: list[Path], path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f".{path.name}.{uuid4().hex}.partial")
+        try:
+            with partial.open("wb") as target:
+                for part in paths:
+                    with part.open("rb") as source:
+                        if not hasattr(os, "copy_file_range"):
+                            shutil.copyfileobj(source, target, CHUNK_SIZE)
+                            continue
+                        # Copied in the kernel (or reflinked) without passing through Python
+                        while os.copy_file_range(source.fileno(), target.fileno(), 1 << 30):
+                            pass
+            partial.replace(path)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def _unlink(paths: list[Path]) -> None:
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        # Write to a sibling and rename so readers never see a partial object; the
+        # sibling is unique per write, as threads of one process may write the same key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f".{path.name}.{uuid4().hex}.partial")
+        try:
+            partial.write_bytes(data)
+            partial.replace(path)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+
+
+class S3Storage(StorageBackend):
+    """S3 or S3-compatible storage through one pooled aiobotocore client.
+
+    The client is created on first use and reused by every request; its
+    connection pool is sized to ``max_concurrency``.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        region: str,
+        endpoint_url: str | None = None,
+        access_key_id: str | None = None,
+        secret_access_key: str | None = None,
+        max_concurrency: int = 32,
+    ) -> None:
+        super().__init__(max_concurrency)
+        self.bucket = bucket
+        self.max_concurrency = max_concurrency
+        self._client_options = {
+            "region_name": region,
+            "endpoint_url": endpoint_url or None,
+            "aws_access_key_id": access_key_id or None,
+            "aws_secret_access_key": secret_access_key or None,
+        }
+        self._client: Any = None
+        self._exit_stack: AsyncExitStack | None = None
+        self._client_lock = asyncio.Lock()
+
+    async def client(self) -> Any:
+        if self._client is None:
+            async with self._client_lock:
+                if self._client is None:
+                    try:
+                        from aiobotocore.config import AioConfig
+                        from aiobotocore.session import get_session
+                    except ImportError as exc:
+                        raise RuntimeError(
+                            "S3 storage needs the 's3' extra: uv sync --extra s3"
+                        ) from exc
+                    stack = AsyncExitStack()
+                    self._client = await stack.enter_async_context(
+                        get_session().create_client(
+                            "s3",
+                            config=AioConfig(max_pool_connections=self.max_concurrency),
+                            **self._client_options,
+                        )
+                    )
+                    self._exit_stack = stack
+        return self._client
+
+    async def close(self) -> None:
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+            self._exit_stack = None
+            self._client = None
+
+    @staticmethod
+    def _is_missing(exc: Exception) -> bool:
+        error = getattr(exc, "response", {}).get("Error", {})
+        return error.get("Code") in {"NoSuchKey", "NotFound", "404"}
+
+    async def _get_object(self, key: str, **params: Any) -> Any:
+        client = await self.client()
+        try:
+            async with self.limit:
+                return await client.get_object(Bucket=self.bucket, Key=key, **params)
+        except Exception as exc:
+            if self._is_missing(exc):
+                raise ObjectNotFoundError(key) from exc
+            raise
+
+    async def get(self, key: str) -> bytes:
+        response = await self._get_object(key)
+        async with response["Body"] as body:
+            data: bytes = await body.read()
+        return data
+
+    async def put(self, key: str, data: bytes, content_type: str | None = None) -> None:
+        client = await self.client()
+        extra = {"ContentType": content_type} if content_type else {}
+        async with self.limit:
+            await client.put_object(Bucket=self.bucket, Key=key, Body=data, **extra)
+
+    async def head(self, key: str) -> ObjectInfo:
+        client = await self.client()
+        try:
+            async with self.limit:
+                response = await client.head_object(Bucket=self.bucket, Key=key)
+        except Exception as exc:
+            if self._is_missing(exc):
+                raise ObjectNotFoundError(key) from exc
+            raise
+        return ObjectInfo(
+            size=response["ContentLength"],
+            etag=response["ETag"].strip('"'),
+            content_type=response.get("ContentType"),
+        )
+
+    async def stream(
+        self, key: str, start: int = 0, end: int | None = None, chunk_size: int = CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        params = {}
+        if start or end is not None:
+            params["Range"] = f"bytes={start}-{'' if end is None else end - 1}"
+        response = await self._get_object(key, **params)
+        async with response["Body"] as body:
+            async for chunk in body.iter_chunks(chunk_size):
+                yield chunk
+
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        client = await self.client()
+        for batch in batched(keys, S3_DELETE_BATCH):
+            async with self.limit:
+                await client.delete_objects(
+                    Bucket=self.bucket,
+                    Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+                )
+
+    async def create_multipart(self, key: str, content_type: str | None = None) -> str:
+        client = await self.client()
+        extra = {"ContentType": content_type} if content_type else {}
+        async with self.limit:
+            response = await client.create_multipart_upload(Bucket=self.bucket, Key=key, **extra)
+        upload_id: str = response["UploadId"]
+        return upload_id
+
+    async def put_part(
+        self, key: str, upload_id: str, part_number: int, chunks: AsyncIterable[bytes]
+    ) -> str:
+        client = await self.client()
+        # UploadPart needs the length up front: spool the part to disk, not memory
+        with tempfile.TemporaryFile() as spool:
+            async for chunk in chunks:
+                await asyncio.to_thread(spool.write, chunk)
+            size = spool.tell()
+            spool.seek(0)
+            try:
+                async with self.limit:
+                    response = await client.upload_part(
+                        Bucket=self.bucket,
+                        Key=key,
+                        UploadId=upload_id,
+                        PartNumber=part_number,
+                        Body=spool,
+                        ContentLength=size,
+                    )
+            except Exception as exc:
+                if getattr(exc, "response", {}).get("Error", {}).get("Code") == "NoSuchUpload":
+                    raise ObjectNotFoundError(upload_id) from exc
+                raise
+        etag: str = response["ETag"]
+        return etag
+
+    async def complete_multipart(
+        self, key: str, upload_id: str, parts: list[tuple[int, str]]
+    ) -> None:
+        client = await self.client()
+        async with self.limit:
+            await client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={
+                    "Parts": [{"PartNumber": number, "ETag": etag} for number, etag in parts]
+                },
+            )
+
+    async def abort_multipart(self, key: str, upload_id: str) -> None:
+        client = await self.client()
+        async with self.limit:
+            await client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+
+    async def presign(self, key: str, expires_in: int) -> str:
+        client = await self.client()
+        url: str = await client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": key}, ExpiresIn=expires_in
+        )
+        return url
+
+
+class MemoryStorage(StorageBackend):
+    def __init__(self) -> None:
+        super().__init__()
+        self.objects: dict[str, bytes] = {}
+        # Upload ID -> part number -> bytes
+        self.multipart: dict[str, dict[int, bytes]] = {}
+
+    async def get(self, key: str) -> bytes:
+        try:
+            return self.objects[key]
+        except KeyError as exc:
+            raise ObjectNotFoundError(key) from exc
+
+    async def put(self, key: str, data: bytes, content_type: str | None = None) -> None:
+        self.objects[key] = bytes(data)
+
+    async def head(self, key: str) -> ObjectInfo:
+        data = await self.get(key)
+        return ObjectInfo(
+            size=len(data),
+            etag=hashlib.md5(data, usedforsecurity=False).hexdigest(),
+            content_type=mimetypes.guess_type(key)[0],
+        )
+
+    async def stream(
+        self, key: str, start: int = 0, end: int | None = None, chunk_size: int = CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        view = memoryview(await self.get(key))[start:end]
+        for offset in range(0, len(view), chunk_size):
+            yield bytes(view[offset : offset + chunk_size])
+
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.objects.pop(key, None)
+
+    async def create_multipart(self, key: str, content_type: str | None = None) -> str:
+        upload_id = uuid4().hex
+        self.multipart[upload_id] = {}
+        return upload_id
+
+    async def put_part(
+        self, key: str, upload_id: str, part_number: int, chunks: AsyncIterable[bytes]
+    ) -> str:
+        data = b"".join([chunk async for chunk in chunks])
+        if upload_id not in self.multipart:
+            raise ObjectNotFoundError(upload_id)
+        self.multipart[upload_id][part_number] = data
+        return hashlib.md5(data, usedforsecurity=False).hexdigest()
+
+    async def complete_multipart(
+        self, key: str, upload_id: str, parts: list[tuple[int, str]]
+    ) -> None:
+        stored = self.multipart.pop(upload_id)
+        self.objects[key] = b"".join(stored[number] for number, _ in parts)
+
+    async def abort_multipart(self, key: str, upload_id: str) -> None:
+        self.multipart.pop(upload_id, None)
+
+
+@lru_cache
+def get_storage() -> StorageBackend:
+    """The process-wide storage backend; also usable as a FastAPI dependency."""
+    if settings.storage_backend == "memory":
+        return MemoryStorage()
+    if settings.storage_backend == "s3":
+        return S3Storage(
+            bucket=settings.s3_bucket,
+            region=settings.s3_region,
+            endpoint_url=settings.s3_endpoint_url,
+            access_key_id=settings.aws_access_key_id,
+            secret_access_key=settings.aws_secret_access_key,
+            max_concurrency=settings.storage_max_concurrency,
+        )
+    return LocalStorage(settings.storage_local_path, settings.storage_max_concurrency)
+
+
+async def close_storage() -> None:
+    if get_storage.cache_info().currsize:
+        await get_storage().close()
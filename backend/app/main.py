@@ -3,13 +3,18 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import select
 
 from app.api import api_router
 from app.core.config import settings
-from app.core.database import async_session_maker
-from app.core.security import get_password_hash
+from app.core.database import async_session_maker, dispose_engines
+from app.core.response_cache import close_response_cache
+from app.core.security import get_password_hash_async, shutdown_hashing_pool
+from app.core.storage import close_storage
 from app.models.user import User
+from app.services.job_events import close_job_events
+from app.services.thumbnails import shutdown_thumbnail_pool
 
 
 async def create_admin_user() -> None:
@@ -20,7 +25,7 @@ async def create_admin_user() -> None:
 
         if existing_user:
             # Update password to ensure it's correctly hashed
-            existing_user.hashed_password = get_password_hash(settings.admin_password)
+            existing_user.hashed_password = await get_password_hash_async(settings.admin_password)
             existing_user.is_active = True
             existing_user.is_superuser = True
             await session.commit()
@@ -28,7 +33,7 @@ async def create_admin_user() -> None:
         else:
             admin_user = User(
                 email=settings.admin_email,
-                hashed_password=get_password_hash(settings.admin_password),
+                hashed_password=await get_password_hash_async(settings.admin_password),
                 full_name=settings.admin_full_name,
                 is_active=True,
                 is_superuser=True,
@@ -45,7 +50,13 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     if settings.create_admin_on_startup:
         await create_admin_user()
     yield
-    # Shutdown (nothing to do)
+    # Shutdown
+    shutdown_thumbnail_pool()
+    shutdown_hashing_pool()
+    await close_storage()
+    await close_response_cache()
+    await close_job_events()
+    await dispose_engines()
 
 
 app = FastAPI(
@@ -54,6 +65,7 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -1,19 +1,33 @@
 from app.models.analysis import Analysis
+from app.models.cell_dataset import CellDataset
 from app.models.compound import Compound
+from app.models.dose_response import DoseResponseCurve
 from app.models.experiment import Experiment
+from app.models.feature import Feature, PlateFeature
 from app.models.image import Image
+from app.models.job import Job
 from app.models.plate import Plate
 from app.models.project import Project
+from app.models.upload import Upload, UploadPart
 from app.models.user import User
 from app.models.well import Well
+from app.models.well_aggregate import WellAggregate
 
 __all__ = [
     "Analysis",
+    "CellDataset",
     "Compound",
+    "DoseResponseCurve",
     "Experiment",
+    "Feature",
     "Image",
+    "Job",
     "Plate",
+    "PlateFeature",
     "Project",
+    "Upload",
+    "UploadPart",
     "User",
     "Well",
+    "WellAggregate",
 ]
@@ -1,7 +1,7 @@
 from typing import TYPE_CHECKING
 from uuid import UUID
 
-from sqlalchemy import JSON, Float, ForeignKey, String
+from sqlalchemy import JSON, Float, ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import BaseModel
@@ -12,6 +12,12 @@ if TYPE_CHECKING:
 
 class Analysis(BaseModel):
     __tablename__ = "analyses"
+    __table_args__ = (
+        Index("ix_analyses_well_id_analysis_type", "well_id", "analysis_type"),
+        # Listing order (see app.api.pagination), unfiltered and per well_id
+        Index("ix_analyses_created_at_id", "created_at", "id"),
+        Index("ix_analyses_well_id_created_at_id", "well_id", "created_at", "id"),
+    )
 
     name: Mapped[str] = mapped_column(String(255))
     analysis_type: Mapped[str] = mapped_column(String(100))  # e.g., cell_count, viability
@@ -25,4 +31,4 @@ class Analysis(BaseModel):
     well_id: Mapped[UUID] = mapped_column(ForeignKey("wells.id"))
 
     # Relationships
-    well: Mapped["Well"] = relationship(back_populates="analyses")
+    well: Mapped["Well"] = relationship(back_populates="analyses", lazy="raise")
@@ -17,4 +17,7 @@ class UUIDPrimaryKeyMixin:
 
 
 class BaseModel(Base, UUIDPrimaryKeyMixin, TimestampMixin):
+    # Relationships on subclasses are declared lazy="raise": every endpoint states
+    # what it needs through loader options (see app.api.loaders) instead of
+    # implicitly pulling whole subtrees.
     __abstract__ = True
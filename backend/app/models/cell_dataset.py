@@ -0,0 +1,27 @@
+from uuid import UUID
+
+from sqlalchemy import JSON, BigInteger, ForeignKey, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import BaseModel
+
+
+class CellDataset(BaseModel):
+    """Object-level measurements of a plate (one record per segmented cell).
+
+    The cells are a Parquet file in object storage (see ``app.services.cells``);
+    the database only keeps what is needed to find and describe it.
+    """
+
+    __tablename__ = "cell_datasets"
+    __table_args__ = (UniqueConstraint("plate_id", "name", name="uq_cell_datasets_plate_name"),)
+
+    name: Mapped[str] = mapped_column(String(100))  # e.g., nuclei, cells, cytoplasm
+    # The Analysis.analysis_type the cells were aggregated into, if any
+    analysis_type: Mapped[str | None] = mapped_column(String(100))
+    storage_key: Mapped[str] = mapped_column(String(500))
+    cell_count: Mapped[int] = mapped_column(BigInteger)
+    size_bytes: Mapped[int] = mapped_column(BigInteger)
+    # Numeric measurement columns, in file order
+    features: Mapped[list[str]] = mapped_column(JSON)
+    plate_id: Mapped[UUID] = mapped_column(ForeignKey("plates.id", ondelete="CASCADE"))
@@ -1,4 +1,4 @@
-from sqlalchemy import String
+from sqlalchemy import Index, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import BaseModel
@@ -6,6 +6,10 @@ from app.models.base import BaseModel
 
 class Compound(BaseModel):
     __tablename__ = "compounds"
+    __table_args__ = (
+        # Listing order (see app.api.pagination)
+        Index("ix_compounds_created_at_id", "created_at", "id"),
+    )
 
     identifier: Mapped[str] = mapped_column(String(100), unique=True, index=True)
     name: Mapped[str | None] = mapped_column(String(255))
@@ -0,0 +1,42 @@
+from uuid import UUID
+
+from sqlalchemy import Float, ForeignKey, Index, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import BaseModel
+
+
+class DoseResponseCurve(BaseModel):
+    """A fitted 4PL curve for one compound and analysis type across an experiment."""
+
+    __tablename__ = "dose_response_curves"
+    __table_args__ = (
+        UniqueConstraint(
+            "experiment_id",
+            "compound_id",
+            "analysis_type",
+            name="uq_dose_response_curves_experiment_compound_type",
+        ),
+        # Listing order (see app.api.pagination), per experiment_id
+        Index(
+            "ix_dose_response_curves_experiment_id_created_at_id",
+            "experiment_id",
+            "created_at",
+            "id",
+        ),
+    )
+
+    analysis_type: Mapped[str] = mapped_column(String(100))
+    metric: Mapped[str] = mapped_column(String(50))
+    n_points: Mapped[int]
+    converged: Mapped[bool]
+    # Parameters are null when there were too few points to fit
+    bottom: Mapped[float | None] = mapped_column(Float)
+    top: Mapped[float | None] = mapped_column(Float)
+    ec50: Mapped[float | None] = mapped_column(Float)
+    hill_slope: Mapped[float | None] = mapped_column(Float)
+    r_squared: Mapped[float | None] = mapped_column(Float)
+    experiment_id: Mapped[UUID] = mapped_column(ForeignKey("experiments.id", ondelete="CASCADE"))
+    compound_id: Mapped[UUID] = mapped_column(
+        ForeignKey("compounds.id", ondelete="CASCADE"), index=True
+    )
@@ -2,7 +2,7 @@ from datetime import date
 from typing import TYPE_CHECKING
 from uuid import UUID
 
-from sqlalchemy import Date, ForeignKey, String, Text
+from sqlalchemy import Date, ForeignKey, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import BaseModel
@@ -14,6 +14,12 @@ if TYPE_CHECKING:
 
 class Experiment(BaseModel):
     __tablename__ = "experiments"
+    __table_args__ = (
+        # Listing order (see app.api.pagination), unfiltered and per project_id; the
+        # latter also serves plain project_id lookups
+        Index("ix_experiments_created_at_id", "created_at", "id"),
+        Index("ix_experiments_project_id_created_at_id", "project_id", "created_at", "id"),
+    )
 
     name: Mapped[str] = mapped_column(String(255), index=True)
     description: Mapped[str | None] = mapped_column(Text)
@@ -21,9 +27,9 @@ class Experiment(BaseModel):
     project_id: Mapped[UUID] = mapped_column(ForeignKey("projects.id"))
 
     # Relationships
-    project: Mapped["Project"] = relationship(back_populates="experiments")
+    project: Mapped["Project"] = relationship(back_populates="experiments", lazy="raise")
     plates: Mapped[list["Plate"]] = relationship(
         back_populates="experiment",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
     )
@@ -0,0 +1,35 @@
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, LargeBinary, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+from app.models.base import TimestampMixin
+
+
+class Feature(Base, TimestampMixin):
+    """An entry of the feature dictionary, e.g. a CellProfiler measurement name."""
+
+    __tablename__ = "features"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(255), unique=True)
+    description: Mapped[str | None] = mapped_column(Text)
+
+
+class PlateFeature(Base, TimestampMixin):
+    """One feature's value at every well position of a plate, packed as float32.
+
+    ``data`` holds ``rows * columns`` little-endian float32 values in row-major
+    well order (see ``app.services.features``), NaN where a well has no value.
+    """
+
+    __tablename__ = "plate_features"
+
+    plate_id: Mapped[UUID] = mapped_column(
+        ForeignKey("plates.id", ondelete="CASCADE"), primary_key=True
+    )
+    feature_id: Mapped[int] = mapped_column(
+        ForeignKey("features.id", ondelete="CASCADE"), primary_key=True
+    )
+    data: Mapped[bytes] = mapped_column(LargeBinary)
@@ -1,7 +1,7 @@
 from typing import TYPE_CHECKING
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import BaseModel
@@ -12,10 +12,22 @@ if TYPE_CHECKING:
 
 class Image(BaseModel):
     __tablename__ = "images"
+    __table_args__ = (
+        Index(
+            "ix_images_well_id_channel_index_field_index",
+            "well_id",
+            "channel_index",
+            "field_index",
+        ),
+        # Listing order (see app.api.pagination), unfiltered and per well_id
+        Index("ix_images_created_at_id", "created_at", "id"),
+        Index("ix_images_well_id_created_at_id", "well_id", "created_at", "id"),
+    )
 
     filename: Mapped[str] = mapped_column(String(500))
     s3_key: Mapped[str] = mapped_column(String(1000))
     thumbnail_s3_key: Mapped[str | None] = mapped_column(String(1000))
+    tile_levels: Mapped[int | None]  # Set once the tile pyramid is written
     channel: Mapped[str] = mapped_column(String(50))  # e.g., DAPI, GFP, etc.
     channel_index: Mapped[int] = mapped_column(default=0)
     field_index: Mapped[int] = mapped_column(default=0)  # For multiple fields per well
@@ -24,4 +36,4 @@ class Image(BaseModel):
     well_id: Mapped[UUID] = mapped_column(ForeignKey("wells.id"))
 
     # Relationships
-    well: Mapped["Well"] = relationship(back_populates="images")
+    well: Mapped["Well"] = relationship(back_populates="images", lazy="raise")
@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import JSON, DateTime, ForeignKey, Index, String, Text, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import BaseModel
+
+
+class Job(BaseModel):
+    """A unit of background work, run by a ``screen-ai-worker`` process.
+
+    Workers claim queued jobs with ``SELECT ... FOR UPDATE SKIP LOCKED`` (see
+    ``app.services.jobs``), so any number of them can share the table.
+    """
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Only queued jobs are polled, in the claim's order; the partial index stays
+        # small as jobs finish
+        Index(
+            "ix_jobs_queued",
+            text("priority DESC"),
+            "run_at",
+            "id",
+            postgresql_where=text("status = 'queued'"),
+        ),
+        # Listing order (see app.api.pagination), unfiltered and per experiment_id;
+        # the latter also serves plain experiment_id lookups
+        Index("ix_jobs_created_at_id", "created_at", "id"),
+        Index("ix_jobs_experiment_id_created_at_id", "experiment_id", "created_at", "id"),
+    )
+
+    kind: Mapped[str] = mapped_column(String(100))  # e.g., thumbnails, tiles
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON)
+    # Routes the job's events to the experiment's stream (see app.services.job_events)
+    experiment_id: Mapped[UUID | None] = mapped_column(
+        ForeignKey("experiments.id", ondelete="SET NULL")
+    )
+    status: Mapped[str] = mapped_column(String(20), default="queued")
+    priority: Mapped[int] = mapped_column(default=0)  # Higher runs first
+    # Not claimed before this time; pushed back after a failed attempt. Scheduling
+    # times are compared with the database clock, so they carry a time zone
+    run_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    attempts: Mapped[int] = mapped_column(default=0)
+    max_attempts: Mapped[int]
+    progress: Mapped[float] = mapped_column(default=0.0)  # 0 to 1
+    message: Mapped[str | None] = mapped_column(Text)
+    result: Mapped[dict[str, Any] | None] = mapped_column(JSON)
+    error: Mapped[str | None] = mapped_column(Text)
+    worker: Mapped[str | None] = mapped_column(String(255))
+    # Refreshed while the job runs; a stale heartbeat means its worker died
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
@@ -1,7 +1,7 @@
 from typing import TYPE_CHECKING
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import BaseModel
@@ -19,6 +19,12 @@ class PlateFormat:
 
 class Plate(BaseModel):
     __tablename__ = "plates"
+    __table_args__ = (
+        # Listing order (see app.api.pagination), unfiltered and per experiment_id;
+        # the latter also serves plain experiment_id lookups
+        Index("ix_plates_created_at_id", "created_at", "id"),
+        Index("ix_plates_experiment_id_created_at_id", "experiment_id", "created_at", "id"),
+    )
 
     name: Mapped[str] = mapped_column(String(255), index=True)
     barcode: Mapped[str | None] = mapped_column(String(100), unique=True, index=True)
@@ -28,9 +34,9 @@ class Plate(BaseModel):
     experiment_id: Mapped[UUID] = mapped_column(ForeignKey("experiments.id"))
 
     # Relationships
-    experiment: Mapped["Experiment"] = relationship(back_populates="plates")
+    experiment: Mapped["Experiment"] = relationship(back_populates="plates", lazy="raise")
     wells: Mapped[list["Well"]] = relationship(
         back_populates="plate",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
     )
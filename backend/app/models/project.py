@@ -1,7 +1,7 @@
 from typing import TYPE_CHECKING
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, String, Text
+from sqlalchemy import ForeignKey, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import BaseModel
@@ -13,15 +13,19 @@ if TYPE_CHECKING:
 
 class Project(BaseModel):
     __tablename__ = "projects"
+    __table_args__ = (
+        # Listing order (see app.api.pagination)
+        Index("ix_projects_created_at_id", "created_at", "id"),
+    )
 
     name: Mapped[str] = mapped_column(String(255), index=True)
     description: Mapped[str | None] = mapped_column(Text)
-    owner_id: Mapped[UUID] = mapped_column(ForeignKey("users.id"))
+    owner_id: Mapped[UUID] = mapped_column(ForeignKey("users.id"), index=True)
 
     # Relationships
-    owner: Mapped["User"] = relationship(lazy="selectin")
+    owner: Mapped["User"] = relationship(lazy="raise")
     experiments: Mapped[list["Experiment"]] = relationship(
         back_populates="project",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
     )
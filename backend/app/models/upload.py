@@ -0,0 +1,42 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import BigInteger, ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+from app.models.base import BaseModel, TimestampMixin
+
+
+class Upload(BaseModel):
+    """A file uploaded to object storage in parts, identified by its content hash.
+
+    ``content_hash`` is unique, so uploading the same content again resumes
+    the unfinished upload or returns the finished one (see
+    ``app.services.uploads``).
+    """
+
+    __tablename__ = "uploads"
+
+    content_hash: Mapped[str] = mapped_column(String(64), unique=True)
+    filename: Mapped[str] = mapped_column(String(500))
+    content_type: Mapped[str | None] = mapped_column(String(255))
+    size: Mapped[int] = mapped_column(BigInteger)
+    storage_key: Mapped[str] = mapped_column(String(1000))
+    # The storage backend's multipart upload, until the parts are joined
+    multipart_id: Mapped[str | None] = mapped_column(String(1000))
+    completed_at: Mapped[datetime | None]
+
+
+class UploadPart(Base, TimestampMixin):
+    """A part received for an unfinished upload, with its verified SHA-256."""
+
+    __tablename__ = "upload_parts"
+
+    upload_id: Mapped[UUID] = mapped_column(
+        ForeignKey("uploads.id", ondelete="CASCADE"), primary_key=True
+    )
+    part_number: Mapped[int] = mapped_column(primary_key=True)
+    size: Mapped[int] = mapped_column(BigInteger)
+    sha256: Mapped[str] = mapped_column(String(64))
+    etag: Mapped[str] = mapped_column(String(255))
@@ -1,7 +1,7 @@
 from typing import TYPE_CHECKING
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import BaseModel
@@ -22,6 +22,12 @@ class WellType:
 
 class Well(BaseModel):
     __tablename__ = "wells"
+    __table_args__ = (
+        Index("ix_wells_plate_id_row_column", "plate_id", "row", "column", unique=True),
+        # Listing order (see app.api.pagination), unfiltered and per plate_id
+        Index("ix_wells_created_at_id", "created_at", "id"),
+        Index("ix_wells_plate_id_created_at_id", "plate_id", "created_at", "id"),
+    )
 
     row: Mapped[int]
     column: Mapped[int]
@@ -30,19 +36,19 @@ class Well(BaseModel):
     well_type: Mapped[str] = mapped_column(String(50), default=WellType.SAMPLE)
     concentration: Mapped[float | None]
     plate_id: Mapped[UUID] = mapped_column(ForeignKey("plates.id"))
-    compound_id: Mapped[UUID | None] = mapped_column(ForeignKey("compounds.id"))
+    compound_id: Mapped[UUID | None] = mapped_column(ForeignKey("compounds.id"), index=True)
 
     # Relationships
-    plate: Mapped["Plate"] = relationship(back_populates="wells")
-    compound: Mapped["Compound | None"] = relationship(lazy="selectin")
+    plate: Mapped["Plate"] = relationship(back_populates="wells", lazy="raise")
+    compound: Mapped["Compound | None"] = relationship(lazy="raise")
     images: Mapped[list["Image"]] = relationship(
         back_populates="well",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
     )
     analyses: Mapped[list["Analysis"]] = relationship(
         back_populates="well",
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
     )
 
@@ -0,0 +1,36 @@
+from uuid import UUID
+
+from sqlalchemy import Float, ForeignKey, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+from app.models.base import TimestampMixin
+
+
+class WellAggregate(Base, TimestampMixin):
+    """The average of each analysis metric over a well's analyses of one type.
+
+    Kept up to date by ``app.services.well_aggregates`` whenever analyses are
+    written, so heatmaps read one row per well instead of every analysis.
+    """
+
+    __tablename__ = "well_aggregates"
+    __table_args__ = (
+        Index("ix_well_aggregates_plate_id_analysis_type", "plate_id", "analysis_type"),
+    )
+
+    well_id: Mapped[UUID] = mapped_column(
+        ForeignKey("wells.id", ondelete="CASCADE"), primary_key=True
+    )
+    analysis_type: Mapped[str] = mapped_column(String(100), primary_key=True)
+    plate_id: Mapped[UUID] = mapped_column(ForeignKey("plates.id", ondelete="CASCADE"))
+    # The well's position, so heatmaps are read without joining wells
+    row: Mapped[int]
+    column: Mapped[int]
+    analysis_count: Mapped[int]
+    cell_count: Mapped[float | None] = mapped_column(Float)
+    mean_intensity: Mapped[float | None] = mapped_column(Float)
+    median_intensity: Mapped[float | None] = mapped_column(Float)
+    std_intensity: Mapped[float | None] = mapped_column(Float)
+    z_score: Mapped[float | None] = mapped_column(Float)
+    percent_effect: Mapped[float | None] = mapped_column(Float)
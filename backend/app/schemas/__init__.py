@@ -1,5 +1,6 @@
 from app.schemas.analysis import (
     AnalysisCreate,
+    AnalysisMetric,
     AnalysisRead,
     AnalysisUpdate,
 )
@@ -8,27 +9,53 @@ from app.schemas.auth import (
     Token,
     TokenPayload,
 )
+from app.schemas.cell_dataset import (
+    CellDatasetRead,
+    CellHistogram,
+    CellSummary,
+)
 from app.schemas.compound import (
     CompoundCreate,
     CompoundRead,
     CompoundUpdate,
 )
+from app.schemas.dose_response import (
+    DoseResponseCurveRead,
+    DoseResponseFit,
+    DoseResponseFitCreate,
+)
 from app.schemas.experiment import (
     ExperimentCreate,
     ExperimentRead,
     ExperimentReadWithPlates,
     ExperimentUpdate,
 )
+from app.schemas.feature import (
+    FeatureRead,
+    FeatureUploadResult,
+    FeatureValues,
+    PlateFeatureValues,
+)
 from app.schemas.image import (
     ImageCreate,
     ImageRead,
+    ImageTiles,
     ImageUpdate,
 )
+from app.schemas.job import JobEvent, JobKind, JobRead, JobStatus
 from app.schemas.pagination import PaginatedResponse, PaginationParams
 from app.schemas.plate import (
+    ExperimentHeatmap,
     PlateCreate,
+    PlateHeatmap,
+    PlateImportResult,
+    PlateLayout,
     PlateRead,
     PlateReadWithWells,
+    PlateStatsCreate,
+    PlateStatsRead,
+    PlateThumbnailsRead,
+    PlateTilesRead,
     PlateUpdate,
 )
 from app.schemas.project import (
@@ -37,6 +64,7 @@ from app.schemas.project import (
     ProjectReadWithExperiments,
     ProjectUpdate,
 )
+from app.schemas.upload import UploadCreate, UploadPartRead, UploadRead
 from app.schemas.user import (
     UserCreate,
     UserRead,
@@ -58,35 +86,67 @@ WellReadWithRelations.model_rebuild()
 __all__ = [
     # Analysis
     "AnalysisCreate",
+    "AnalysisMetric",
     "AnalysisRead",
     "AnalysisUpdate",
     # Auth
     "LoginRequest",
     "Token",
     "TokenPayload",
+    # Cell dataset
+    "CellDatasetRead",
+    "CellHistogram",
+    "CellSummary",
     # Compound
     "CompoundCreate",
     "CompoundRead",
     "CompoundUpdate",
+    # Dose response
+    "DoseResponseCurveRead",
+    "DoseResponseFit",
+    "DoseResponseFitCreate",
     # Experiment
     "ExperimentCreate",
     "ExperimentRead",
     "ExperimentUpdate",
+    # Feature
+    "FeatureRead",
+    "FeatureUploadResult",
+    "FeatureValues",
+    "PlateFeatureValues",
     # Image
     "ImageCreate",
     "ImageRead",
+    "ImageTiles",
     "ImageUpdate",
+    # Job
+    "JobEvent",
+    "JobKind",
+    "JobRead",
+    "JobStatus",
     # Pagination
     "PaginatedResponse",
     "PaginationParams",
     # Plate
+    "ExperimentHeatmap",
     "PlateCreate",
+    "PlateHeatmap",
+    "PlateImportResult",
+    "PlateLayout",
     "PlateRead",
+    "PlateStatsCreate",
+    "PlateStatsRead",
+    "PlateThumbnailsRead",
+    "PlateTilesRead",
     "PlateUpdate",
     # Project
     "ProjectCreate",
     "ProjectRead",
     "ProjectUpdate",
+    # Upload
+    "UploadCreate",
+    "UploadPartRead",
+    "UploadRead",
     # User
     "UserCreate",
     "UserRead",
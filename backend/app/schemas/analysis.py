@@ -1,9 +1,20 @@
+from typing import Literal
 from uuid import UUID
 
 from pydantic import BaseModel
 
 from app.schemas.base import IDSchema, TimestampSchema
 
+# Numeric Analysis columns that can be selected as a per-well readout
+AnalysisMetric = Literal[
+    "cell_count",
+    "mean_intensity",
+    "median_intensity",
+    "std_intensity",
+    "z_score",
+    "percent_effect",
+]
+
 
 class AnalysisBase(TimestampSchema):
     name: str
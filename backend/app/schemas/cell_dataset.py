@@ -0,0 +1,46 @@
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from app.schemas.base import IDSchema, TimestampSchema
+
+
+class CellDatasetRead(TimestampSchema, IDSchema):
+    name: str
+    analysis_type: str | None = None
+    plate_id: UUID
+    cell_count: int
+    size_bytes: int
+    features: list[str]
+
+
+class CellHistogram(BaseModel):
+    """Histogram of one feature per well as parallel arrays (one entry per well with cells).
+
+    ``counts[i]`` has one count per bin between consecutive ``edges``; the last
+    bin includes its upper edge and values outside the edges are not counted.
+    """
+
+    dataset_id: UUID
+    feature: str
+    edges: list[float]
+    row: list[int]
+    column: list[int]
+    counts: list[list[int]]
+
+
+class CellSummary(BaseModel):
+    """Per-well statistics of one feature as parallel arrays (one entry per well with cells).
+
+    Cells whose value is missing or NaN are not counted.
+    """
+
+    dataset_id: UUID
+    feature: str
+    row: list[int]
+    column: list[int]
+    count: list[int]
+    mean: list[float | None]
+    std: list[float | None]
+    min: list[float | None]
+    max: list[float | None]
@@ -0,0 +1,30 @@
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from app.schemas.analysis import AnalysisMetric
+from app.schemas.base import IDSchema, TimestampSchema
+
+
+class DoseResponseFitCreate(BaseModel):
+    analysis_type: str
+    metric: AnalysisMetric = "mean_intensity"
+
+
+class DoseResponseFit(BaseModel):
+    """Fitted 4PL parameters for one compound; ``ec50`` is the IC50 when ``hill_slope`` < 0."""
+
+    compound_id: UUID
+    analysis_type: str
+    metric: str
+    n_points: int
+    converged: bool
+    bottom: float | None = None
+    top: float | None = None
+    ec50: float | None = None
+    hill_slope: float | None = None
+    r_squared: float | None = None
+
+
+class DoseResponseCurveRead(DoseResponseFit, TimestampSchema, IDSchema):
+    experiment_id: UUID
@@ -0,0 +1,38 @@
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from app.schemas.base import BaseSchema
+
+
+class FeatureRead(BaseSchema):
+    id: int
+    name: str
+    description: str | None = None
+
+
+class FeatureUploadResult(BaseModel):
+    wells: int
+    features: int
+    features_created: int
+    values: int
+
+
+class PlateFeatureValues(BaseModel):
+    """One plate's values of a feature, one entry per well ordered by row, then column.
+
+    Null where the well has no value.
+    """
+
+    plate_id: UUID
+    rows: int
+    columns: int
+    values: list[float | None]
+
+
+class FeatureValues(BaseModel):
+    """One feature across an experiment; plates without values for it are left out."""
+
+    experiment_id: UUID
+    feature: FeatureRead
+    plates: list[PlateFeatureValues]
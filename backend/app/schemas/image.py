@@ -35,4 +35,17 @@ class ImageUpdate(BaseModel):
 class ImageRead(ImageBase, IDSchema):
     s3_key: str
     thumbnail_s3_key: str | None = None
+    tile_levels: int | None = None
     well_id: UUID
+
+
+class ImageTiles(BaseModel):
+    """Layout of an image's DeepZoom tile pyramid, e.g. for an OpenSeadragon tile source."""
+
+    image_id: UUID
+    width: int
+    height: int
+    tile_size: int
+    overlap: int = 0
+    levels: int
+    format: str = "png"
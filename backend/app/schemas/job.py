@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import Any, Literal
+from uuid import UUID
+
+from app.schemas.base import BaseSchema, IDSchema, TimestampSchema
+
+JobKind = Literal["thumbnails", "tiles"]
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class JobRead(TimestampSchema, IDSchema):
+    kind: str
+    payload: dict[str, Any]
+    experiment_id: UUID | None = None
+    status: JobStatus
+    priority: int
+    run_at: datetime
+    attempts: int
+    max_attempts: int
+    progress: float
+    message: str | None = None
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+class JobEvent(BaseSchema):
+    """A job's state after a change, as streamed by ``GET /jobs/{id}/events``."""
+
+    id: UUID
+    experiment_id: UUID | None = None
+    kind: str
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    progress: float
+    message: str | None = None
+    result: dict[str, Any] | None = None
+    error: str | None = None
@@ -1,9 +1,35 @@
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+
 from pydantic import BaseModel, Field
 
 
+def encode_cursor(created_at: datetime, item_id: UUID) -> str:
+    """Encode a keyset position as an opaque, URL-safe cursor."""
+    payload = json.dumps([created_at.isoformat(), item_id.hex], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a cursor produced by ``encode_cursor``; raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), UUID(item_id)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
 class PaginationParams(BaseModel):
     page: int = Field(default=1, ge=1)
     page_size: int = Field(default=20, ge=1, le=100)
+    # Keyset mode: when set, results start after this (created_at, id) position
+    # and ``page`` is ignored
+    cursor: str | None = None
+    with_total: bool = True
+    estimate_total: bool = False
 
     @property
     def offset(self) -> int:
@@ -13,26 +39,33 @@ class PaginationParams(BaseModel):
     def limit(self) -> int:
         return self.page_size
 
+    @property
+    def after(self) -> tuple[datetime, UUID] | None:
+        return decode_cursor(self.cursor) if self.cursor else None
+
 
 class PaginatedResponse[T](BaseModel):
     items: list[T]
-    total: int
+    total: int | None
     page: int
     page_size: int
-    total_pages: int
+    total_pages: int | None
+    next_cursor: str | None = None
 
     @classmethod
     def create(
         cls,
         items: list[T],
-        total: int,
+        total: int | None,
         params: PaginationParams,
+        next_cursor: str | None = None,
     ) -> "PaginatedResponse[T]":
-        total_pages = (total + params.page_size - 1) // params.page_size
+        total_pages = None if total is None else (total + params.page_size - 1) // params.page_size
         return cls(
             items=items,
             total=total,
             page=params.page,
             page_size=params.page_size,
             total_pages=total_pages,
+            next_cursor=next_cursor,
         )
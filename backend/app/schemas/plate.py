@@ -4,6 +4,7 @@ from uuid import UUID
 
 from pydantic import BaseModel, Field
 
+from app.schemas.analysis import AnalysisMetric
 from app.schemas.base import IDSchema, TimestampSchema
 
 
@@ -34,4 +35,91 @@ class PlateRead(PlateBase, IDSchema):
 
 
 class PlateReadWithWells(PlateRead):
-    wells: list[WellRead] = []  # noqa: F821
+    # Well relations that were not requested through ``include`` stay empty
+    wells: list[WellReadWithRelations] = []  # noqa: F821
+
+
+class PlateLayout(BaseModel):
+    """Whole-plate well layout as parallel arrays (one entry per well).
+
+    Wells are ordered by row, then column. ``values`` holds the selected
+    analysis metric per well and is null when no analysis type was requested.
+    """
+
+    plate_id: UUID
+    rows: int
+    columns: int
+    analysis_type: str | None = None
+    metric: str | None = None
+    row: list[int]
+    column: list[int]
+    well_type: list[str]
+    compound_id: list[UUID | None]
+    concentration: list[float | None]
+    values: list[float | None] | None = None
+
+
+class PlateHeatmap(BaseModel):
+    """One value per well position in row-major order (``row * columns + column``).
+
+    Null where a well has no value.
+    """
+
+    plate_id: UUID
+    name: str
+    barcode: str | None = None
+    rows: int
+    columns: int
+    values: list[float | None]
+
+
+class ExperimentHeatmap(BaseModel):
+    """One aggregated analysis metric per well for each plate of the experiment."""
+
+    experiment_id: UUID
+    analysis_type: str
+    metric: str
+    plates: list[PlateHeatmap]
+
+
+class PlateImportResult(BaseModel):
+    wells: int
+    compounds_created: int
+    analyses: int
+
+
+class PlateStatsCreate(BaseModel):
+    analysis_type: str
+    metric: AnalysisMetric = "mean_intensity"
+    robust: bool = Field(
+        default=False, description="Store the robust (median/MAD) Z-score in z_score"
+    )
+
+
+class PlateStatsRead(BaseModel):
+    plate_id: UUID
+    analysis_type: str
+    metric: str
+    robust: bool
+    analyses_updated: int
+    sample_count: int
+    positive_control_count: int
+    negative_control_count: int
+    positive_control_mean: float | None = None
+    negative_control_mean: float | None = None
+    z_prime: float | None = None
+    ssmd: float | None = None
+
+
+class PlateThumbnailsRead(BaseModel):
+    plate_id: UUID
+    images: int = Field(description="Images queued for thumbnail generation")
+    sizes: list[int]
+    job_id: UUID | None = Field(None, description="The background job, if any images need it")
+
+
+class PlateTilesRead(BaseModel):
+    plate_id: UUID
+    images: int = Field(description="Images queued for tile generation")
+    tile_size: int
+    job_id: UUID | None = Field(None, description="The background job, if any images need it")
@@ -0,0 +1,37 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from app.schemas.base import IDSchema, TimestampSchema
+
+SHA256_PATTERN = r"^[0-9a-f]{64}$"
+
+
+class UploadCreate(BaseModel):
+    filename: str = Field(min_length=1, max_length=500)
+    content_type: str | None = Field(None, max_length=255)
+    size: int = Field(gt=0)
+    content_hash: str = Field(
+        pattern=SHA256_PATTERN,
+        description="Hex SHA-256 of the SHA-256 digests of the file's parts, in order",
+    )
+
+
+class UploadRead(TimestampSchema, IDSchema):
+    filename: str
+    content_type: str | None = None
+    size: int
+    content_hash: str
+    storage_key: str
+    completed_at: datetime | None = None
+    part_size: int
+    part_count: int
+    parts_received: list[int] = Field(description="Part numbers stored so far, from 1")
+
+
+class UploadPartRead(BaseModel):
+    upload_id: UUID
+    part_number: int
+    size: int
+    sha256: str
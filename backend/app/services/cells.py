@@ -0,0 +1,427 @@
+"""Object-level (per-cell) measurements, stored per plate as chunked Parquet files.
+
+Segmentation output, often millions of cells per plate with a centroid, area
+and intensities per channel, does not belong in database rows. Each dataset
+(e.g. ``nuclei`` or ``cells`` of one plate) is a Parquet file in object
+storage under ``cells/<plate id>/``, described by a ``CellDataset`` row.
+
+Uploads are a Parquet file, an Arrow IPC stream or CSV with one record per cell:
+
+- the cell's well, as zero-based ``row`` and ``column`` or as a ``well`` label
+- numeric measurement columns, each becoming a feature; other columns are dropped
+
+The stored file is sorted by well, keeps floating-point measurements as
+float32 and holds ``settings.cell_row_group_size`` cells per zstd row group.
+Row-group statistics of the ``row`` column skip groups without the wells
+asked for, and reading one feature never decodes the other columns.
+
+Histograms and summaries per well are computed with NumPy one row group at a
+time in a worker thread, so memory use depends on the row group size and not
+on the number of cells. Datasets in remote storage are read from a local copy
+kept in ``settings.cell_cache_path``.
+"""
+
+import asyncio
+import os
+import tempfile
+from collections.abc import AsyncIterable, AsyncIterator, Iterator
+from pathlib import Path
+from typing import Any
+from uuid import UUID, uuid4
+
+import numpy as np
+import numpy.typing as npt
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.storage import StorageBackend
+from app.models.cell_dataset import CellDataset
+from app.models.plate import Plate
+from app.schemas.cell_dataset import CellHistogram, CellSummary
+from app.services.export import EXPORT_MEDIA_TYPES, ChunkSink, ExportFormat, open_writer
+from app.services.plate_import import PlateImportError, parse_well_position
+
+CELL_CONTENT_TYPES: dict[str, ExportFormat] = {
+    media_type: format for format, media_type in EXPORT_MEDIA_TYPES.items()
+}
+POSITION_COLUMNS = ("row", "column")
+
+Wells = set[tuple[int, int]]
+
+
+class CellDataError(ValueError):
+    """Raised when uploaded cell data cannot be read or does not fit the plate."""
+
+
+class CellUploadTooLargeError(CellDataError):
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(f"Cell data is larger than {max_bytes} bytes")
+
+
+def cell_dataset_key(plate_id: UUID, file_id: UUID) -> str:
+    return f"cells/{plate_id}/{file_id}.parquet"
+
+
+def parse_wells(wells: str) -> Wells:
+    """Parse a comma-separated list of well labels such as ``A1,B03``."""
+    try:
+        return {parse_well_position(label.strip()) for label in wells.split(",") if label.strip()}
+    except PlateImportError as exc:
+        raise CellDataError(str(exc)) from exc
+
+
+def read_cell_table(path: Path, format: ExportFormat) -> pa.Table:
+    try:
+        if format == "parquet":
+            return pq.read_table(path)
+        if format == "arrow":
+            with pa.memory_map(str(path)) as source:
+                return pa.ipc.open_stream(source).read_all()
+        return pa_csv.read_csv(path)
+    except (pa.ArrowException, OSError) as exc:
+        raise CellDataError(f"Could not read {format} cell data: {exc}") from exc
+
+
+def _positions(
+    table: pa.Table, rows: int, columns: int
+) -> tuple[npt.NDArray[np.int16], npt.NDArray[np.int16]]:
+    names = set(table.column_names)
+    if set(POSITION_COLUMNS) <= names:
+        for name in POSITION_COLUMNS:
+            if not pa.types.is_integer(table.schema.field(name).type) or table[name].null_count:
+                raise CellDataError(f"Column {name!r} must hold an integer for every cell")
+        row = table["row"].to_numpy()
+        column = table["column"].to_numpy()
+    elif "well" in names:
+        if table["well"].null_count:
+            raise CellDataError("Column 'well' must hold a well for every cell")
+        # Parse each distinct label once, not once per cell
+        encoded = table["well"].combine_chunks().cast(pa.string()).dictionary_encode()
+        try:
+            labels = [parse_well_position(label) for label in encoded.dictionary.to_pylist()]
+        except PlateImportError as exc:
+            raise CellDataError(str(exc)) from exc
+        parsed = np.array(labels, dtype=np.int64).reshape(-1, 2)
+        indices = encoded.indices.to_numpy()
+        row, column = parsed[indices, 0], parsed[indices, 1]
+    else:
+        raise CellDataError("Cell data needs 'row' and 'column' columns or a 'well' column")
+
+    if len(row) and (
+        row.min() < 0 or row.max() >= rows or column.min() < 0 or column.max() >= columns
+    ):
+        raise CellDataError(f"Cells lie outside the {rows}x{columns} plate")
+    return row.astype(np.int16), column.astype(np.int16)
+
+
+def normalize_cells(table: pa.Table, rows: int, columns: int) -> pa.Table:
+    """Keep the well and numeric measurements of each cell, sorted by well."""
+    row, column = _positions(table, rows, columns)
+    normalized: dict[str, Any] = {"row": row, "column": column}
+    for field in table.schema:
+        if field.name in normalized or field.name == "well":
+            continue
+        if pa.types.is_floating(field.type):
+            normalized[field.name] = table[field.name].cast(pa.float32(), safe=False)
+        elif pa.types.is_integer(field.type):
+            normalized[field.name] = table[field.name]
+    return pa.table(normalized).sort_by([("row", "ascending"), ("column", "ascending")])
+
+
+def convert_cells(
+    source: Path, format: ExportFormat, plate: Plate, target: Path
+) -> tuple[int, list[str]]:
+    """Write uploaded cells as the stored Parquet layout; returns the cell count and features."""
+    table = normalize_cells(read_cell_table(source, format), plate.rows, plate.columns)
+    pq.write_table(
+        table,
+        target,
+        row_group_size=settings.cell_row_group_size,
+        compression="zstd",
+        # Measurements rarely repeat, and trying a dictionary for them costs 5x the write time
+        use_dictionary=list(POSITION_COLUMNS),
+    )
+    return table.num_rows, table.column_names[len(POSITION_COLUMNS) :]
+
+
+async def _spool(body: AsyncIterable[bytes], path: Path, max_bytes: int) -> None:
+    size = 0
+    with await asyncio.to_thread(path.open, "wb") as handle:
+        async for chunk in body:
+            size += len(chunk)
+            if size > max_bytes:
+                raise CellUploadTooLargeError(max_bytes)
+            await asyncio.to_thread(handle.write, chunk)
+
+
+async def store_cell_dataset(
+    db: AsyncSession,
+    storage: StorageBackend,
+    plate: Plate,
+    name: str,
+    analysis_type: str | None,
+    format: ExportFormat,
+    body: AsyncIterable[bytes],
+) -> tuple[CellDataset, str | None]:
+    """Store uploaded cells as the plate's dataset ``name``, replacing an earlier upload.
+
+    Returns the dataset and the storage key of the file it replaced, which is
+    left for the caller to delete once the new row is committed.
+    """
+    with tempfile.TemporaryDirectory(prefix="screen-ai-cells-") as directory:
+        source = Path(directory) / f"upload.{format}"
+        target = Path(directory) / "cells.parquet"
+        await _spool(body, source, settings.cell_upload_max_bytes)
+        cell_count, features = await asyncio.to_thread(convert_cells, source, format, plate, target)
+        data = await asyncio.to_thread(target.read_bytes)
+
+    key = cell_dataset_key(plate.id, uuid4())
+    await storage.put(key, data, EXPORT_MEDIA_TYPES["parquet"])
+
+    dataset = await db.scalar(
+        select(CellDataset)
+        .where(CellDataset.plate_id == plate.id, CellDataset.name == name)
+        .with_for_update()
+    )
+    replaced = None
+    if dataset is None:
+        dataset = CellDataset(plate_id=plate.id, name=name)
+        db.add(dataset)
+    else:
+        replaced = dataset.storage_key
+    dataset.analysis_type = analysis_type
+    dataset.storage_key = key
+    dataset.cell_count = cell_count
+    dataset.size_bytes = len(data)
+    dataset.features = features
+    await db.flush()
+    await db.refresh(dataset)
+    return dataset, replaced
+
+
+def _evict(root: Path, max_bytes: int, keep: Path) -> None:
+    """Delete the least recently used cached datasets until the cache fits ``max_bytes``."""
+    files = []
+    for path in root.rglob("*.parquet"):
+        try:
+            files.append((path.stat(), path))
+        except FileNotFoundError:
+            continue
+    total = sum(stat.st_size for stat, _ in files)
+    for stat, path in sorted(files, key=lambda item: item[0].st_mtime):
+        if total <= max_bytes:
+            break
+        if path != keep:
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+
+
+async def local_cell_file(storage: StorageBackend, key: str) -> Path:
+    """A local path of a dataset's file, downloading it into the cache if needed."""
+    path = storage.local_path(key)
+    if path is not None:
+        return path
+
+    root = Path(settings.cell_cache_path).resolve()
+    cached = root / key
+    try:
+        # Files are immutable (a re-upload gets a new key); mtime tracks the last use
+        await asyncio.to_thread(os.utime, cached)
+        return cached
+    except FileNotFoundError:
+        pass
+
+    await asyncio.to_thread(cached.parent.mkdir, parents=True, exist_ok=True)
+    partial = cached.with_name(f".{cached.name}.{uuid4().hex}")
+    try:
+        with await asyncio.to_thread(partial.open, "wb") as handle:
+            async for chunk in storage.stream(key):
+                await asyncio.to_thread(handle.write, chunk)
+        await asyncio.to_thread(partial.replace, cached)
+    finally:
+        await asyncio.to_thread(partial.unlink, missing_ok=True)
+    await asyncio.to_thread(_evict, root, settings.cell_cache_max_bytes, cached)
+    return cached
+
+
+def _row_groups(parquet: pq.ParquetFile, wells: Wells | None) -> Iterator[int]:
+    """Row groups that may hold cells of ``wells``, judged by the row column's statistics."""
+    rows = None if wells is None else {row for row, _ in wells}
+    for i in range(parquet.num_row_groups):
+        statistics = parquet.metadata.row_group(i).column(0).statistics
+        if (
+            rows is None
+            or statistics is None
+            or not statistics.has_min_max
+            or any(statistics.min <= row <= statistics.max for row in rows)
+        ):
+            yield i
+
+
+def iter_cells(path: Path, columns: list[str], wells: Wells | None) -> Iterator[pa.Table]:
+    """Yield the cells of ``wells`` (all if ``None``), one row group at a time."""
+    parquet = pq.ParquetFile(path, memory_map=True)
+    codes = None if wells is None else np.array([row << 16 | column for row, column in wells])
+    for i in _row_groups(parquet, wells):
+        table = parquet.read_row_group(i, columns=[*POSITION_COLUMNS, *columns])
+        if codes is not None:
+            row = table["row"].to_numpy().astype(np.int64)
+            column = table["column"].to_numpy().astype(np.int64)
+            table = table.filter(pa.array(np.isin(row << 16 | column, codes)))
+        if table.num_rows:
+            yield table
+
+
+def _slots(table: pa.Table, columns: int) -> npt.NDArray[np.int64]:
+    row = table["row"].to_numpy().astype(np.int64)
+    return row * columns + table["column"].to_numpy()  # type: ignore[no-any-return]
+
+
+def _values(table: pa.Table, feature: str) -> npt.NDArray[np.float64]:
+    # Missing values become NaN
+    return table[feature].cast(pa.float64()).to_numpy()  # type: ignore[no-any-return]
+
+
+def feature_range(path: Path, feature: str) -> tuple[float, float]:
+    """Smallest and largest value of a feature, from the row-group statistics if possible."""
+    parquet = pq.ParquetFile(path, memory_map=True)
+    index = parquet.schema_arrow.get_field_index(feature)
+    low, high = np.inf, -np.inf
+    for i in range(parquet.num_row_groups):
+        statistics = parquet.metadata.row_group(i).column(index).statistics
+        if statistics is None or not statistics.has_min_max:
+            values = _values(parquet.read_row_group(i, columns=[feature]), feature)
+            values = values[np.isfinite(values)]
+            if not len(values):
+                continue
+            group_low, group_high = values.min(), values.max()
+        else:
+            group_low, group_high = statistics.min, statistics.max
+        low, high = min(low, float(group_low)), max(high, float(group_high))
+    return low, high
+
+
+def cell_histogram(
+    path: Path,
+    dataset_id: UUID,
+    feature: str,
+    bins: int,
+    low: float | None,
+    high: float | None,
+    plate: Plate,
+    wells: Wells | None,
+) -> CellHistogram:
+    """Histogram of a feature in every well with cells.
+
+    Without ``low`` and ``high`` the bins span the feature's whole range.
+    """
+    if low is None or high is None:
+        data_low, data_high = feature_range(path, feature)
+        low = data_low if low is None else low
+        high = data_high if high is None else high
+    if not np.isfinite(low) or not np.isfinite(high):
+        low, high = 0.0, 1.0
+    if low >= high:
+        # Like numpy.histogram, a single value gets a bin of width one around it
+        low, high = low - 0.5, low + 0.5
+    edges = np.linspace(low, high, bins + 1)
+
+    counts = np.zeros(plate.rows * plate.columns * bins, dtype=np.int64)
+    for table in iter_cells(path, [feature], wells):
+        values = _values(table, feature)
+        index = np.searchsorted(edges, values, side="right") - 1
+        # The last bin includes its upper edge; NaN sorts past it and is dropped
+        index[values == edges[-1]] = bins - 1
+        inside = (index >= 0) & (index < bins)
+        slots = _slots(table, plate.columns)[inside]
+        counts += np.bincount(slots * bins + index[inside], minlength=len(counts))
+
+    per_well = counts.reshape(-1, bins)
+    present = np.flatnonzero(per_well.any(axis=1))
+    return CellHistogram(
+        dataset_id=dataset_id,
+        feature=feature,
+        edges=edges.tolist(),
+        row=(present // plate.columns).tolist(),
+        column=(present % plate.columns).tolist(),
+        counts=per_well[present].tolist(),
+    )
+
+
+def _nullable(values: npt.NDArray[np.float64]) -> list[float | None]:
+    nullable: npt.NDArray[Any] = values.astype(object)
+    nullable[np.isnan(values)] = None
+    return nullable.tolist()  # type: ignore[no-any-return]
+
+
+def cell_summary(
+    path: Path, dataset_id: UUID, feature: str, plate: Plate, wells: Wells | None
+) -> CellSummary:
+    """Count, mean, sample standard deviation and range of a feature in every well with cells."""
+    slots_count = plate.rows * plate.columns
+    count = np.zeros(slots_count, dtype=np.int64)
+    total = np.zeros(slots_count)
+    squares = np.zeros(slots_count)
+    minimum = np.full(slots_count, np.inf)
+    maximum = np.full(slots_count, -np.inf)
+
+    for table in iter_cells(path, [feature], wells):
+        values = _values(table, feature)
+        finite = np.isfinite(values)
+        values, slots = values[finite], _slots(table, plate.columns)[finite]
+        if not len(values):
+            continue
+        # Cells are sorted by well, so each well is one run of the group
+        starts = np.flatnonzero(np.diff(slots, prepend=-1))
+        run = slots[starts]
+        count[run] += np.diff(starts, append=len(values))
+        total[run] += np.add.reduceat(values, starts)
+        squares[run] += np.add.reduceat(values * values, starts)
+        minimum[run] = np.minimum(minimum[run], np.minimum.reduceat(values, starts))
+        maximum[run] = np.maximum(maximum[run], np.maximum.reduceat(values, starts))
+
+    present = np.flatnonzero(count)
+    n = count[present]
+    mean = total[present] / n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = np.maximum(squares[present] - n * mean * mean, 0) / (n - 1)
+    return CellSummary(
+        dataset_id=dataset_id,
+        feature=feature,
+        row=(present // plate.columns).tolist(),
+        column=(present % plate.columns).tolist(),
+        count=n.tolist(),
+        mean=_nullable(mean),
+        std=_nullable(np.where(n > 1, np.sqrt(variance), np.nan)),
+        min=_nullable(minimum[present]),
+        max=_nullable(maximum[present]),
+    )
+
+
+def _write_next(cells: Iterator[pa.Table], writer: Any) -> bool:
+    table = next(cells, None)
+    if table is None:
+        return False
+    writer.write_table(table)
+    return True
+
+
+async def stream_cells(
+    path: Path, columns: list[str], wells: Wells, format: ExportFormat
+) -> AsyncIterator[bytes]:
+    """Yield the cells of ``wells`` encoded as ``format``, one chunk per row group."""
+    schema = pq.read_schema(path)
+    schema = pa.schema([schema.field(name) for name in [*POSITION_COLUMNS, *columns]])
+    sink = ChunkSink()
+    writer = open_writer(format, pa.PythonFile(sink, mode="w"), schema)
+    cells = iter_cells(path, columns, wells)
+    while await asyncio.to_thread(_write_next, cells, writer):
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    writer.close()
+    yield sink.drain()
@@ -0,0 +1,173 @@
+"""Multi-channel composites of a well's images, rendered on the server.
+
+Instead of every raw 16-bit channel of a field, the browser gets one 8-bit
+RGB image: each channel is windowed, coloured and blended additively by
+``app.services.imaging.render_composite`` in the thumbnail process pool.
+
+Rendered composites are kept in a per-process LRU bounded by
+``settings.composite_cache_max_bytes``. Entries are keyed by the parameters
+and by the source images' keys and update times, so a changed image is never
+served from the cache, and the same key is the response's ETag. Concurrent
+requests for one composite share a single render.
+"""
+
+import asyncio
+import hashlib
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Any, Literal
+from uuid import UUID
+
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import BytesLRUCache
+from app.core.config import settings
+from app.core.storage import StorageBackend
+from app.models.image import Image
+from app.services.imaging import CHANNEL_COLORS, CompositeChannel, render_composite
+from app.services.thumbnails import get_thumbnail_pool
+
+CompositeFormat = Literal["png", "webp"]
+COMPOSITE_MEDIA_TYPES: dict[str, str] = {"png": "image/png", "webp": "image/webp"}
+# Colours of channels requested without one, in channel_index order
+DEFAULT_COLORS = ("blue", "green", "red", "magenta", "cyan", "yellow")
+
+composite_cache: BytesLRUCache[str] = BytesLRUCache(settings.composite_cache_max_bytes)
+_rendering: dict[str, asyncio.Future[bytes]] = {}
+
+
+class CompositeError(ValueError):
+    """The requested channels are malformed or not in the field."""
+
+
+class CompositeNotFoundError(Exception):
+    """The well has no images in the requested field."""
+
+
+@dataclass(frozen=True)
+class ChannelSpec:
+    name: str
+    color: tuple[int, int, int] | None = None
+    window: tuple[float, float] | None = None
+
+
+@dataclass(frozen=True)
+class CompositePlan:
+    # Quoted, ready for the ETag header; also the cache key
+    etag: str
+    sources: list[str]
+    channels: list[ChannelSpec]
+    size: int
+    format: CompositeFormat
+
+
+def parse_color(value: str) -> tuple[int, int, int]:
+    """A colour name of ``CHANNEL_COLORS`` or a hex ``#rrggbb`` (``#`` optional)."""
+    color = CHANNEL_COLORS.get(value.lower())
+    if color is not None:
+        return color
+    digits = value.removeprefix("#")
+    if len(digits) == 6:
+        try:
+            red, green, blue = bytes.fromhex(digits)
+        except ValueError:
+            pass
+        else:
+            return red, green, blue
+    raise CompositeError(
+        f"Unknown colour {value!r}: use #rrggbb or one of {', '.join(CHANNEL_COLORS)}"
+    )
+
+
+def parse_channels(value: str) -> list[ChannelSpec]:
+    """Parse ``NAME[:COLOR[:LOW-HIGH]],...``, e.g. ``DAPI:blue:100-3000,GFP:green``.
+
+    ``LOW-HIGH`` is the window of raw intensities, auto-contrasted when left out.
+    """
+    specs = []
+    for part in filter(None, (part.strip() for part in value.split(","))):
+        name, _, rest = part.partition(":")
+        color, _, window = rest.partition(":")
+        bounds = None
+        if window:
+            low, _, high = window.partition("-")
+            try:
+                bounds = float(low), float(high)
+            except ValueError:
+                raise CompositeError(f"Invalid window {window!r}: use LOW-HIGH") from None
+            if bounds[0] >= bounds[1]:
+                raise CompositeError(f"Invalid window {window!r}: LOW must be below HIGH")
+        specs.append(ChannelSpec(name, parse_color(color) if color else None, bounds))
+    return specs
+
+
+async def plan_composite(
+    db: AsyncSession,
+    well_id: UUID,
+    channels: list[ChannelSpec],
+    field: int,
+    size: int,
+    format: CompositeFormat,
+) -> CompositePlan:
+    """Find the images of a composite; all channels of the field when none are given."""
+    query = (
+        select(Image.channel, Image.s3_key, Image.updated_at)
+        .where(Image.well_id == well_id, Image.field_index == field)
+        .order_by(Image.channel_index, Image.channel, Image.id)
+    )
+    images: dict[str, Row[Any]] = {}
+    # With the id as the last key, a channel imaged twice resolves to the same image each time
+    for image in (await db.execute(query)).all():
+        images.setdefault(image.channel, image)
+    if not images:
+        raise CompositeNotFoundError(f"No images in field {field} of the well")
+
+    if not channels:
+        channels = [ChannelSpec(name) for name in images]
+    resolved = []
+    for index, channel in enumerate(channels):
+        if channel.name not in images:
+            raise CompositeError(
+                f"No {channel.name!r} image in field {field}; the channels are {', '.join(images)}"
+            )
+        color = channel.color or CHANNEL_COLORS[DEFAULT_COLORS[index % len(DEFAULT_COLORS)]]
+        resolved.append(ChannelSpec(channel.name, color, channel.window))
+
+    sources = [images[channel.name].s3_key for channel in resolved]
+    versions = [images[channel.name].updated_at.isoformat() for channel in resolved]
+    key = repr((sources, versions, resolved, size, format))
+    etag = f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+    return CompositePlan(etag=etag, sources=sources, channels=resolved, size=size, format=format)
+
+
+async def _render(storage: StorageBackend, plan: CompositePlan, executor: Executor) -> bytes:
+    data = await asyncio.gather(*(storage.get(key) for key in plan.sources))
+    channels = [
+        CompositeChannel(
+            data=content, color=channel.color or (255, 255, 255), window=channel.window
+        )
+        for content, channel in zip(data, plan.channels, strict=True)
+    ]
+    loop = asyncio.get_running_loop()
+    content = await loop.run_in_executor(
+        executor, render_composite, channels, plan.size, plan.format
+    )
+    composite_cache.set(plan.etag, content)
+    return content
+
+
+async def composite_content(
+    storage: StorageBackend, plan: CompositePlan, executor: Executor | None = None
+) -> bytes:
+    """The rendered composite, from the cache or rendered now. Raises ``ObjectNotFoundError``."""
+    content = composite_cache.get(plan.etag)
+    if content is not None:
+        return content
+    rendering = _rendering.get(plan.etag)
+    if rendering is None:
+        rendering = asyncio.ensure_future(_render(storage, plan, executor or get_thumbnail_pool()))
+        _rendering[plan.etag] = rendering
+        rendering.add_done_callback(lambda _: _rendering.pop(plan.etag, None))
+    # A client going away does not cancel the render others wait for
+    return await asyncio.shield(rendering)
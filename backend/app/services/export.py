@@ -0,0 +1,174 @@
+"""Streaming export of an experiment's results as one denormalized table.
+
+The table has one row per analysis, plus one row with empty metrics for each
+well without analyses. Each row carries its plate, well position and type,
+compound, concentration and every analysis metric.
+
+Rows are read through a server-side cursor in batches of
+``settings.export_batch_size``. Each batch is encoded in a worker thread and
+sent before the next one is fetched, so memory use does not depend on the
+size of the experiment. Formats:
+
+- ``parquet``: one zstd-compressed row group per batch
+- ``arrow``: an Arrow IPC stream (``pyarrow.ipc.open_stream``)
+- ``csv``: with a header row
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Sequence
+from typing import Any, Literal, get_args
+from uuid import UUID
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from sqlalchemy import Row, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.analysis import Analysis
+from app.models.compound import Compound
+from app.models.plate import Plate
+from app.models.well import Well
+from app.schemas.analysis import AnalysisMetric
+
+ExportFormat = Literal["parquet", "arrow", "csv"]
+
+EXPORT_MEDIA_TYPES: dict[ExportFormat, str] = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "csv": "text/csv",
+}
+
+METRICS: tuple[str, ...] = get_args(AnalysisMetric)
+
+EXPORT_SCHEMA = pa.schema(
+    [
+        ("plate_id", pa.string()),
+        ("plate_name", pa.string()),
+        ("plate_barcode", pa.string()),
+        ("well_id", pa.string()),
+        ("row", pa.int32()),
+        ("column", pa.int32()),
+        ("position", pa.string()),
+        ("well_type", pa.string()),
+        ("compound_identifier", pa.string()),
+        ("compound_name", pa.string()),
+        ("concentration", pa.float64()),
+        ("analysis_type", pa.string()),
+        ("analysis_name", pa.string()),
+        *((metric, pa.int64() if metric == "cell_count" else pa.float64()) for metric in METRICS),
+    ]
+)
+# Selected as UUIDs, written as their canonical text
+UUID_COLUMNS = frozenset({"plate_id", "well_id"})
+
+
+def export_query(experiment_id: UUID) -> Select[Any]:
+    """Select the rows of ``EXPORT_SCHEMA`` for one experiment, plate by plate."""
+    return (
+        select(
+            Plate.id.label("plate_id"),
+            Plate.name.label("plate_name"),
+            Plate.barcode.label("plate_barcode"),
+            Well.id.label("well_id"),
+            Well.row,
+            Well.column,
+            (Well.row_label + Well.column_label).label("position"),
+            Well.well_type,
+            Compound.identifier.label("compound_identifier"),
+            Compound.name.label("compound_name"),
+            Well.concentration,
+            Analysis.analysis_type,
+            Analysis.name.label("analysis_name"),
+            *(getattr(Analysis, metric) for metric in METRICS),
+        )
+        .join(Well, Well.plate_id == Plate.id)
+        .outerjoin(Compound, Compound.id == Well.compound_id)
+        .outerjoin(Analysis, Analysis.well_id == Well.id)
+        .where(Plate.experiment_id == experiment_id)
+        # Plates come presorted from their (created_at, id) index, so Postgres only
+        # sorts one plate's rows at a time (Incremental Sort) and the first batches
+        # arrive before the whole experiment is read
+        .order_by(Plate.created_at, Plate.id, Well.row, Well.column, Analysis.analysis_type)
+    )
+
+
+class ChunkSink:
+    """Write-only file collecting what a pyarrow writer emits until it is drained."""
+
+    closed = False
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+        self.position = 0
+
+    def write(self, data: Any) -> int:
+        chunk = bytes(data)
+        self.chunks.append(chunk)
+        self.position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def open_writer(format: ExportFormat, sink: pa.NativeFile, schema: pa.Schema) -> Any:
+    """A pyarrow writer of ``format`` whose ``write_batch`` appends to ``sink``."""
+    if format == "parquet":
+        return pq.ParquetWriter(sink, schema, compression="zstd")
+    if format == "arrow":
+        return pa.ipc.new_stream(sink, schema)
+    return pa_csv.CSVWriter(sink, schema)
+
+
+def record_batch(rows: Sequence[Row[Any]]) -> pa.RecordBatch:
+    """Transpose one batch of ``export_query`` rows into Arrow columns."""
+    columns = list(zip(*rows, strict=True)) if rows else [()] * len(EXPORT_SCHEMA)
+    arrays = []
+    for field, values in zip(EXPORT_SCHEMA, columns, strict=True):
+        if field.name in UUID_COLUMNS:
+            values = tuple(str(value) for value in values)
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=EXPORT_SCHEMA)
+
+
+def _write_rows(writer: Any, rows: Sequence[Row[Any]]) -> None:
+    writer.write_batch(record_batch(rows))
+
+
+async def stream_experiment_export(
+    db: AsyncSession,
+    experiment_id: UUID,
+    format: ExportFormat,
+    batch_size: int,
+) -> AsyncIterator[bytes]:
+    """Yield the encoded export of one experiment, one chunk per batch of rows."""
+    sink = ChunkSink()
+    writer = open_writer(format, pa.PythonFile(sink, mode="w"), EXPORT_SCHEMA)
+    # Core rows from the session's connection skip the ORM's per-row loading
+    connection = await db.connection()
+    result = await connection.stream(
+        export_query(experiment_id).execution_options(yield_per=batch_size)
+    )
+    try:
+        async for rows in result.partitions():
+            await asyncio.to_thread(_write_rows, writer, rows)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        await result.close()
+    # Parquet's footer and the end-of-stream marker are only written on close
+    writer.close()
+    yield sink.drain()
@@ -0,0 +1,192 @@
+"""Typed per-well feature values, packed per plate as float32 arrays.
+
+Feature vectors, e.g. hundreds of CellProfiler measurements per well, are kept
+in ``plate_features`` instead of JSON in ``Analysis.raw_data``. Each row holds
+one feature of one plate: ``rows * columns`` little-endian float32 values in
+row-major well order (the slot of a well is ``row * columns + column``), with
+NaN where a well has no value. Feature names are stored once, in the
+``features`` dictionary.
+
+A value costs four bytes. Writing or reading a feature of a plate touches a
+single row, so one feature across an experiment is one row per plate, and
+other features are never parsed.
+
+Uploads have one record per well, as CSV or JSON lines:
+
+- ``well`` (e.g. ``B03``) or zero-based ``row`` and ``column``
+- one numeric field per feature, named after the feature; empty fields are skipped
+
+Uploaded values replace the stored values of the same wells and features;
+other wells keep theirs, so repeating an upload is idempotent.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+import numpy.typing as npt
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.feature import Feature, PlateFeature
+from app.models.plate import Plate
+from app.schemas.feature import (
+    FeatureRead,
+    FeatureUploadResult,
+    FeatureValues,
+    PlateFeatureValues,
+)
+from app.services.plate_import import PlateImportError, check_layout, record_position
+
+FEATURE_DTYPE = np.dtype("<f4")
+POSITION_FIELDS = frozenset({"well", "row", "column"})
+FEATURE_NAME_MAX_LENGTH = 255
+
+Float32Array = npt.NDArray[np.float32]
+
+
+@dataclass
+class FeatureRecord:
+    row: int
+    column: int
+    # feature name -> value
+    values: dict[str, float] = field(default_factory=dict)
+
+
+def parse_feature_record(raw: dict[str, Any], line: int) -> FeatureRecord:
+    """Validate one raw CSV/JSON record into a ``FeatureRecord``."""
+    try:
+        row, column = record_position(raw)
+        record = FeatureRecord(row=row, column=column)
+        for name, value in raw.items():
+            if name in POSITION_FIELDS or value is None or value == "":
+                continue
+            if not name or len(name) > FEATURE_NAME_MAX_LENGTH:
+                raise PlateImportError(f"Invalid feature name {name!r}")
+            record.values[name] = float(value)
+    except PlateImportError as exc:
+        raise PlateImportError(f"Line {line}: {exc}") from exc
+    except (KeyError, TypeError, ValueError) as exc:
+        raise PlateImportError(f"Line {line}: invalid record ({exc})") from exc
+    return record
+
+
+def pack_features(
+    plate: Plate, records: list[FeatureRecord], names: list[str]
+) -> tuple[Float32Array, npt.NDArray[np.bool_]]:
+    """Scatter records into a ``(features, wells)`` array and a mask of the values given."""
+    index = {name: i for i, name in enumerate(names)}
+    features: list[int] = []
+    slots: list[int] = []
+    values: list[float] = []
+    for record in records:
+        slot = record.row * plate.columns + record.column
+        for name, value in record.values.items():
+            features.append(index[name])
+            slots.append(slot)
+            values.append(value)
+
+    packed = np.full((len(names), plate.rows * plate.columns), np.nan, dtype=FEATURE_DTYPE)
+    given = np.zeros(packed.shape, dtype=np.bool_)
+    packed[features, slots] = values
+    given[features, slots] = True
+    return packed, given
+
+
+def unpack_feature(data: bytes) -> Float32Array:
+    return np.frombuffer(data, dtype=FEATURE_DTYPE)
+
+
+async def _resolve_features(db: AsyncSession, names: list[str]) -> tuple[dict[str, int], int]:
+    created = await db.execute(
+        insert(Feature)
+        .values([{"name": name} for name in names])
+        .on_conflict_do_nothing(index_elements=[Feature.name])
+        .returning(Feature.id)
+    )
+    created_count = len(created.all())
+
+    result = await db.execute(select(Feature.name, Feature.id).where(Feature.name.in_(names)))
+    return {name: feature_id for name, feature_id in result.all()}, created_count
+
+
+async def upload_plate_features(
+    db: AsyncSession, plate: Plate, records: list[FeatureRecord]
+) -> FeatureUploadResult:
+    """Merge uploaded feature values into the plate's stored features."""
+    check_layout(plate, ((record.row, record.column) for record in records))
+    names = list(dict.fromkeys(name for record in records for name in record.values))
+    if not names:
+        return FeatureUploadResult(wells=len(records), features=0, features_created=0, values=0)
+
+    # Uploads to a plate are serialized on its row, so a concurrent upload to other
+    # wells is merged instead of overwritten, including the first upload of a feature
+    # (no plate_features row exists yet to lock). FOR NO KEY UPDATE does not block
+    # inserts referencing the plate.
+    await db.execute(select(Plate.id).where(Plate.id == plate.id).with_for_update(key_share=True))
+
+    feature_ids, features_created = await _resolve_features(db, names)
+    packed, given = pack_features(plate, records, names)
+
+    stored = await db.execute(
+        select(PlateFeature.feature_id, PlateFeature.data).where(
+            PlateFeature.plate_id == plate.id,
+            PlateFeature.feature_id.in_(feature_ids.values()),
+        )
+    )
+    positions = {feature_ids[name]: i for i, name in enumerate(names)}
+    for feature_id, data in stored.all():
+        i = positions[feature_id]
+        packed[i] = np.where(given[i], packed[i], unpack_feature(data))
+
+    statement = insert(PlateFeature)
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[PlateFeature.plate_id, PlateFeature.feature_id],
+            set_={"data": statement.excluded.data, "updated_at": func.now()},
+        ),
+        [
+            {"plate_id": plate.id, "feature_id": feature_ids[name], "data": packed[i].tobytes()}
+            for i, name in enumerate(names)
+        ],
+    )
+
+    return FeatureUploadResult(
+        wells=len(records),
+        features=len(names),
+        features_created=features_created,
+        values=int(given.sum()),
+    )
+
+
+def _nullable(values: Float32Array) -> list[float | None]:
+    nullable: npt.NDArray[Any] = values.astype(object)
+    nullable[np.isnan(values)] = None
+    return nullable.tolist()  # type: ignore[no-any-return]
+
+
+async def experiment_feature_values(
+    db: AsyncSession, experiment_id: UUID, feature: Feature
+) -> FeatureValues:
+    """Read one feature for every plate of an experiment that has values for it."""
+    result = await db.execute(
+        select(Plate.id, Plate.rows, Plate.columns, PlateFeature.data)
+        .join(PlateFeature, PlateFeature.plate_id == Plate.id)
+        .where(Plate.experiment_id == experiment_id, PlateFeature.feature_id == feature.id)
+        .order_by(Plate.created_at, Plate.id)
+    )
+    return FeatureValues(
+        experiment_id=experiment_id,
+        feature=FeatureRead.model_validate(feature),
+        plates=[
+            PlateFeatureValues(
+                plate_id=plate_id,
+                rows=rows,
+                columns=columns,
+                values=_nullable(unpack_feature(data)),
+            )
+            for plate_id, rows, columns, data in result.all()
+        ],
+    )
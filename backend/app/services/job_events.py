@@ -0,0 +1,227 @@
+"""Live job events, streamed to clients as Server-Sent Events.
+
+Every change of a job's status or progress in ``app.services.jobs`` is
+published as a ``JobEvent``. On PostgreSQL the event is sent with
+``pg_notify`` in the transaction making the change, so it is delivered when,
+and only if, that transaction commits, whichever process made it. Each API
+process LISTENs on one dedicated connection and fans events out to its
+subscribers in memory: an open stream costs a queue, not a connection or a
+query. On other databases (the tests' SQLite) events are delivered on commit
+to the subscribers of the committing process.
+
+When the listening connection is lost every subscription ends, so clients
+reconnect and start again from a fresh snapshot instead of missing events.
+LISTEN needs a session-level connection: behind PgBouncer in transaction mode
+``DATABASE_URL`` has to point at PostgreSQL itself.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from collections.abc import AsyncIterator, Sequence
+from typing import Any
+
+import asyncpg
+import orjson
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.schemas.job import JobEvent
+
+logger = logging.getLogger(__name__)
+
+JOB_EVENTS_CHANNEL = "job_events"
+# NOTIFY payloads are limited to 8000 bytes
+MAX_NOTIFY_BYTES = 7900
+# Seconds between attempts to reconnect the listening connection
+LISTEN_RETRY_SECONDS = 5.0
+FINISHED_STATUSES = frozenset({"succeeded", "failed"})
+
+# (status, JSON) of an event, or None when the subscription was ended
+Message = tuple[str, str] | None
+
+
+def job_topic(job_id: object) -> str:
+    return f"job:{job_id}"
+
+
+def experiment_topic(experiment_id: object) -> str:
+    return f"experiment:{experiment_id}"
+
+
+class Subscription:
+    """Events of one topic, queued for one stream."""
+
+    def __init__(self, broker: "JobEventBroker", topic: str) -> None:
+        self.broker = broker
+        self.topic = topic
+        self.queue: asyncio.Queue[Message] = asyncio.Queue(settings.job_events_queue_size)
+
+    def put(self, message: Message) -> None:
+        if self.queue.full():
+            # A slow client skips intermediate progress, keeping the latest events
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout: float) -> Message:
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class JobEventBroker:
+    """Fans job events out to the subscriptions of this process."""
+
+    def __init__(self) -> None:
+        self.subscriptions: defaultdict[str, set[Subscription]] = defaultdict(set)
+        self._listener: asyncio.Task[None] | None = None
+        self._ready = asyncio.Event()
+
+    async def subscribe(
+        self, session_maker: async_sessionmaker[AsyncSession], topic: str
+    ) -> Subscription:
+        """Subscribe to a topic, listening on the database of ``session_maker`` if needed.
+
+        Returns once events committed from now on are certain to be received,
+        so a snapshot read afterwards misses nothing.
+        """
+        subscription = Subscription(self, topic)
+        self.subscriptions[topic].add(subscription)
+        engine: AsyncEngine = session_maker.kw["bind"]
+        if engine.dialect.name != "postgresql":
+            return subscription
+        if self._listener is None or self._listener.done():
+            self._ready.clear()
+            self._listener = asyncio.create_task(self._listen(engine))
+        try:
+            await asyncio.wait_for(self._ready.wait(), settings.db_pool_timeout)
+        except BaseException:
+            subscription.close()
+            raise
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self.subscriptions.get(subscription.topic)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self.subscriptions[subscription.topic]
+
+    def deliver(self, data: str) -> None:
+        """Pass an event's JSON to the subscribers of its job and experiment."""
+        job = orjson.loads(data)
+        message = (job["status"], data)
+        for topic in (job_topic(job["id"]), experiment_topic(job["experiment_id"])):
+            for subscription in self.subscriptions.get(topic, ()):
+                subscription.put(message)
+
+    def end_subscriptions(self) -> None:
+        for subscriptions in self.subscriptions.values():
+            for subscription in subscriptions:
+                subscription.put(None)
+
+    def _notified(self, connection: object, pid: int, channel: str, payload: str) -> None:
+        try:
+            self.deliver(payload)
+        except Exception:
+            logger.exception("Invalid job event %r", payload)
+
+    async def _listen(self, engine: AsyncEngine) -> None:
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            try:
+                connection = await asyncpg.connect(dsn)
+            except Exception:
+                logger.exception("Connecting to listen for job events failed")
+                await asyncio.sleep(LISTEN_RETRY_SECONDS)
+                continue
+            try:
+                await connection.add_listener(JOB_EVENTS_CHANNEL, self._notified)
+                self._ready.set()
+                # Notifications arrive on their own; the queries only detect a lost connection
+                while True:
+                    await asyncio.sleep(settings.job_events_keepalive_seconds)
+                    await connection.execute("SELECT 1")
+            except Exception:
+                logger.exception("Listening for job events failed")
+            finally:
+                self._ready.clear()
+                self.end_subscriptions()
+                connection.terminate()
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        self.end_subscriptions()
+
+
+job_events = JobEventBroker()
+
+
+async def close_job_events() -> None:
+    await job_events.close()
+
+
+async def publish_job_event(session: AsyncSession, job: Any) -> None:
+    """Publish the state of a job, a ``Job`` or a row of its event columns, on commit."""
+    job_event = JobEvent.model_validate(job)
+    data = job_event.model_dump_json()
+    if len(data.encode()) > MAX_NOTIFY_BYTES:
+        # Clients fetch the job for details too long to notify
+        data = job_event.model_copy(update={"result": None, "error": None}).model_dump_json()
+    if session.get_bind().dialect.name == "postgresql":
+        await session.execute(select(func.pg_notify(JOB_EVENTS_CHANNEL, data)))
+    else:
+        session.info.setdefault("job_events", []).append(data)
+
+
+@event.listens_for(Session, "after_commit")
+def _deliver_committed_events(session: Session) -> None:
+    for data in session.info.pop("job_events", ()):
+        job_events.deliver(data)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_events(session: Session) -> None:
+    session.info.pop("job_events", None)
+
+
+def _server_sent_event(data: str) -> str:
+    return f"event: job\ndata: {data}\n\n"
+
+
+async def stream_job_events(
+    subscription: Subscription,
+    snapshots: Sequence[JobEvent],
+    until_finished: bool = False,
+) -> AsyncIterator[str]:
+    """Format the snapshots, then each event of a subscription, as Server-Sent Events.
+
+    With ``until_finished`` the stream ends once the (single) job has
+    finished. Idle streams get a comment every
+    ``settings.job_events_keepalive_seconds`` so proxies keep them open.
+    """
+    try:
+        for snapshot in snapshots:
+            yield _server_sent_event(snapshot.model_dump_json())
+            if until_finished and snapshot.status in FINISHED_STATUSES:
+                return
+        while True:
+            try:
+                message = await subscription.get(settings.job_events_keepalive_seconds)
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if message is None:
+                return
+            status, data = message
+            yield _server_sent_event(data)
+            if until_finished and status in FINISHED_STATUSES:
+                return
+    finally:
+        subscription.close()
@@ -0,0 +1,290 @@
+"""Durable background jobs, queued in the ``jobs`` table.
+
+``enqueue_job`` adds a job in the caller's transaction, so the job exists
+exactly when the request that queued it commits. ``screen-ai-worker``
+processes (see ``app.worker``) claim queued jobs with
+``SELECT ... FOR UPDATE SKIP LOCKED``: a worker skips rows another worker is
+claiming instead of waiting for them, so any number of workers on any number
+of machines share the table without a message broker.
+
+Queued jobs run by descending ``priority``, then in ``run_at`` order. A job
+whose handler raises is queued again after an exponential backoff until it
+has made ``max_attempts`` attempts. While a job runs its worker refreshes
+``heartbeat_at``; the jobs of a worker that died are queued again (or failed)
+once their heartbeat is ``settings.job_stale_seconds`` old. Every update a
+worker makes is fenced on its name and attempt, so a worker that was merely
+slow finds its job gone, stops the handler and leaves the job to its new run.
+
+Each change of a job's status or progress is published to live streams
+(see ``app.services.job_events``) in the transaction making it.
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Mapping
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.models.job import Job
+from app.schemas.job import JobEvent, JobKind
+from app.services.job_events import publish_job_event
+
+logger = logging.getLogger(__name__)
+
+# Returned by updates to publish the changed jobs
+JOB_EVENT_COLUMNS = tuple(getattr(Job, name) for name in JobEvent.model_fields)
+
+
+class JobLostError(Exception):
+    """The job was queued again after a stale heartbeat and is no longer this run's."""
+
+
+def _claimed(job_id: UUID, worker: str | None, attempt: int) -> list[ColumnElement[bool]]:
+    # Attempts fence off a worker whose job was given to another after a stale heartbeat
+    return [Job.id == job_id, Job.worker == worker, Job.attempts == attempt]
+
+
+@dataclass
+class JobRun:
+    """A claimed job, as passed to its handler."""
+
+    id: UUID
+    kind: str
+    payload: dict[str, Any]
+    attempt: int
+    worker: str | None
+    session_maker: async_sessionmaker[AsyncSession]
+
+    async def report(self, progress: float, message: str | None = None) -> None:
+        """Record how far the job has got, from 0 to 1. Raises ``JobLostError``."""
+        async with self.session_maker() as session:
+            changed = (
+                await session.execute(
+                    update(Job)
+                    .where(*_claimed(self.id, self.worker, self.attempt))
+                    .values(progress=progress, message=message, heartbeat_at=func.now())
+                    .returning(*JOB_EVENT_COLUMNS)
+                )
+            ).all()
+            if not changed:
+                raise JobLostError(f"Job {self.id} is no longer run by {self.worker}")
+            for row in changed:
+                await publish_job_event(session, row)
+            await session.commit()
+
+
+# Returns the job's result, stored in ``Job.result``
+JobHandler = Callable[[JobRun], Awaitable[dict[str, Any] | None]]
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    kind: JobKind,
+    payload: dict[str, Any],
+    priority: int = 0,
+    max_attempts: int | None = None,
+    experiment_id: UUID | None = None,
+) -> Job:
+    """Queue a job, streamed with the events of ``experiment_id`` if given."""
+    job = Job(
+        kind=kind,
+        payload=payload,
+        experiment_id=experiment_id,
+        priority=priority,
+        max_attempts=max_attempts or settings.job_max_attempts,
+    )
+    db.add(job)
+    await db.flush()
+    await db.refresh(job)
+    await publish_job_event(db, job)
+    return job
+
+
+async def claim_job(session_maker: async_sessionmaker[AsyncSession], worker: str) -> Job | None:
+    """Mark the next due job as running on ``worker`` and return it, if there is one."""
+    next_job = (
+        select(Job.id)
+        .where(Job.status == "queued", Job.run_at <= func.now())
+        .order_by(Job.priority.desc(), Job.run_at, Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    claim = (
+        update(Job)
+        .where(Job.id == next_job)
+        .values(
+            status="running",
+            attempts=Job.attempts + 1,
+            worker=worker,
+            progress=0.0,
+            message=None,
+            heartbeat_at=func.now(),
+            started_at=func.now(),
+        )
+        .returning(Job)
+        .execution_options(synchronize_session=False)
+    )
+    async with session_maker() as session:
+        job = await session.scalar(claim)
+        if job is not None:
+            await publish_job_event(session, job)
+        await session.commit()
+    return job
+
+
+def retry_delay(attempt: int) -> float:
+    """Seconds to wait before retrying a job whose attempt ``attempt`` failed."""
+    return float(
+        min(settings.job_retry_base_seconds * 2 ** (attempt - 1), settings.job_retry_max_seconds)
+    )
+
+
+async def _db_now(session: AsyncSession) -> datetime:
+    # Times are taken from the database so workers on other machines agree on them
+    now: datetime = (await session.execute(select(func.now()))).scalar_one()
+    return now
+
+
+async def _finish(
+    session_maker: async_sessionmaker[AsyncSession],
+    job: Job,
+    retry_in: float | None = None,
+    **values: Any,
+) -> None:
+    async with session_maker() as session:
+        if retry_in is not None:
+            values["run_at"] = await _db_now(session) + timedelta(seconds=retry_in)
+        changed = await session.execute(
+            update(Job)
+            .where(*_claimed(job.id, job.worker, job.attempts))
+            .values(**values)
+            .returning(*JOB_EVENT_COLUMNS)
+        )
+        for row in changed:
+            await publish_job_event(session, row)
+        await session.commit()
+
+
+async def _heartbeat(session_maker: async_sessionmaker[AsyncSession], job: Job) -> None:
+    """Refresh the job's heartbeat until it is cancelled or the job is lost."""
+    while True:
+        await asyncio.sleep(settings.job_heartbeat_seconds)
+        try:
+            async with session_maker() as session:
+                beat = await session.execute(
+                    update(Job)
+                    .where(*_claimed(job.id, job.worker, job.attempts))
+                    .values(heartbeat_at=func.now())
+                    .returning(Job.id)
+                )
+                lost = beat.first() is None
+                await session.commit()
+        except Exception:
+            logger.exception("Heartbeat of job %s failed", job.id)
+            continue
+        if lost:
+            return
+
+
+async def _until_lost(
+    work: Awaitable[dict[str, Any] | None], heartbeat: asyncio.Task[None]
+) -> dict[str, Any] | None:
+    """Await ``work``, cancelling it with ``JobLostError`` once ``heartbeat`` ends."""
+    task = asyncio.ensure_future(work)
+    try:
+        await asyncio.wait({task, heartbeat}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        if not task.done():
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    if task.cancelled():
+        raise JobLostError("The job was queued again after its heartbeat went stale")
+    return task.result()
+
+
+async def run_job(
+    session_maker: async_sessionmaker[AsyncSession],
+    job: Job,
+    handlers: Mapping[str, JobHandler],
+) -> None:
+    """Run a claimed job's handler and record its result, or its failure and retry."""
+    run = JobRun(
+        id=job.id,
+        kind=job.kind,
+        payload=job.payload,
+        attempt=job.attempts,
+        worker=job.worker,
+        session_maker=session_maker,
+    )
+    heartbeat = asyncio.create_task(_heartbeat(session_maker, job))
+    try:
+        handler = handlers.get(job.kind)
+        if handler is None:
+            raise LookupError(f"No handler for jobs of kind {job.kind!r}")
+        result = await _until_lost(handler(run), heartbeat)
+    except JobLostError as exc:
+        # The job's new run records the outcome
+        logger.warning("Job %s stopped: %s", job.id, exc)
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+        if job.attempts < job.max_attempts:
+            delay = retry_delay(job.attempts)
+            logger.warning("Job %s failed, retrying in %.0f s: %s", job.id, delay, error)
+            await _finish(
+                session_maker,
+                job,
+                retry_in=delay,
+                status="queued",
+                worker=None,
+                error=error,
+            )
+        else:
+            logger.exception("Job %s failed after %d attempts", job.id, job.attempts)
+            await _finish(session_maker, job, status="failed", error=error, finished_at=func.now())
+    else:
+        await _finish(
+            session_maker,
+            job,
+            status="succeeded",
+            progress=1.0,
+            result=result,
+            error=None,
+            finished_at=func.now(),
+        )
+    finally:
+        heartbeat.cancel()
+
+
+async def requeue_stale_jobs(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    """Queue again (or fail, after their last attempt) running jobs whose worker died."""
+    error = "The worker running the job stopped responding"
+    async with session_maker() as session:
+        cutoff = await _db_now(session) - timedelta(seconds=settings.job_stale_seconds)
+        stale = (
+            update(Job)
+            .where(Job.status == "running", Job.heartbeat_at < cutoff)
+            .returning(*JOB_EVENT_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        requeued = await session.execute(
+            stale.where(Job.attempts < Job.max_attempts).values(
+                status="queued", run_at=func.now(), worker=None, error=error
+            )
+        )
+        failed = await session.execute(
+            stale.where(Job.attempts >= Job.max_attempts).values(
+                status="failed", error=error, finished_at=func.now()
+            )
+        )
+        for row in [*requeued, *failed]:
+            await publish_job_event(session, row)
+        await session.commit()
@@ -0,0 +1,323 @@
+"""Bulk import of a plate's wells, compounds and analysis values.
+
+One import is a table with one record per well, given as CSV or JSON lines:
+
+- ``well`` (e.g. ``B03``) or zero-based ``row`` and ``column``
+- optional ``well_type``, ``compound`` (identifier), ``compound_name`` and
+  ``concentration``
+- any number of measurement fields named ``<analysis_type>.<metric>``, e.g.
+  ``viability.mean_intensity`` or ``nuclei.cell_count``
+
+Everything is written in the caller's transaction with a fixed number of
+statements: compounds are resolved in one batch, wells are upserted with a
+multi-row ``INSERT ... ON CONFLICT ... RETURNING``, analyses are streamed
+in with ``COPY`` and the imported wells' aggregates are recomputed (see
+``app.services.well_aggregates``).
+"""
+
+import csv
+import json
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from typing import Any, get_args
+from uuid import UUID, uuid4
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.analysis import Analysis
+from app.models.compound import Compound
+from app.models.plate import Plate
+from app.models.well import Well, WellType
+from app.schemas.analysis import AnalysisMetric
+from app.schemas.plate import PlateImportResult
+from app.services.well_aggregates import refresh_well_aggregates
+
+METRICS = frozenset(get_args(AnalysisMetric))
+WELL_TYPES = frozenset(
+    {
+        WellType.SAMPLE,
+        WellType.POSITIVE_CONTROL,
+        WellType.NEGATIVE_CONTROL,
+        WellType.EMPTY,
+    }
+)
+ANALYSIS_COPY_COLUMNS = ["id", "name", "analysis_type", *sorted(METRICS), "well_id"]
+
+
+class PlateImportError(ValueError):
+    """Raised when an import file cannot be parsed or does not fit the plate."""
+
+
+@dataclass
+class WellRecord:
+    row: int
+    column: int
+    well_type: str = WellType.SAMPLE
+    compound: str | None = None
+    compound_name: str | None = None
+    concentration: float | None = None
+    # analysis_type -> metric -> value
+    measurements: dict[str, dict[str, float]] = field(default_factory=dict)
+
+
+def row_label(row: int) -> str:
+    """Zero-based row index to its plate label: 0 -> A, 25 -> Z, 26 -> AA."""
+    label = ""
+    n = row + 1
+    while n:
+        n, rem = divmod(n - 1, 26)
+        label = chr(ord("A") + rem) + label
+    return label
+
+
+def parse_well_position(position: str) -> tuple[int, int]:
+    """Parse a well label such as ``B03`` or ``AF48`` into zero-based (row, column)."""
+    letters = position.rstrip("0123456789").upper()
+    digits = position[len(letters) :]
+    if not letters or not letters.isalpha() or not digits:
+        raise PlateImportError(f"Invalid well position: {position!r}")
+    row = 0
+    for char in letters:
+        row = row * 26 + (ord(char) - ord("A") + 1)
+    return row - 1, int(digits) - 1
+
+
+def _optional(value: Any) -> Any:
+    return None if value is None or value == "" else value
+
+
+def record_position(raw: dict[str, Any]) -> tuple[int, int]:
+    """Zero-based (row, column) of a record given as ``well`` or ``row`` and ``column``."""
+    if _optional(raw.get("well")) is not None:
+        return parse_well_position(str(raw["well"]).strip())
+    return int(raw["row"]), int(raw["column"])
+
+
+def parse_record(raw: dict[str, Any], line: int) -> WellRecord:
+    """Validate one raw CSV/JSON record into a ``WellRecord``."""
+    try:
+        row, column = record_position(raw)
+        record = WellRecord(row=row, column=column)
+        well_type = _optional(raw.get("well_type"))
+        if well_type is not None:
+            if well_type not in WELL_TYPES:
+                raise PlateImportError(f"Unknown well_type {well_type!r}")
+            record.well_type = well_type
+        record.compound = _optional(raw.get("compound"))
+        record.compound_name = _optional(raw.get("compound_name"))
+        concentration = _optional(raw.get("concentration"))
+        record.concentration = None if concentration is None else float(concentration)
+
+        for key, value in raw.items():
+            if "." not in key or _optional(value) is None:
+                continue
+            analysis_type, metric = key.rsplit(".", 1)
+            if metric not in METRICS:
+                raise PlateImportError(f"Unknown metric {metric!r} in column {key!r}")
+            number = float(value)
+            if metric == "cell_count":
+                number = int(number)
+            record.measurements.setdefault(analysis_type, {})[metric] = number
+    except PlateImportError as exc:
+        raise PlateImportError(f"Line {line}: {exc}") from exc
+    except (KeyError, TypeError, ValueError) as exc:
+        raise PlateImportError(f"Line {line}: invalid record ({exc})") from exc
+    return record
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines without buffering the whole body."""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if pending:
+        yield pending.decode("utf-8-sig").rstrip("\r")
+
+
+async def iter_csv_rows(lines: AsyncIterable[str]) -> AsyncIterator[tuple[int, list[str]]]:
+    """Yield ``(line number, fields)`` per CSV row, skipping blank lines.
+
+    A quoted field may span lines: physical lines are gathered until their
+    quotes balance, so only one row is held at a time.
+    """
+    line_number = start = quotes = 0
+    pending: list[str] = []
+    async for line in lines:
+        line_number += 1
+        if not pending:
+            if not line.strip():
+                continue
+            start = line_number
+        pending.append(line)
+        # Escaped quotes come in pairs: an odd count leaves a quoted field open
+        quotes += line.count('"')
+        if quotes % 2 == 0:
+            yield start, next(csv.reader(["\n".join(pending)]))
+            pending = []
+            quotes = 0
+    if pending:
+        raise PlateImportError(f"Line {start}: unterminated quoted field")
+
+
+async def iter_raw_records(
+    lines: AsyncIterable[str], format: str
+) -> AsyncIterator[tuple[int, dict[str, Any]]]:
+    """Yield ``(line number, raw record)`` from CSV (with a header row) or JSON-lines input."""
+    if format == "jsonl":
+        line_number = 0
+        async for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                raw = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise PlateImportError(f"Line {line_number}: invalid JSON ({exc})") from exc
+            if not isinstance(raw, dict):
+                raise PlateImportError(f"Line {line_number}: expected a JSON object")
+            yield line_number, raw
+    elif format == "csv":
+        header: list[str] | None = None
+        async for line_number, fields in iter_csv_rows(lines):
+            if header is None:
+                header = fields
+                continue
+            if len(fields) > len(header):
+                raise PlateImportError(
+                    f"Line {line_number}: {len(fields)} fields for {len(header)} columns"
+                )
+            yield line_number, dict(zip(header, fields, strict=False))
+    else:
+        raise PlateImportError(f"Unsupported import format {format!r}")
+
+
+async def parse_records(lines: AsyncIterable[str], format: str) -> list[WellRecord]:
+    """Parse CSV (with a header row) or JSON-lines input into well records."""
+    return [parse_record(raw, line) async for line, raw in iter_raw_records(lines, format)]
+
+
+def check_layout(plate: Plate, positions: Iterable[tuple[int, int]]) -> None:
+    """Reject (row, column) positions outside the plate or given more than once."""
+    seen: set[tuple[int, int]] = set()
+    for row, column in positions:
+        if not (0 <= row < plate.rows and 0 <= column < plate.columns):
+            raise PlateImportError(
+                f"Well {row_label(row)}{column + 1} is outside the "
+                f"{plate.rows}x{plate.columns} plate"
+            )
+        if (row, column) in seen:
+            raise PlateImportError(f"Well {row_label(row)}{column + 1} is repeated")
+        seen.add((row, column))
+
+
+async def _resolve_compounds(
+    db: AsyncSession, records: list[WellRecord]
+) -> tuple[dict[str, UUID], int]:
+    names: dict[str, str | None] = {}
+    for record in records:
+        if record.compound is not None:
+            names[record.compound] = names.get(record.compound) or record.compound_name
+    if not names:
+        return {}, 0
+
+    created = await db.execute(
+        insert(Compound)
+        .values(
+            [{"id": uuid4(), "identifier": ident, "name": name} for ident, name in names.items()]
+        )
+        .on_conflict_do_nothing(index_elements=[Compound.identifier])
+        .returning(Compound.id)
+    )
+    created_count = len(created.all())
+
+    result = await db.execute(
+        select(Compound.identifier, Compound.id).where(Compound.identifier.in_(names))
+    )
+    return {identifier: compound_id for identifier, compound_id in result.all()}, created_count
+
+
+async def import_plate(
+    db: AsyncSession, plate: Plate, records: list[WellRecord]
+) -> PlateImportResult:
+    """Upsert the plate's wells and replace the imported analysis types per well.
+
+    Analyses of the imported types on the imported wells are replaced, so
+    re-running an import is idempotent.
+    """
+    check_layout(plate, ((record.row, record.column) for record in records))
+    if not records:
+        return PlateImportResult(wells=0, compounds_created=0, analyses=0)
+
+    compound_ids, compounds_created = await _resolve_compounds(db, records)
+
+    well_rows = [
+        {
+            "id": uuid4(),
+            "row": record.row,
+            "column": record.column,
+            "row_label": row_label(record.row),
+            "column_label": str(record.column + 1),
+            "well_type": record.well_type,
+            "concentration": record.concentration,
+            "plate_id": plate.id,
+            "compound_id": compound_ids.get(record.compound) if record.compound else None,
+        }
+        for record in records
+    ]
+    statement = insert(Well)
+    statement = statement.on_conflict_do_update(
+        index_elements=[Well.plate_id, Well.row, Well.column],
+        set_={
+            "well_type": statement.excluded.well_type,
+            "concentration": statement.excluded.concentration,
+            "compound_id": statement.excluded.compound_id,
+            "updated_at": func.now(),
+        },
+    )
+    result = await db.execute(
+        statement.returning(Well.id, Well.row, Well.column),
+        well_rows,
+    )
+    well_ids = {(row, column): well_id for well_id, row, column in result.all()}
+
+    analysis_types = {t for record in records for t in record.measurements}
+    analysis_rows = [
+        (
+            uuid4(),
+            analysis_type,
+            analysis_type,
+            *(values.get(metric) for metric in sorted(METRICS)),
+            well_ids[(record.row, record.column)],
+        )
+        for record in records
+        for analysis_type, values in record.measurements.items()
+    ]
+    if analysis_rows:
+        await db.execute(
+            delete(Analysis).where(
+                Analysis.well_id.in_(well_ids.values()),
+                Analysis.analysis_type.in_(analysis_types),
+            )
+        )
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        asyncpg_connection = raw_connection.driver_connection
+        if asyncpg_connection is None or not hasattr(asyncpg_connection, "copy_records_to_table"):
+            raise RuntimeError("Bulk plate import needs the asyncpg driver for COPY")
+        await asyncpg_connection.copy_records_to_table(
+            Analysis.__tablename__,
+            records=analysis_rows,
+            columns=ANALYSIS_COPY_COLUMNS,
+        )
+        await refresh_well_aggregates(db, plate.id, well_ids=list(well_ids.values()))
+
+    return PlateImportResult(
+        wells=len(well_ids),
+        compounds_created=compounds_created,
+        analyses=len(analysis_rows),
+    )
@@ -0,0 +1,147 @@
+"""Plate quality control and normalization computed with NumPy.
+
+One plate's analyses of a single type are loaded in one query as parallel
+arrays, split into sample and control wells with boolean masks, and the
+statistics are computed without Python-level loops:
+
+- Z' factor and SSMD from the positive and negative controls
+- Z-score (mean/SD) or robust Z-score (median/MAD) against the sample wells
+- percent effect, scaled so the negative control mean is 0% and the positive
+  control mean is 100%
+
+Per-analysis results are written back with one bulk UPDATE, and the plate's
+well aggregates of the analysis type are refreshed.
+"""
+
+from dataclasses import dataclass
+from uuid import UUID
+
+import numpy as np
+import numpy.typing as npt
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.analysis import Analysis
+from app.models.well import Well, WellType
+from app.schemas.analysis import AnalysisMetric
+from app.schemas.plate import PlateStatsRead
+from app.services.well_aggregates import refresh_well_aggregates
+
+FloatArray = npt.NDArray[np.float64]
+
+# Scales the median absolute deviation to the standard deviation of a normal distribution
+MAD_SCALE = 1.4826
+
+
+@dataclass
+class PlateStatistics:
+    z_score: FloatArray
+    percent_effect: FloatArray
+    z_prime: float | None
+    ssmd: float | None
+    sample_count: int
+    positive_count: int
+    negative_count: int
+    positive_mean: float | None
+    negative_mean: float | None
+
+
+def _finite_or_none(value: float) -> float | None:
+    return float(value) if np.isfinite(value) else None
+
+
+def compute_plate_statistics(
+    values: FloatArray,
+    well_types: npt.NDArray[np.str_],
+    robust: bool = False,
+) -> PlateStatistics:
+    """Compute plate QC and per-well normalizations; NaN marks missing values."""
+    measured = ~np.isnan(values)
+    samples = values[measured & (well_types == WellType.SAMPLE)]
+    positives = values[measured & (well_types == WellType.POSITIVE_CONTROL)]
+    negatives = values[measured & (well_types == WellType.NEGATIVE_CONTROL)]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if robust:
+            center = np.median(samples) if samples.size else np.nan
+            spread = MAD_SCALE * np.median(np.abs(samples - center)) if samples.size else np.nan
+        else:
+            center = samples.mean() if samples.size else np.nan
+            spread = samples.std(ddof=1) if samples.size > 1 else np.nan
+        z_score = (values - center) / spread
+
+        pos_mean = positives.mean() if positives.size else np.nan
+        neg_mean = negatives.mean() if negatives.size else np.nan
+        pos_std = positives.std(ddof=1) if positives.size > 1 else np.nan
+        neg_std = negatives.std(ddof=1) if negatives.size > 1 else np.nan
+        window = pos_mean - neg_mean
+        percent_effect = 100.0 * (values - neg_mean) / window
+        z_prime = 1.0 - 3.0 * (pos_std + neg_std) / np.abs(window)
+        ssmd = window / np.sqrt(pos_std**2 + neg_std**2)
+
+    return PlateStatistics(
+        z_score=np.where(np.isfinite(z_score), z_score, np.nan),
+        percent_effect=np.where(np.isfinite(percent_effect), percent_effect, np.nan),
+        z_prime=_finite_or_none(z_prime),
+        ssmd=_finite_or_none(ssmd),
+        sample_count=int(samples.size),
+        positive_count=int(positives.size),
+        negative_count=int(negatives.size),
+        positive_mean=_finite_or_none(pos_mean),
+        negative_mean=_finite_or_none(neg_mean),
+    )
+
+
+def _nullable(array: FloatArray) -> list[float | None]:
+    return [None if np.isnan(value) else value for value in array.tolist()]
+
+
+async def update_plate_statistics(
+    db: AsyncSession,
+    plate_id: UUID,
+    analysis_type: str,
+    metric: AnalysisMetric = "mean_intensity",
+    robust: bool = False,
+) -> PlateStatsRead:
+    """Compute statistics for one analysis type on a plate and store them on each analysis.
+
+    ``z_score`` receives the robust Z-score when ``robust`` is set.
+    """
+    query = (
+        select(Analysis.id, Well.well_type, getattr(Analysis, metric))
+        .join(Well, Analysis.well_id == Well.id)
+        .where(Well.plate_id == plate_id, Analysis.analysis_type == analysis_type)
+    )
+    rows = (await db.execute(query)).all()
+    ids = [row[0] for row in rows]
+    well_types = np.array([row[1] for row in rows], dtype=np.str_)
+    values = np.array([row[2] for row in rows], dtype=np.float64)
+
+    stats = compute_plate_statistics(values, well_types, robust=robust)
+
+    if ids:
+        await db.execute(
+            update(Analysis),
+            [
+                {"id": analysis_id, "z_score": z, "percent_effect": effect}
+                for analysis_id, z, effect in zip(
+                    ids, _nullable(stats.z_score), _nullable(stats.percent_effect), strict=True
+                )
+            ],
+        )
+        await refresh_well_aggregates(db, plate_id, analysis_type=analysis_type)
+
+    return PlateStatsRead(
+        plate_id=plate_id,
+        analysis_type=analysis_type,
+        metric=metric,
+        robust=robust,
+        analyses_updated=len(ids),
+        sample_count=stats.sample_count,
+        positive_control_count=stats.positive_count,
+        negative_control_count=stats.negative_count,
+        positive_control_mean=stats.positive_mean,
+        negative_control_mean=stats.negative_mean,
+        z_prime=stats.z_prime,
+        ssmd=stats.ssmd,
+    )
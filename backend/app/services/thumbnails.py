@@ -0,0 +1,256 @@
+"""Thumbnail and tile generation for a plate's images.
+
+Source images are read from object storage, rendered into a pyramid of PNG
+thumbnails by a process pool (see ``app.services.imaging``) and written back
+next to each other under ``thumbnails/<image id>/<size>.png``.
+``Image.thumbnail_s3_key`` records the ``DEFAULT_THUMBNAIL_SIZE`` key; the
+other sizes are found with ``thumbnail_key``.
+
+For full-resolution viewing the same pool cuts each image into a DeepZoom
+pyramid of ``TILE_SIZE`` PNG tiles under
+``tiles/<image id>/<level>/<column>_<row>.png``, so a viewer reads a few
+tiles of a 2160x2160 field instead of the whole TIFF. ``Image.tile_levels``
+records the number of levels once the tiles are written.
+
+Both run as background jobs (``run_thumbnails_job`` and ``run_tiles_job``,
+see ``app.services.jobs``) that report progress after each batch.
+
+At most ``settings.thumbnail_max_in_flight`` source images are held in memory
+at a time, so whole plates (e.g. 384 wells x 4 channels x 9 fields) are
+processed with bounded memory, and the database is updated once per batch.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.response_cache import IMAGES_TAG, invalidate_tags
+from app.core.storage import StorageBackend, get_storage
+from app.models.image import Image
+from app.models.well import Well
+from app.services.imaging import render_thumbnails, render_tiles
+from app.services.jobs import JobRun
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZES = (64, 256, 1024)
+DEFAULT_THUMBNAIL_SIZE = 256
+# Edge of the square tiles of full-resolution pyramids, in pixels
+TILE_SIZE = 256
+# Images whose results are written to the database together
+UPDATE_BATCH_SIZE = 256
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def thumbnail_key(image_id: UUID, size: int) -> str:
+    return f"thumbnails/{image_id}/{size}.png"
+
+
+def tile_key(image_id: UUID, level: int, column: int, row: int) -> str:
+    return f"tiles/{image_id}/{level}/{column}_{row}.png"
+
+
+def get_thumbnail_pool() -> ProcessPoolExecutor:
+    """The shared rendering pool, started on first use."""
+    global _pool
+    if _pool is None:
+        # Spawned workers do not inherit the event loop's threads and connections
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.thumbnail_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_thumbnail_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+@dataclass
+class RenderResult:
+    generated: int = 0
+    failed: int = 0
+
+
+async def _render_thumbnails(
+    storage: StorageBackend, executor: Executor, image_id: UUID, s3_key: str
+) -> dict[str, Any]:
+    data = await storage.get(s3_key)
+    loop = asyncio.get_running_loop()
+    rendered = await loop.run_in_executor(executor, render_thumbnails, data, THUMBNAIL_SIZES)
+    del data
+    await asyncio.gather(
+        *(
+            storage.put(thumbnail_key(image_id, size), png, content_type="image/png")
+            for size, png in rendered.images.items()
+        )
+    )
+    return {
+        "id": image_id,
+        "thumbnail_s3_key": thumbnail_key(image_id, DEFAULT_THUMBNAIL_SIZE),
+        "width": rendered.width,
+        "height": rendered.height,
+    }
+
+
+async def _render_tiles(
+    storage: StorageBackend, executor: Executor, image_id: UUID, s3_key: str
+) -> dict[str, Any]:
+    data = await storage.get(s3_key)
+    loop = asyncio.get_running_loop()
+    rendered = await loop.run_in_executor(executor, render_tiles, data, TILE_SIZE)
+    del data
+    await asyncio.gather(
+        *(
+            storage.put(tile_key(image_id, *tile), png, content_type="image/png")
+            for tile, png in rendered.tiles.items()
+        )
+    )
+    return {
+        "id": image_id,
+        "tile_levels": rendered.levels,
+        "width": rendered.width,
+        "height": rendered.height,
+    }
+
+
+RenderImage = Callable[[StorageBackend, Executor, UUID, str], Awaitable[dict[str, Any]]]
+# Called with the images processed so far and the total
+Progress = Callable[[int, int], Awaitable[None]]
+
+
+async def _render_plate(
+    session_maker: async_sessionmaker[AsyncSession],
+    storage: StorageBackend,
+    plate_id: UUID,
+    render: RenderImage,
+    missing: ColumnElement[bool] | None,
+    executor: Executor | None,
+    on_progress: Progress | None,
+) -> RenderResult:
+    query = (
+        select(Image.id, Image.s3_key)
+        .join(Well, Image.well_id == Well.id)
+        .where(Well.plate_id == plate_id)
+        .order_by(Image.id)
+    )
+    if missing is not None:
+        query = query.where(missing)
+    async with session_maker() as session:
+        images = (await session.execute(query)).all()
+
+    executor = executor or get_thumbnail_pool()
+    limit = asyncio.Semaphore(settings.thumbnail_max_in_flight)
+    result = RenderResult()
+
+    async def render_one(image_id: UUID, s3_key: str) -> dict[str, Any]:
+        async with limit:
+            return await render(storage, executor, image_id, s3_key)
+
+    for start in range(0, len(images), UPDATE_BATCH_SIZE):
+        batch = images[start : start + UPDATE_BATCH_SIZE]
+        outcomes = await asyncio.gather(
+            *(render_one(image_id, key) for image_id, key in batch),
+            return_exceptions=True,
+        )
+        rows = []
+        for (image_id, key), outcome in zip(batch, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                logger.warning("Rendering failed for image %s (%s): %r", image_id, key, outcome)
+                result.failed += 1
+            else:
+                rows.append(outcome)
+
+        if rows:
+            async with session_maker() as session:
+                await session.execute(update(Image), rows)
+                await session.commit()
+            await invalidate_tags(IMAGES_TAG)
+            result.generated += len(rows)
+        if on_progress is not None:
+            await on_progress(start + len(batch), len(images))
+
+    return result
+
+
+async def generate_plate_thumbnails(
+    session_maker: async_sessionmaker[AsyncSession],
+    storage: StorageBackend,
+    plate_id: UUID,
+    overwrite: bool = False,
+    executor: Executor | None = None,
+    on_progress: Progress | None = None,
+) -> RenderResult:
+    """Render thumbnails for a plate's images and record them on each ``Image``.
+
+    Images that already have a thumbnail are skipped unless ``overwrite`` is
+    set. Runs outside the request, so it manages its own sessions; a failing
+    image is logged and does not stop the rest of the plate.
+    """
+    missing = None if overwrite else Image.thumbnail_s3_key.is_(None)
+    return await _render_plate(
+        session_maker, storage, plate_id, _render_thumbnails, missing, executor, on_progress
+    )
+
+
+async def generate_plate_tiles(
+    session_maker: async_sessionmaker[AsyncSession],
+    storage: StorageBackend,
+    plate_id: UUID,
+    overwrite: bool = False,
+    executor: Executor | None = None,
+    on_progress: Progress | None = None,
+) -> RenderResult:
+    """Render the tile pyramid of a plate's images and record its levels on each ``Image``.
+
+    Like ``generate_plate_thumbnails``, images that already have tiles are
+    skipped unless ``overwrite`` is set.
+    """
+    missing = None if overwrite else Image.tile_levels.is_(None)
+    return await _render_plate(
+        session_maker, storage, plate_id, _render_tiles, missing, executor, on_progress
+    )
+
+
+def _job_progress(job: JobRun) -> Progress:
+    async def report(done: int, total: int) -> None:
+        await job.report(done / total, f"{done} of {total} images")
+
+    return report
+
+
+async def run_thumbnails_job(job: JobRun) -> dict[str, Any]:
+    """Job handler: ``generate_plate_thumbnails`` for ``payload["plate_id"]``."""
+    result = await generate_plate_thumbnails(
+        job.session_maker,
+        get_storage(),
+        UUID(job.payload["plate_id"]),
+        overwrite=job.payload.get("overwrite", False),
+        on_progress=_job_progress(job),
+    )
+    return asdict(result)
+
+
+async def run_tiles_job(job: JobRun) -> dict[str, Any]:
+    """Job handler: ``generate_plate_tiles`` for ``payload["plate_id"]``."""
+    result = await generate_plate_tiles(
+        job.session_maker,
+        get_storage(),
+        UUID(job.payload["plate_id"]),
+        overwrite=job.payload.get("overwrite", False),
+        on_progress=_job_progress(job),
+    )
+    return asdict(result)
@@ -0,0 +1,226 @@
+"""Resumable uploads of large files, such as image batches, in verified parts.
+
+A client uploads a file in three steps:
+
+1. ``create_upload`` with the file's size and content hash. Uploading content
+   that was uploaded before returns the finished upload, with nothing left to
+   send; content whose upload was interrupted returns that upload with the
+   parts it already has, so only the missing parts are sent again.
+2. ``store_upload_part`` for each part, in any order and in parallel, with
+   the SHA-256 of its bytes. Parts are streamed to the storage backend's
+   multipart upload as they arrive and never held in memory whole.
+3. ``complete_upload`` joins the parts into ``uploads/<content hash>``, a
+   storage key that can then be registered as an ``Image.s3_key``.
+
+Files are split into parts of ``UPLOAD_PART_SIZE`` bytes, the last one
+shorter. The content hash is the SHA-256 of the concatenated (binary) SHA-256
+digests of the parts, in order. Each part's digest is checked as it is
+received, so the content hash is verified on completion without reading the
+file again.
+"""
+
+import hashlib
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from uuid import UUID
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.storage import StorageBackend
+from app.models.upload import Upload, UploadPart
+from app.schemas.upload import UploadCreate, UploadPartRead, UploadRead
+
+UPLOAD_PART_SIZE = 64 * 1024**2
+# The most parts of an S3 multipart upload, so 640 GiB files
+MAX_UPLOAD_PARTS = 10_000
+
+
+class UploadError(ValueError):
+    """Raised when a request does not match the upload, e.g. a part's checksum."""
+
+
+class UploadConflictError(UploadError):
+    """Raised when the upload is not in a state that allows the request."""
+
+
+class UploadNotFoundError(LookupError):
+    """Raised when an upload does not exist."""
+
+
+def upload_key(content_hash: str) -> str:
+    return f"uploads/{content_hash}"
+
+
+def part_count(size: int) -> int:
+    return -(-size // UPLOAD_PART_SIZE)
+
+
+def part_length(size: int, part_number: int) -> int:
+    """Bytes in part ``part_number`` (from 1) of a file of ``size`` bytes."""
+    return min(UPLOAD_PART_SIZE, size - (part_number - 1) * UPLOAD_PART_SIZE)
+
+
+def content_hash(part_digests: Iterable[bytes]) -> str:
+    """The content hash of a file from the SHA-256 digests of its parts."""
+    return hashlib.sha256(b"".join(part_digests)).hexdigest()
+
+
+async def upload_read(db: AsyncSession, upload: Upload) -> UploadRead:
+    count = part_count(upload.size)
+    if upload.completed_at is not None:
+        received = list(range(1, count + 1))
+    else:
+        query = (
+            select(UploadPart.part_number)
+            .where(UploadPart.upload_id == upload.id)
+            .order_by(UploadPart.part_number)
+        )
+        received = list((await db.scalars(query)).all())
+    return UploadRead(
+        id=upload.id,
+        created_at=upload.created_at,
+        updated_at=upload.updated_at,
+        filename=upload.filename,
+        content_type=upload.content_type,
+        size=upload.size,
+        content_hash=upload.content_hash,
+        storage_key=upload.storage_key,
+        completed_at=upload.completed_at,
+        part_size=UPLOAD_PART_SIZE,
+        part_count=count,
+        parts_received=received,
+    )
+
+
+async def create_upload(
+    db: AsyncSession, storage: StorageBackend, upload_in: UploadCreate
+) -> tuple[Upload, bool]:
+    """Start an upload, or find the upload of the same content.
+
+    Returns the upload and whether it was created.
+    """
+    if part_count(upload_in.size) > MAX_UPLOAD_PARTS:
+        raise UploadError(f"Files are limited to {MAX_UPLOAD_PARTS * UPLOAD_PART_SIZE} bytes")
+
+    query = select(Upload).where(Upload.content_hash == upload_in.content_hash)
+    upload = await db.scalar(query)
+    if upload is None:
+        upload = Upload(**upload_in.model_dump(), storage_key=upload_key(upload_in.content_hash))
+        try:
+            async with db.begin_nested():
+                db.add(upload)
+        except IntegrityError:
+            # Started by a concurrent request for the same content
+            upload = (await db.execute(query)).scalar_one()
+        else:
+            upload.multipart_id = await storage.create_multipart(
+                upload.storage_key, upload.content_type
+            )
+            await db.flush()
+            await db.refresh(upload)
+            return upload, True
+
+    if upload.size != upload_in.size:
+        raise UploadError("An upload with this content hash has a different size")
+    return upload, False
+
+
+async def _verified(body: AsyncIterable[bytes], sha256: str, length: int) -> AsyncIterator[bytes]:
+    # Raising before the stream ends leaves a stored copy of the part in place
+    # (see StorageBackend.put_part), so a bad resend cannot replace a good part
+    digest = hashlib.sha256()
+    size = 0
+    async for chunk in body:
+        size += len(chunk)
+        if size > length:
+            raise UploadError(f"The part is longer than {length} bytes")
+        digest.update(chunk)
+        yield chunk
+    if size != length:
+        raise UploadError(f"The part has {size} bytes, expected {length}")
+    if digest.hexdigest() != sha256:
+        raise UploadError("The part does not match its SHA-256 checksum")
+
+
+async def store_upload_part(
+    session_maker: async_sessionmaker[AsyncSession],
+    storage: StorageBackend,
+    upload_id: UUID,
+    part_number: int,
+    sha256: str,
+    body: AsyncIterable[bytes],
+) -> UploadPartRead:
+    """Stream one part to storage and record it once its length and SHA-256 match.
+
+    Sessions are only opened before and after the transfer, so slow clients
+    do not hold database connections. A rejected part is never stored: an
+    earlier copy of it is kept, and sending it again replaces neither.
+    """
+    async with session_maker() as session:
+        upload = await session.get(Upload, upload_id)
+    if upload is None:
+        raise UploadNotFoundError(upload_id)
+    if upload.multipart_id is None:
+        raise UploadConflictError("The upload is already complete")
+    if part_number > part_count(upload.size):
+        raise UploadError(f"The upload has {part_count(upload.size)} parts")
+
+    length = part_length(upload.size, part_number)
+    etag = await storage.put_part(
+        upload.storage_key,
+        upload.multipart_id,
+        part_number,
+        _verified(body, sha256, length),
+    )
+
+    async with session_maker() as session:
+        await session.merge(
+            UploadPart(
+                upload_id=upload_id,
+                part_number=part_number,
+                size=length,
+                sha256=sha256,
+                etag=etag,
+            )
+        )
+        await session.commit()
+    return UploadPartRead(upload_id=upload_id, part_number=part_number, size=length, sha256=sha256)
+
+
+async def complete_upload(db: AsyncSession, storage: StorageBackend, upload_id: UUID) -> Upload:
+    """Join the parts of an upload into its object; completing it again is a no-op."""
+    upload = await db.scalar(select(Upload).where(Upload.id == upload_id).with_for_update())
+    if upload is None:
+        raise UploadNotFoundError(upload_id)
+    if upload.multipart_id is None:
+        return upload
+
+    parts = (
+        await db.scalars(
+            select(UploadPart)
+            .where(UploadPart.upload_id == upload_id)
+            .order_by(UploadPart.part_number)
+        )
+    ).all()
+    received = {part.part_number for part in parts}
+    missing = [n for n in range(1, part_count(upload.size) + 1) if n not in received]
+    if missing:
+        shown = ", ".join(map(str, missing[:10]))
+        raise UploadConflictError(f"{len(missing)} parts are missing, e.g. {shown}")
+    if content_hash(bytes.fromhex(part.sha256) for part in parts) != upload.content_hash:
+        raise UploadError("The parts do not match the upload's content hash")
+
+    await storage.complete_multipart(
+        upload.storage_key,
+        upload.multipart_id,
+        [(part.part_number, part.etag) for part in parts],
+    )
+    await db.execute(delete(UploadPart).where(UploadPart.upload_id == upload_id))
+    await db.execute(
+        update(Upload)
+        .where(Upload.id == upload_id)
+        .values(multipart_id=None, completed_at=func.now())
+    )
+    await db.refresh(upload)
+    return upload
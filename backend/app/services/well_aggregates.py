@@ -0,0 +1,210 @@
+"""Per-well aggregates of analyses, maintained incrementally for heatmaps.
+
+``well_aggregates`` holds one row per well and analysis type with the number
+of analyses and the average of every analysis metric. A plate heatmap reads
+one row per well (a few KB for a 1536-well plate) instead of aggregating
+every analysis on each request.
+
+Every write of analyses calls ``refresh_well_aggregates`` in the same
+transaction with the wells or analysis type it touched. The rows of those
+wells are deleted and recomputed in one ``INSERT ... SELECT ... GROUP BY``,
+so nothing has to load analyses into Python. Refreshes of one plate take a
+lock on the plate row and run one at a time; each sees the analyses
+committed by the one before.
+"""
+
+import struct
+from collections.abc import Collection
+from dataclasses import dataclass
+from typing import Any, get_args
+from uuid import UUID
+
+import numpy as np
+import numpy.typing as npt
+import orjson
+from sqlalchemy import Select, String, cast, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.analysis import Analysis
+from app.models.plate import Plate
+from app.models.well import Well
+from app.models.well_aggregate import WellAggregate
+from app.schemas.analysis import AnalysisMetric
+from app.schemas.plate import ExperimentHeatmap, PlateHeatmap
+
+METRICS: tuple[str, ...] = get_args(AnalysisMetric)
+AGGREGATE_COLUMNS = [
+    "well_id",
+    "analysis_type",
+    "plate_id",
+    "row",
+    "column",
+    "analysis_count",
+    *METRICS,
+]
+HEATMAP_DTYPE = np.dtype("<f4")
+HEATMAP_MEDIA_TYPE = "application/octet-stream"
+
+FloatArray = npt.NDArray[np.float64]
+
+
+def aggregate_query(
+    plate_id: UUID,
+    well_ids: Collection[UUID] | None = None,
+    analysis_type: str | None = None,
+) -> Select[Any]:
+    """Select ``AGGREGATE_COLUMNS`` computed from the analyses of a plate."""
+    query = (
+        select(
+            Analysis.well_id,
+            Analysis.analysis_type,
+            Well.plate_id,
+            Well.row,
+            Well.column,
+            func.count(),
+            *(func.avg(getattr(Analysis, metric)) for metric in METRICS),
+        )
+        .join(Well, Well.id == Analysis.well_id)
+        .where(Well.plate_id == plate_id)
+        .group_by(Analysis.well_id, Analysis.analysis_type, Well.plate_id, Well.row, Well.column)
+    )
+    if well_ids is not None:
+        query = query.where(Analysis.well_id.in_(well_ids))
+    if analysis_type is not None:
+        query = query.where(Analysis.analysis_type == analysis_type)
+    return query
+
+
+async def refresh_well_aggregates(
+    db: AsyncSession,
+    plate_id: UUID,
+    well_ids: Collection[UUID] | None = None,
+    analysis_type: str | None = None,
+) -> None:
+    """Recompute the aggregates of a plate, limited to some wells or one analysis type.
+
+    Call after the analyses are written (flushed) in the same transaction.
+    """
+    # FOR NO KEY UPDATE: serializes refreshes without blocking inserts referencing the plate
+    await db.execute(select(Plate.id).where(Plate.id == plate_id).with_for_update(key_share=True))
+
+    stale = delete(WellAggregate).where(WellAggregate.plate_id == plate_id)
+    if well_ids is not None:
+        stale = stale.where(WellAggregate.well_id.in_(well_ids))
+    if analysis_type is not None:
+        stale = stale.where(WellAggregate.analysis_type == analysis_type)
+    await db.execute(stale)
+
+    await db.execute(
+        insert(WellAggregate).from_select(
+            AGGREGATE_COLUMNS, aggregate_query(plate_id, well_ids, analysis_type)
+        )
+    )
+
+
+@dataclass
+class HeatmapPlate:
+    plate_id: UUID
+    name: str
+    barcode: str | None
+    rows: int
+    columns: int
+    # Row-major, NaN where a well has no value
+    values: FloatArray
+
+
+async def experiment_heatmap_plates(
+    db: AsyncSession, experiment_id: UUID, analysis_type: str, metric: AnalysisMetric
+) -> list[HeatmapPlate]:
+    """Read one aggregated metric of every plate of the experiment, in one query.
+
+    Each plate is one result row, its wells aggregated in the database into a
+    ``slot:value`` list (``slot = row * columns + column``): hundreds of rows
+    instead of one per well. Plates without analyses of the type are included,
+    all NaN, so every plate of the experiment keeps its place in the heatmap.
+    """
+    value = func.coalesce(cast(getattr(WellAggregate, metric), String), "NaN")
+    slot = cast(WellAggregate.row * Plate.columns + WellAggregate.column, String)
+    result = await db.execute(
+        select(
+            Plate.id,
+            Plate.name,
+            Plate.barcode,
+            Plate.rows,
+            Plate.columns,
+            func.aggregate_strings(slot + ":" + value, ","),
+        )
+        .outerjoin(
+            WellAggregate,
+            (WellAggregate.plate_id == Plate.id) & (WellAggregate.analysis_type == analysis_type),
+        )
+        .where(Plate.experiment_id == experiment_id)
+        .group_by(Plate.id)
+        .order_by(Plate.created_at, Plate.id)
+    )
+    plates = []
+    for plate_id, name, barcode, rows, columns, wells in result.all():
+        values = np.full(rows * columns, np.nan)
+        # None for a plate without aggregates: its joined slots are NULL and skipped
+        if wells is not None:
+            pairs = np.array(wells.replace(":", ",").split(","), dtype=np.float64).reshape(-1, 2)
+            values[pairs[:, 0].astype(np.intp)] = pairs[:, 1]
+        plates.append(HeatmapPlate(plate_id, name, barcode, rows, columns, values))
+    return plates
+
+
+def experiment_heatmap(
+    experiment_id: UUID, analysis_type: str, metric: AnalysisMetric, plates: list[HeatmapPlate]
+) -> ExperimentHeatmap:
+    return ExperimentHeatmap(
+        experiment_id=experiment_id,
+        analysis_type=analysis_type,
+        metric=metric,
+        plates=[
+            PlateHeatmap(
+                plate_id=plate.plate_id,
+                name=plate.name,
+                barcode=plate.barcode,
+                rows=plate.rows,
+                columns=plate.columns,
+                values=[None if np.isnan(value) else value for value in plate.values.tolist()],
+            )
+            for plate in plates
+        ],
+    )
+
+
+def pack_experiment_heatmap(
+    experiment_id: UUID, analysis_type: str, metric: AnalysisMetric, plates: list[HeatmapPlate]
+) -> bytes:
+    """Encode a heatmap as a JSON header followed by every plate's values as float32.
+
+    Layout: the header's length in bytes (uint32, little-endian), the UTF-8
+    JSON header padded with spaces to a multiple of four bytes, then the
+    values of each plate in header order as little-endian float32 (NaN where
+    a well has no value). A plate's ``offset`` counts values, not bytes, from
+    the start of the values, so in JavaScript its values are
+    ``new Float32Array(buffer, 4 + headerLength + 4 * offset, rows * columns)``.
+    """
+    offsets = np.cumsum([0, *(plate.rows * plate.columns for plate in plates)])
+    header = {
+        "experiment_id": str(experiment_id),
+        "analysis_type": analysis_type,
+        "metric": metric,
+        "dtype": HEATMAP_DTYPE.str,
+        "plates": [
+            {
+                "plate_id": str(plate.plate_id),
+                "name": plate.name,
+                "barcode": plate.barcode,
+                "rows": plate.rows,
+                "columns": plate.columns,
+                "offset": int(offset),
+            }
+            for plate, offset in zip(plates, offsets[:-1], strict=True)
+        ],
+    }
+    encoded = orjson.dumps(header)
+    encoded += b" " * (-len(encoded) % 4)
+    values = np.concatenate([plate.values for plate in plates]) if plates else np.empty(0)
+    return struct.pack("<I", len(encoded)) + encoded + values.astype(HEATMAP_DTYPE).tobytes()
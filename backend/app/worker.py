@@ -0,0 +1,145 @@
+"""The ``screen-ai-worker`` command: processes running background jobs.
+
+Each worker process claims jobs from the ``jobs`` table (see
+``app.services.jobs``) and runs up to ``--concurrency`` of them at once.
+Start workers on as many machines as needed; they only share the database
+and the object storage.
+
+SIGINT or SIGTERM stops claiming jobs and waits for the running ones to
+finish. A worker that is killed leaves its jobs to be retried once their
+heartbeat goes stale.
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+from collections.abc import Mapping
+from contextlib import suppress
+
+from app.core.config import settings
+from app.core.database import async_session_maker, dispose_engines
+from app.core.storage import close_storage
+from app.services.jobs import JobHandler, claim_job, requeue_stale_jobs, run_job
+from app.services.thumbnails import run_thumbnails_job, run_tiles_job, shutdown_thumbnail_pool
+
+logger = logging.getLogger(__name__)
+
+# Job kind -> handler; the kinds are listed in ``app.schemas.job.JobKind``
+HANDLERS: Mapping[str, JobHandler] = {
+    "thumbnails": run_thumbnails_job,
+    "tiles": run_tiles_job,
+}
+
+
+async def run_worker(
+    name: str,
+    concurrency: int,
+    stop: asyncio.Event,
+    handlers: Mapping[str, JobHandler] = HANDLERS,
+) -> None:
+    """Claim and run jobs until ``stop`` is set, then wait for the running jobs."""
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(concurrency)
+    running: set[asyncio.Task[None]] = set()
+    next_reap = 0.0
+
+    def done(task: asyncio.Task[None]) -> None:
+        running.discard(task)
+        slots.release()
+
+    while not stop.is_set():
+        await slots.acquire()
+        job = None
+        try:
+            if loop.time() >= next_reap:
+                await requeue_stale_jobs(async_session_maker)
+                next_reap = loop.time() + settings.job_heartbeat_seconds
+            job = await claim_job(async_session_maker, name)
+        except Exception:
+            logger.exception("Claiming a job failed")
+        if job is None:
+            slots.release()
+            with suppress(TimeoutError):
+                await asyncio.wait_for(stop.wait(), settings.job_poll_interval)
+            continue
+        logger.info("Running job %s (%s, attempt %d)", job.id, job.kind, job.attempts)
+        task = asyncio.create_task(run_job(async_session_maker, job, handlers))
+        running.add(task)
+        task.add_done_callback(done)
+
+    await asyncio.gather(*running)
+
+
+async def _serve(concurrency: int) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info("Worker %s started", name)
+    try:
+        await run_worker(name, concurrency, stop)
+    finally:
+        shutdown_thumbnail_pool()
+        await close_storage()
+        await dispose_engines()
+    logger.info("Worker %s stopped", name)
+
+
+def _process(concurrency: int, render_workers: int) -> None:
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(process)d %(levelname)s %(name)s: %(message)s"
+    )
+    # Each worker process renders thumbnails with its own pool; share the cores
+    settings.thumbnail_workers = settings.thumbnail_workers or render_workers
+    asyncio.run(_serve(concurrency))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="screen-ai-worker", description="Run background jobs.")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=settings.job_workers or os.cpu_count() or 1,
+        help="worker processes (default: JOB_WORKERS or the CPU count)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.job_concurrency,
+        help="jobs run at once by each process (default: JOB_CONCURRENCY)",
+    )
+    args = parser.parse_args(argv)
+    render_workers = max(1, (os.cpu_count() or 1) // args.processes)
+    if args.processes == 1:
+        _process(args.concurrency, render_workers)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(
+            target=_process, args=(args.concurrency, render_workers), name=f"worker-{index}"
+        )
+        for index in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    # Ctrl-C reaches the children through the process group; SIGTERM (e.g. from
+    # docker stop) only reaches this process and is passed on
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    def forward(signum: int, frame: object) -> None:
+        for process in processes:
+            process.terminate()
+
+    signal.signal(signal.SIGTERM, forward)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
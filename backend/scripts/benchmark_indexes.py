@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Benchmark the screening hierarchy indexes on a synthetic dataset.
+
+Fills a scratch database (migrated to head) with a synthetic screen, then runs
+the lookups used by list endpoints and relationship loads with EXPLAIN ANALYZE,
+once with the indexes from revision 002 (or the listing-order indexes from
+012 that replaced its plain foreign key ones) and once inside a rolled-back
+transaction where they have been dropped.
+
+Usage:
+    cd backend
+    uv run alembic upgrade head
+    uv run python scripts/benchmark_indexes.py --database-url postgresql+asyncpg://... --plates 1000
+
+The synthetic rows are deleted afterwards unless --keep is given. Never point
+this at a database holding real data.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+# Add the app directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+INDEXES = {
+    "ix_projects_owner_id": "projects",
+    "ix_experiments_project_id_created_at_id": "experiments",
+    "ix_plates_experiment_id_created_at_id": "plates",
+    "ix_wells_compound_id": "wells",
+    "ix_wells_plate_id_row_column": "wells",
+    "ix_images_well_id_channel_index_field_index": "images",
+    "ix_analyses_well_id_analysis_type": "analyses",
+}
+
+# (label, SQL with a :key parameter, SQL selecting a representative key)
+QUERIES = [
+    (
+        "experiments by project",
+        "SELECT * FROM experiments WHERE project_id = :key",
+        "SELECT project_id FROM experiments LIMIT 1",
+    ),
+    (
+        "plates by experiment",
+        "SELECT * FROM plates WHERE experiment_id = :key",
+        "SELECT experiment_id FROM plates LIMIT 1",
+    ),
+    (
+        "plate layout (wells by plate)",
+        'SELECT * FROM wells WHERE plate_id = :key ORDER BY "row", "column"',
+        "SELECT plate_id FROM wells LIMIT 1",
+    ),
+    (
+        "images by well",
+        "SELECT * FROM images WHERE well_id = :key ORDER BY channel_index, field_index",
+        "SELECT well_id FROM images LIMIT 1",
+    ),
+    (
+        "analyses by well and type",
+        "SELECT * FROM analyses WHERE well_id = :key AND analysis_type = 'viability'",
+        "SELECT well_id FROM analyses LIMIT 1",
+    ),
+    (
+        "wells by compound",
+        "SELECT * FROM wells WHERE compound_id = :key",
+        "SELECT compound_id FROM wells WHERE compound_id IS NOT NULL LIMIT 1",
+    ),
+]
+
+SEED_SQL = [
+    """
+    INSERT INTO users (id, email, hashed_password)
+    VALUES (gen_random_uuid(), 'benchmark@example.com', 'x')
+    """,
+    """
+    INSERT INTO projects (id, name, owner_id)
+    SELECT gen_random_uuid(), 'benchmark-' || g, u.id
+    FROM generate_series(1, :projects) g, users u
+    WHERE u.email = 'benchmark@example.com'
+    """,
+    """
+    INSERT INTO experiments (id, name, project_id)
+    SELECT gen_random_uuid(), p.name || '-exp-' || g, p.id
+    FROM projects p, generate_series(1, :experiments_per_project) g
+    WHERE p.name LIKE 'benchmark-%'
+    """,
+    """
+    INSERT INTO plates (id, name, experiment_id)
+    SELECT gen_random_uuid(), e.name || '-plate-' || g, e.id
+    FROM experiments e, generate_series(1, :plates_per_experiment) g
+    WHERE e.name LIKE 'benchmark-%'
+    """,
+    """
+    INSERT INTO compounds (id, identifier)
+    SELECT gen_random_uuid(), 'BENCH-' || g FROM generate_series(1, :compounds) g
+    """,
+    """
+    INSERT INTO wells (id, "row", "column", row_label, column_label, plate_id, compound_id)
+    SELECT gen_random_uuid(), r, c, chr(65 + r), (c + 1)::text, p.id, cpd.id
+    FROM plates p
+    CROSS JOIN generate_series(0, 15) r
+    CROSS JOIN generate_series(0, 23) c
+    JOIN compounds cpd ON cpd.identifier = 'BENCH-' || (1 + (r * 24 + c) % :compounds)
+    WHERE p.name LIKE 'benchmark-%'
+    """,
+    """
+    INSERT INTO images (id, filename, s3_key, channel, channel_index, field_index, well_id)
+    SELECT gen_random_uuid(), 'img.tiff', 'bench/' || w.id || '/' || ch, 'ch' || ch, ch, 0, w.id
+    FROM wells w
+    JOIN plates p ON p.id = w.plate_id AND p.name LIKE 'benchmark-%'
+    CROSS JOIN generate_series(0, 1) ch
+    """,
+    """
+    INSERT INTO analyses (id, name, analysis_type, mean_intensity, well_id)
+    SELECT gen_random_uuid(), t, t, random(), w.id
+    FROM wells w
+    JOIN plates p ON p.id = w.plate_id AND p.name LIKE 'benchmark-%'
+    CROSS JOIN unnest(ARRAY['viability', 'cell_count']) t
+    """,
+]
+
+CLEANUP_SQL = [
+    "DELETE FROM analyses USING wells, plates WHERE analyses.well_id = wells.id"
+    " AND wells.plate_id = plates.id AND plates.name LIKE 'benchmark-%'",
+    "DELETE FROM images USING wells, plates WHERE images.well_id = wells.id"
+    " AND wells.plate_id = plates.id AND plates.name LIKE 'benchmark-%'",
+    "DELETE FROM wells USING plates WHERE wells.plate_id = plates.id"
+    " AND plates.name LIKE 'benchmark-%'",
+    "DELETE FROM compounds WHERE identifier LIKE 'BENCH-%'",
+    "DELETE FROM plates WHERE name LIKE 'benchmark-%'",
+    "DELETE FROM experiments WHERE name LIKE 'benchmark-%'",
+    "DELETE FROM projects WHERE name LIKE 'benchmark-%'",
+    "DELETE FROM users WHERE email = 'benchmark@example.com'",
+]
+
+
+def summarize(plan: dict[str, Any]) -> str:
+    """Collapse a JSON plan tree into its scan nodes, e.g. 'Index Scan(wells)'."""
+    nodes: list[str] = []
+
+    def walk(node: dict[str, Any]) -> None:
+        if "Scan" in node["Node Type"]:
+            target = node.get("Relation Name") or node.get("Index Name", "?")
+            nodes.append(f"{node['Node Type']}({target})")
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan["Plan"])
+    return ", ".join(nodes)
+
+
+async def explain(conn: AsyncConnection, sql: str, key: Any) -> tuple[str, float]:
+    result = await conn.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"), {"key": key})
+    raw = result.scalar_one()
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+    return summarize(plan), plan["Execution Time"]
+
+
+async def run_queries(conn: AsyncConnection) -> list[tuple[str, str, float]]:
+    rows = []
+    for label, sql, key_sql in QUERIES:
+        key = (await conn.execute(text(key_sql))).scalar_one()
+        rows.append((label, *await explain(conn, sql, key)))
+    return rows
+
+
+async def benchmark(args: argparse.Namespace) -> None:
+    engine = create_async_engine(args.database_url)
+    experiments_per_project = 10
+    projects = max(1, args.plates // (experiments_per_project * args.plates_per_experiment))
+
+    async with engine.begin() as conn:
+        started = time.perf_counter()
+        for sql in SEED_SQL:
+            await conn.execute(
+                text(sql),
+                {
+                    "projects": projects,
+                    "experiments_per_project": experiments_per_project,
+                    "plates_per_experiment": args.plates_per_experiment,
+                    "compounds": args.compounds,
+                },
+            )
+        for table in set(INDEXES.values()) | {"compounds"}:
+            await conn.execute(text(f"ANALYZE {table}"))
+        plates = (
+            await conn.execute(text("SELECT count(*) FROM plates WHERE name LIKE 'benchmark-%'"))
+        ).scalar_one()
+        print(f"Seeded {plates} plates in {time.perf_counter() - started:.1f}s\n")
+
+    try:
+        async with engine.connect() as conn:
+            with_indexes = await run_queries(conn)
+            await conn.rollback()
+
+            # DDL is transactional in PostgreSQL: drop the indexes, measure, roll back
+            for name in INDEXES:
+                await conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            for table in set(INDEXES.values()):
+                await conn.execute(text(f"ANALYZE {table}"))
+            without_indexes = await run_queries(conn)
+            await conn.rollback()
+
+        width = max(len(label) for label, _, _ in with_indexes)
+        print(f"{'query':<{width}}  {'without (ms)':>12}  {'with (ms)':>10}  plan with indexes")
+        for (label, plan, ms), (_, old_plan, old_ms) in zip(
+            with_indexes, without_indexes, strict=True
+        ):
+            print(f"{label:<{width}}  {old_ms:>12.2f}  {ms:>10.2f}  {plan}")
+            print(f"{'':<{width}}  {'':>12}  {'':>10}  was: {old_plan}")
+    finally:
+        if not args.keep:
+            async with engine.begin() as conn:
+                for sql in CLEANUP_SQL:
+                    await conn.execute(text(sql))
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True, help="Scratch database URL")
+    parser.add_argument("--plates", type=int, default=1000)
+    parser.add_argument("--plates-per-experiment", type=int, default=10)
+    parser.add_argument("--compounds", type=int, default=5000)
+    parser.add_argument("--keep", action="store_true", help="Keep the synthetic rows")
+    asyncio.run(benchmark(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""Benchmark list_wells serialization against the previous ORM + FastAPI path.
+
+Seeds one synthetic plate into a scratch database (migrated to head), then
+requests ``GET /api/wells?plate_id=...&page_size=100`` repeatedly through the
+ASGI app, with and without ``include=compound``:
+
+- ``previous``: ORM entities, ``model_validate`` per item, then FastAPI
+  validates the returned model again and encodes it with ``JSONResponse``
+- ``current``: the app's route, which validates rows (or entities, with
+  includes) once and serializes them in pydantic-core
+
+The response cache is disabled so every request is served from the database.
+
+Usage:
+    cd backend
+    uv run alembic upgrade head
+    uv run python scripts/benchmark_serialization.py --database-url postgresql+asyncpg://...
+
+The synthetic rows are deleted afterwards. Never point this at a database
+holding real data.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+# Add the app directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+SEED_SQL = [
+    """
+    INSERT INTO users (id, email, hashed_password)
+    VALUES (gen_random_uuid(), 'serialization-benchmark@example.com', 'x')
+    """,
+    """
+    INSERT INTO projects (id, name, owner_id)
+    SELECT gen_random_uuid(), 'serialization-benchmark', id FROM users
+    WHERE email = 'serialization-benchmark@example.com'
+    """,
+    """
+    INSERT INTO experiments (id, name, project_id)
+    SELECT gen_random_uuid(), 'serialization-benchmark', id FROM projects
+    WHERE name = 'serialization-benchmark'
+    """,
+    """
+    INSERT INTO plates (id, name, rows, columns, format, experiment_id)
+    SELECT gen_random_uuid(), 'serialization-benchmark', 32, 48, 1536, id FROM experiments
+    WHERE name = 'serialization-benchmark'
+    """,
+    """
+    INSERT INTO compounds (id, identifier, name)
+    SELECT gen_random_uuid(), 'SER-BENCH-' || g, 'Compound ' || g FROM generate_series(1, 192) g
+    """,
+    """
+    INSERT INTO wells (id, "row", "column", row_label, column_label, concentration,
+                       plate_id, compound_id)
+    SELECT gen_random_uuid(), r, c, chr(65 + r % 26), (c + 1)::text, c * 0.5, p.id, cpd.id
+    FROM plates p
+    CROSS JOIN generate_series(0, 31) r
+    CROSS JOIN generate_series(0, 47) c
+    JOIN compounds cpd ON cpd.identifier = 'SER-BENCH-' || (1 + (r * 48 + c) % 192)
+    WHERE p.name = 'serialization-benchmark'
+    """,
+]
+
+CLEANUP_SQL = [
+    "DELETE FROM wells USING plates WHERE wells.plate_id = plates.id"
+    " AND plates.name = 'serialization-benchmark'",
+    "DELETE FROM compounds WHERE identifier LIKE 'SER-BENCH-%'",
+    "DELETE FROM plates WHERE name = 'serialization-benchmark'",
+    "DELETE FROM experiments WHERE name = 'serialization-benchmark'",
+    "DELETE FROM projects WHERE name = 'serialization-benchmark'",
+    "DELETE FROM users WHERE email = 'serialization-benchmark@example.com'",
+]
+
+
+async def measure(requests: int, call: Callable[[], Awaitable[int]]) -> float:
+    """Return requests per second over ``requests`` sequential calls, after a warm-up."""
+    for _ in range(5):
+        await call()
+    started = time.perf_counter()
+    for _ in range(requests):
+        status = await call()
+        if status != 200:
+            raise RuntimeError(f"Request failed with status {status}")
+    return requests / (time.perf_counter() - started)
+
+
+async def benchmark(args: argparse.Namespace) -> None:
+    # The app reads its settings at import time
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+
+    from fastapi import Depends, FastAPI
+    from httpx import ASGITransport, AsyncClient
+    from sqlalchemy import select, text
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from app.api.deps import CurrentUser, get_current_user, get_db, get_pagination, include_param
+    from app.api.loaders import WELL_INCLUDES, well_loader_options
+    from app.api.pagination import paginate
+    from app.core.database import engine
+    from app.main import app
+    from app.models import User
+    from app.models.well import Well
+    from app.schemas.pagination import PaginatedResponse, PaginationParams
+    from app.schemas.well import WellRead, WellReadWithRelations
+
+    previous = FastAPI()
+
+    @previous.get("/api/wells", response_model=PaginatedResponse[WellRead | WellReadWithRelations])
+    async def list_wells_previous(
+        _current_user: CurrentUser,
+        plate_id: str | None = None,
+        db: AsyncSession = Depends(get_db),
+        pagination: PaginationParams = Depends(get_pagination),
+        include: frozenset[str] = Depends(include_param(WELL_INCLUDES)),
+    ) -> PaginatedResponse[WellRead | WellReadWithRelations]:
+        base_query = select(Well)
+        if plate_id:
+            base_query = base_query.where(Well.plate_id == plate_id)
+        query = base_query.options(*well_loader_options(include))
+        page = await paginate(db, query, Well, pagination)
+        schema = WellReadWithRelations if include else WellRead
+        return PaginatedResponse.create(
+            items=[schema.model_validate(w) for w in page.items],
+            total=page.total,
+            params=pagination,
+            next_cursor=page.next_cursor,
+        )
+
+    # Both apps authenticate the same way, without a users lookup
+    async def current_user() -> User:
+        return User(is_active=True)
+
+    for target in (previous, app):
+        target.dependency_overrides[get_current_user] = current_user
+
+    async with engine.begin() as conn:
+        for sql in SEED_SQL:
+            await conn.execute(text(sql))
+        plate_id = (
+            await conn.execute(text("SELECT id FROM plates WHERE name = 'serialization-benchmark'"))
+        ).scalar_one()
+
+    try:
+        apps = {"previous": previous, "current": app}
+        print(f"{'query':<28}  {'previous (req/s)':>16}  {'current (req/s)':>15}  speedup")
+        for include in ("", "compound"):
+            url = f"/api/wells?plate_id={plate_id}&page_size={args.page_size}"
+            if include:
+                url += f"&include={include}"
+            results = {}
+            for name, target in apps.items():
+                async with AsyncClient(
+                    transport=ASGITransport(app=target), base_url="http://benchmark"
+                ) as client:
+
+                    async def call(client: AsyncClient = client, url: str = url) -> int:
+                        return (await client.get(url)).status_code
+
+                    results[name] = await measure(args.requests, call)
+            label = f"page_size={args.page_size}" + (f" include={include}" if include else "")
+            print(
+                f"{label:<28}  {results['previous']:>16.0f}  {results['current']:>15.0f}"
+                f"  {results['current'] / results['previous']:.2f}x"
+            )
+    finally:
+        async with engine.begin() as conn:
+            for sql in CLEANUP_SQL:
+                await conn.execute(text(sql))
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True, help="Scratch database URL")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=500)
+    asyncio.run(benchmark(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -20,7 +20,7 @@ from sqlalchemy import select
 
 from app.core.config import settings
 from app.core.database import async_session_maker
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
 from app.models.user import User
 
 
@@ -34,7 +34,7 @@ async def seed_admin_user() -> None:
         if existing_user:
             print(f"Admin user already exists: {settings.admin_email}")
             print("Updating password...")
-            existing_user.hashed_password = get_password_hash(settings.admin_password)
+            existing_user.hashed_password = await get_password_hash_async(settings.admin_password)
             existing_user.is_superuser = True
             existing_user.is_active = True
             await session.commit()
@@ -43,7 +43,7 @@ async def seed_admin_user() -> None:
             # Create new admin user
             admin_user = User(
                 email=settings.admin_email,
-                hashed_password=get_password_hash(settings.admin_password),
+                hashed_password=await get_password_hash_async(settings.admin_password),
                 full_name=settings.admin_full_name,
                 is_active=True,
                 is_superuser=True,
@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.routes import auth
+from app.core import security
+from app.core.config import settings
+from app.core.rate_limit import RateLimiter
+from app.core.security import HashingBusyError, get_password_hash
+from app.models import User
+
+
+@pytest.fixture(autouse=True)
+def fresh_limits(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(auth, "login_limiter", RateLimiter(attempts=3, window=60))
+    monkeypatch.setattr(security.hashing_stats, "max_queue", 2)
+
+
+async def test_login_hashes_off_the_event_loop(
+    db_client: AsyncClient, db_session_maker: async_sessionmaker[AsyncSession]
+) -> None:
+    async with db_session_maker() as session:
+        session.add(User(email="login@example.com", hashed_password=get_password_hash("secret")))
+        await session.commit()
+    completed = security.hashing_stats.completed
+
+    response = await db_client.post(
+        "/api/auth/login", json={"email": "login@example.com", "password": "secret"}
+    )
+    assert response.status_code == 200
+    assert response.json()["access_token"]
+
+    response = await db_client.post(
+        "/api/auth/login/form", data={"username": "login@example.com", "password": "wrong"}
+    )
+    assert response.status_code == 401
+
+    stats = (await db_client.get("/api/health/hashing")).json()
+    assert stats["completed"] == completed + 2
+    assert stats["pending"] == 0
+
+
+async def test_login_attempts_are_rate_limited(db_client: AsyncClient) -> None:
+    body = {"email": "nobody@example.com", "password": "x"}
+    for _ in range(3):
+        assert (await db_client.post("/api/auth/login", json=body)).status_code == 401
+
+    response = await db_client.post("/api/auth/login", json=body)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+async def test_login_limit_per_address_behind_a_proxy(
+    db_client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def attempt(number: int, forwarded_for: str) -> int:
+        body = {"email": f"user{number}@example.com", "password": "x"}
+        headers = {"X-Forwarded-For": forwarded_for}
+        return (await db_client.post("/api/auth/login", json=body, headers=headers)).status_code
+
+    # Clients behind the trusted proxy each get their own limit
+    monkeypatch.setattr(settings, "trusted_proxies", ["127.0.0.0/8"])
+    assert [await attempt(n, f"10.0.0.{n}, 127.0.0.2") for n in range(4)] == [401] * 4
+    # A forwarded address from an untrusted peer is ignored
+    monkeypatch.setattr(settings, "trusted_proxies", [])
+    assert [await attempt(n, f"10.1.0.{n}") for n in range(4)] == [401, 401, 401, 429]
+
+
+async def test_hashing_queue_is_bounded() -> None:
+    hashed = get_password_hash("secret")
+    rejected = security.hashing_stats.rejected
+    results = await asyncio.gather(
+        *(security.verify_password_async("secret", hashed) for _ in range(6)),
+        return_exceptions=True,
+    )
+
+    # Two running plus two queued
+    assert security.hashing_stats.workers == 2
+    assert results.count(True) == 4
+    assert sum(isinstance(result, HashingBusyError) for result in results) == 2
+    assert security.hashing_stats.rejected == rejected + 2
@@ -0,0 +1,159 @@
+import io
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.storage import MemoryStorage, get_storage
+from app.main import app
+from app.services.cells import CellDataError, normalize_cells
+from tests.conftest import seed_plate
+
+CELLS = (
+    "well,object,area,intensity\n"
+    "B2,1,120,0.5\n"
+    "A1,2,100,0.25\n"
+    "A1,3,200,\n"
+    "B2,4,80,0.75\n"
+    "A1,5,300,1.0\n"
+)
+
+
+@pytest.fixture
+async def storage(
+    db_client: AsyncClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> AsyncGenerator[MemoryStorage, None]:
+    storage = MemoryStorage()
+    app.dependency_overrides[get_storage] = lambda: storage
+    monkeypatch.setattr(settings, "cell_cache_path", str(tmp_path))
+    # Several row groups, so well filters can skip some
+    monkeypatch.setattr(settings, "cell_row_group_size", 2)
+    yield storage
+    app.dependency_overrides.pop(get_storage)
+
+
+def test_normalize_cells() -> None:
+    table = pa.table(
+        {
+            "well": ["B2", "A1", "A3"],
+            "label": ["x", "y", "z"],
+            "area": pa.array([1.5, 2.5, 3.5], pa.float64()),
+            "count": [3, 1, 2],
+        }
+    )
+
+    cells = normalize_cells(table, rows=2, columns=3)
+
+    assert cells.column_names == ["row", "column", "area", "count"]
+    assert cells.schema.field("area").type == pa.float32()
+    assert cells["row"].to_pylist() == [0, 0, 1]
+    assert cells["column"].to_pylist() == [0, 2, 1]
+    assert cells["area"].to_pylist() == [2.5, 3.5, 1.5]
+
+    with pytest.raises(CellDataError, match="outside the 2x2 plate"):
+        normalize_cells(table, rows=2, columns=2)
+    with pytest.raises(CellDataError, match="needs 'row' and 'column'"):
+        normalize_cells(table.drop_columns(["well"]), rows=2, columns=3)
+
+
+async def test_cell_dataset_aggregates(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+    storage: MemoryStorage,
+) -> None:
+    ids = await seed_plate(db_session_maker)
+    url = f"/api/plates/{ids['plate']}/cells"
+
+    response = await db_client.post(
+        url, params={"name": "nuclei"}, content=CELLS, headers={"Content-Type": "text/csv"}
+    )
+
+    assert response.status_code == 201
+    dataset = response.json()
+    assert dataset["cell_count"] == 5
+    assert dataset["features"] == ["object", "area", "intensity"]
+    stored = pq.ParquetFile(io.BytesIO(await storage.get(next(iter(storage.objects)))))
+    assert stored.metadata.num_row_groups == 3
+
+    response = await db_client.get(
+        f"/api/cells/{dataset['id']}/histogram",
+        params={"feature": "area", "bins": 2, "low": 100, "high": 300},
+    )
+    assert response.status_code == 200
+    histogram = response.json()
+    assert histogram["edges"] == [100.0, 200.0, 300.0]
+    assert (histogram["row"], histogram["column"]) == ([0, 1], [0, 1])
+    # The last bin includes its upper edge, values below the first edge are not counted
+    assert histogram["counts"] == [[1, 2], [1, 0]]
+
+    response = await db_client.get(
+        f"/api/cells/{dataset['id']}/summary", params={"feature": "intensity", "wells": "A1"}
+    )
+    summary = response.json()
+    assert (summary["row"], summary["column"], summary["count"]) == ([0], [0], [2])
+    assert summary["mean"] == [0.625]
+    assert summary["std"] == [pytest.approx(0.53033, abs=1e-5)]
+    assert (summary["min"], summary["max"]) == ([0.25], [1.0])
+
+    response = await db_client.get(
+        f"/api/cells/{dataset['id']}/cells",
+        params={"wells": "B2", "columns": "object,area", "format": "arrow"},
+    )
+    cells = pa.ipc.open_stream(response.content).read_all()
+    assert cells.column_names == ["row", "column", "object", "area"]
+    assert sorted(cells["object"].to_pylist()) == [1, 4]
+
+    response = await db_client.get(
+        f"/api/cells/{dataset['id']}/summary", params={"feature": "missing"}
+    )
+    assert response.status_code == 400
+
+    # Uploading the same name again replaces the dataset and its file
+    response = await db_client.post(
+        url,
+        params={"name": "nuclei", "format": "csv"},
+        content="row,column,area\n3,5,10\n",
+    )
+    assert response.json()["id"] == dataset["id"]
+    assert len(storage.objects) == 1
+    response = await db_client.get(url)
+    assert [d["cell_count"] for d in response.json()] == [1]
+
+    response = await db_client.post(
+        url, params={"name": "nuclei", "format": "csv"}, content="well,area\nZ99,1\n"
+    )
+    assert response.status_code == 400
+
+    response = await db_client.delete(f"/api/cells/{dataset['id']}")
+    assert response.status_code == 204
+    assert storage.objects == {}
+
+
+async def test_failed_replace_keeps_the_old_file(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+    storage: MemoryStorage,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    ids = await seed_plate(db_session_maker)
+    url = f"/api/plates/{ids['plate']}/cells"
+    params = {"name": "nuclei", "format": "csv"}
+    await db_client.post(url, params=params, content=CELLS)
+    [old_key] = storage.objects
+
+    async def fail(session: AsyncSession) -> None:
+        raise RuntimeError("commit failed")
+
+    with monkeypatch.context() as failing, pytest.raises(RuntimeError):
+        failing.setattr(AsyncSession, "commit", fail)
+        await db_client.post(url, params=params, content="row,column,area\n3,5,10\n")
+
+    # The old dataset is still committed, so its file must be too
+    response = await db_client.get(url)
+    assert [d["cell_count"] for d in response.json()] == [5]
+    assert old_key in storage.objects
@@ -0,0 +1,97 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+from httpx import AsyncClient
+from PIL import Image as PILImage
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.storage import MemoryStorage, get_storage
+from app.main import app
+from app.services import composites
+from app.services.composites import composite_cache, parse_channels
+from app.services.imaging import CompositeChannel, render_composite
+from tests.conftest import seed_plate
+
+DAPI = np.full((64, 128), 1000, dtype=np.uint16)
+GFP = np.zeros((64, 128), dtype=np.uint16)
+GFP[:, 64:] = 4000
+
+
+def tiff(pixels: npt.NDArray[np.uint16]) -> bytes:
+    buffer = io.BytesIO()
+    PILImage.fromarray(pixels).save(buffer, format="TIFF")
+    return buffer.getvalue()
+
+
+def pixels(content: bytes) -> npt.NDArray[np.uint8]:
+    with PILImage.open(io.BytesIO(content)) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def test_render_composite_blends_windows() -> None:
+    content = render_composite(
+        [
+            CompositeChannel(tiff(DAPI), (0, 0, 255), (0, 2000)),
+            CompositeChannel(tiff(GFP), (0, 255, 0), (0, 4000)),
+        ],
+        size=32,
+        format="png",
+    )
+    rgb = pixels(content)
+    assert rgb.shape == (16, 32, 3)
+    assert rgb[0, 0].tolist() == [0, 0, 127]
+    assert rgb[0, -1].tolist() == [0, 255, 127]
+
+
+def test_parse_channels() -> None:
+    first, second = parse_channels("DAPI:blue:100-3000, GFP:#00ff80")
+    assert (first.name, first.color, first.window) == ("DAPI", (0, 0, 255), (100.0, 3000.0))
+    assert (second.name, second.color, second.window) == ("GFP", (0, 255, 128), None)
+    for invalid in ("DAPI:purple", "DAPI:blue:3000-100", "DAPI:blue:low-high"):
+        with pytest.raises(ValueError):
+            parse_channels(invalid)
+
+
+async def test_well_composite(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    storage = MemoryStorage()
+    await storage.put("a", tiff(DAPI))
+    await storage.put("b", tiff(GFP))
+    app.dependency_overrides[get_storage] = lambda: storage
+    executor = ThreadPoolExecutor(1)
+    monkeypatch.setattr(composites, "get_thumbnail_pool", lambda: executor)
+    composite_cache.clear()
+    ids = await seed_plate(db_session_maker)
+    url = f"/api/wells/{ids['well']}/composite"
+    params = {"channels": "DAPI:blue:0-2000,GFP:green:0-4000", "size": "32"}
+
+    response = await db_client.get(url, params=params)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert pixels(response.content)[0, -1].tolist() == [0, 255, 127]
+    assert len(composite_cache) == 1
+
+    # Repeat views are revalidated without rendering or sending the image again
+    response = await db_client.get(
+        url, params=params, headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert response.status_code == 304
+
+    # Every channel of the field by default, in default colours
+    response = await db_client.get(url, params={"format": "webp", "size": "64"})
+    assert response.headers["content-type"] == "image/webp"
+    assert pixels(response.content).shape == (32, 64, 3)
+    assert len(composite_cache) == 2
+
+    response = await db_client.get(url, params={"channels": "Cy5"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "No 'Cy5' image in field 0; the channels are DAPI, GFP"
+    assert (await db_client.get(url, params={"channels": "DAPI:purple"})).status_code == 400
+    assert (await db_client.get(url, params={"field": "2"})).status_code == 404
+    executor.shutdown()
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from app.models import Well
+from app.services.dose_response import fit_logistic4, logistic4, pack_curves
+from tests.conftest import seed_plate
+
+
+def test_batched_fit_recovers_parameters() -> None:
+    x = np.tile(np.linspace(-9.0, -4.0, 8), (3, 1))
+    true = np.array(
+        [
+            [0.0, 100.0, -6.5, 1.0],
+            [5.0, 90.0, -7.0, -2.0],
+            [10.0, 50.0, -5.5, 0.8],
+        ]
+    )
+    y = logistic4(true, x)
+    mask = np.ones_like(x, dtype=np.bool_)
+    mask[2, 0] = False
+
+    fits = fit_logistic4(x, y, mask)
+
+    assert fits.converged.all()
+    assert fits.log_ec50 == pytest.approx(true[:, 2], abs=1e-4)
+    assert fits.hill_slope == pytest.approx(true[:, 3], abs=1e-3)
+    assert fits.bottom == pytest.approx(true[:, 0], abs=1e-3)
+    assert fits.top == pytest.approx(true[:, 1], abs=1e-3)
+    assert fits.r_squared == pytest.approx(1.0)
+    assert fits.n_points.tolist() == [8, 8, 7]
+
+
+def test_too_few_points_are_not_fitted() -> None:
+    groups = np.array([0, 0, 0, 1, 1, 1, 1])
+    x, y, mask = pack_curves(groups, np.arange(7.0), np.arange(7.0), n_groups=2)
+
+    fits = fit_logistic4(x, y, mask)
+
+    assert fits.n_points.tolist() == [3, 4]
+    assert np.isnan(fits.log_ec50[0]) and not fits.converged[0]
+    assert np.isfinite(fits.log_ec50[1])
+
+
+async def test_experiment_curves_are_stored(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+) -> None:
+    ids = await seed_plate(db_session_maker)
+    async with db_session_maker() as session:
+        wells = (
+            await session.scalars(
+                select(Well)
+                .where(Well.plate_id == ids["plate"])
+                .options(selectinload(Well.analyses))
+            )
+        ).all()
+        for well in wells:
+            # Columns 1-5 hold 1 nM .. 10 uM; column 0 has no concentration
+            well.concentration = 10.0 ** (well.column - 10) if well.column else None
+            for analysis in well.analyses:
+                analysis.mean_intensity = 100.0 / (1.0 + 10.0 ** (well.column - 3.0))
+        await session.commit()
+
+    response = await db_client.post(
+        f"/api/experiments/{ids['experiment']}/dose-response",
+        json={"analysis_type": "viability"},
+    )
+    assert response.status_code == 200
+    [fit] = response.json()
+    assert fit["n_points"] == 20
+    assert fit["hill_slope"] < 0
+    assert fit["ec50"] == pytest.approx(1e-7, rel=1e-3)
+
+    response = await db_client.get(
+        f"/api/experiments/{ids['experiment']}/dose-response",
+        params={"analysis_type": "viability"},
+    )
+    assert response.status_code == 200
+    [curve] = response.json()["items"]
+    assert curve["ec50"] == pytest.approx(fit["ec50"])
+    assert curve["experiment_id"] == str(ids["experiment"])
+
+    # Refitting replaces the stored curve instead of adding another
+    await db_client.post(
+        f"/api/experiments/{ids['experiment']}/dose-response",
+        json={"analysis_type": "viability"},
+    )
+    response = await db_client.get(f"/api/experiments/{ids['experiment']}/dose-response")
+    assert len(response.json()["items"]) == 1
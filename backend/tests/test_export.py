@@ -0,0 +1,71 @@
+import csv
+import io
+from uuid import uuid4
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.models import Well
+from app.services.export import EXPORT_SCHEMA
+from tests.conftest import seed_plate
+
+
+async def test_export_parquet_in_batches(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    ids = await seed_plate(db_session_maker)
+    async with db_session_maker() as session:
+        # A well without analyses is exported once, with empty metrics
+        session.add(Well(row=0, column=6, row_label="A", column_label="7", plate_id=ids["plate"]))
+        await session.commit()
+    monkeypatch.setattr(settings, "export_batch_size", 10)
+
+    response = await db_client.get(f"/api/experiments/{ids['experiment']}/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.parquet"
+    parquet = pq.ParquetFile(io.BytesIO(response.content))
+    assert parquet.schema_arrow == EXPORT_SCHEMA
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert table.num_rows == 25
+    rows = table.to_pylist()
+    first = rows[0]
+    assert first["position"] == "A1"
+    assert first["plate_id"] == str(ids["plate"])
+    assert first["compound_identifier"] == "CPD-0001"
+    assert first["analysis_type"] == "viability"
+    assert first["mean_intensity"] == 1.0
+    empty = [row for row in rows if row["position"] == "A7"]
+    assert len(empty) == 1
+    assert empty[0]["analysis_type"] is None
+
+
+async def test_export_arrow_and_csv(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+) -> None:
+    ids = await seed_plate(db_session_maker)
+    url = f"/api/experiments/{ids['experiment']}/export"
+
+    response = await db_client.get(url, params={"format": "arrow"})
+    assert response.status_code == 200
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.schema == EXPORT_SCHEMA
+    assert table.num_rows == 24
+
+    response = await db_client.get(url, params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 24
+    assert rows[0]["well_type"] == "sample"
+
+    response = await db_client.get(f"/api/experiments/{uuid4()}/export")
+    assert response.status_code == 404
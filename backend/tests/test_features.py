@@ -0,0 +1,115 @@
+import asyncio
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models import Feature, Plate, PlateFeature
+from app.services.features import (
+    FEATURE_DTYPE,
+    pack_features,
+    parse_feature_record,
+    unpack_feature,
+    upload_plate_features,
+)
+from app.services.plate_import import PlateImportError
+from tests.conftest import seed_plate
+
+
+def test_pack_features() -> None:
+    plate = Plate(rows=2, columns=3)
+    records = [
+        parse_feature_record({"well": "A2", "area": "10.5", "intensity": ""}, line=2),
+        parse_feature_record({"row": "1", "column": "2", "intensity": "nan"}, line=3),
+    ]
+
+    packed, given = pack_features(plate, records, ["area", "intensity"])
+
+    assert packed.dtype == FEATURE_DTYPE
+    assert packed[0].tolist() == pytest.approx(
+        [np.nan, 10.5, np.nan, np.nan, np.nan, np.nan], nan_ok=True
+    )
+    # A NaN measurement is stored, an empty field is not
+    assert given.tolist() == [
+        [False, True, False, False, False, False],
+        [False, False, False, False, False, True],
+    ]
+    assert np.array_equal(unpack_feature(packed[0].tobytes()), packed[0], equal_nan=True)
+
+
+def test_parse_feature_record_errors() -> None:
+    with pytest.raises(PlateImportError, match="Line 4: invalid record"):
+        parse_feature_record({"well": "B1", "area": "large"}, line=4)
+
+
+async def test_experiment_feature_values(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+) -> None:
+    ids = await seed_plate(db_session_maker)
+    values = np.full(24, np.nan, dtype=FEATURE_DTYPE)
+    values[:3] = [1.0, 2.5, 4.0]
+    async with db_session_maker() as session:
+        feature = Feature(name="Intensity_MeanIntensity_DNA")
+        session.add_all([feature, Feature(name="AreaShape_Area")])
+        await session.flush()
+        session.add(
+            PlateFeature(plate_id=ids["plate"], feature_id=feature.id, data=values.tobytes())
+        )
+        await session.commit()
+
+    response = await db_client.get(
+        f"/api/experiments/{ids['experiment']}/features/Intensity_MeanIntensity_DNA"
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["feature"]["name"] == "Intensity_MeanIntensity_DNA"
+    [plate] = body["plates"]
+    assert plate["plate_id"] == str(ids["plate"])
+    assert (plate["rows"], plate["columns"]) == (4, 6)
+    assert plate["values"][:4] == [1.0, 2.5, 4.0, None]
+
+    response = await db_client.get(f"/api/experiments/{ids['experiment']}/features/AreaShape_Area")
+    assert response.json()["plates"] == []
+    response = await db_client.get(f"/api/experiments/{ids['experiment']}/features/missing")
+    assert response.status_code == 404
+    response = await db_client.get(f"/api/experiments/{uuid4()}/features/AreaShape_Area")
+    assert response.status_code == 404
+
+    response = await db_client.get("/api/features", params={"search": "intensity"})
+    assert [f["name"] for f in response.json()] == ["Intensity_MeanIntensity_DNA"]
+
+
+async def test_concurrent_uploads_of_a_new_feature_are_merged(
+    pg_session_maker: async_sessionmaker[AsyncSession],
+) -> None:
+    ids = await seed_plate(pg_session_maker)
+    async with pg_session_maker() as session:
+        # Known already, so creating it does not serialize the uploads
+        session.add(Feature(name="area"))
+        await session.commit()
+
+    async def upload(session: AsyncSession, well: str, value: str) -> None:
+        plate = await session.get(Plate, ids["plate"])
+        assert plate is not None
+        record = parse_feature_record({"well": well, "area": value}, line=2)
+        await upload_plate_features(session, plate, [record])
+
+    async with pg_session_maker() as first, pg_session_maker() as second:
+        await upload(first, "A1", "1.0")
+        # The second upload waits for the first to commit, then merges into its row
+        waiting = asyncio.create_task(upload(second, "B1", "2.0"))
+        await asyncio.sleep(0.2)
+        assert not waiting.done()
+        await first.commit()
+        await waiting
+        await second.commit()
+
+    async with pg_session_maker() as session:
+        [data] = (await session.scalars(select(PlateFeature.data))).all()
+    values = unpack_feature(data)
+    assert (values[0], values[6]) == (1.0, 2.0)
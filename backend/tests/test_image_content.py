@@ -0,0 +1,195 @@
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.responses import RangeNotSatisfiableError, parse_range
+from app.core.storage import LocalStorage, MemoryStorage, get_storage
+from app.main import app
+from app.models import Image
+from app.services.thumbnails import thumbnail_key, tile_key
+from tests.conftest import seed_plate
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture
+async def storage(db_client: AsyncClient) -> AsyncGenerator[MemoryStorage, None]:
+    storage = MemoryStorage()
+    await storage.put("a", CONTENT)
+    app.dependency_overrides[get_storage] = lambda: storage
+    yield storage
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("bytes=0-99", (0, 100)),
+        ("bytes=100-", (100, 1000)),
+        ("bytes=-10", (990, 1000)),
+        ("bytes=900-5000", (900, 1000)),
+        ("bytes=0-1,5-6", None),
+        ("items=0-1", None),
+        ("bytes=abc", None),
+    ],
+)
+def test_parse_range(header: str, expected: tuple[int, int] | None) -> None:
+    assert parse_range(header, 1000) == expected
+
+
+def test_parse_range_beyond_end() -> None:
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_range("bytes=1000-", 1000)
+
+
+async def test_content_full_range_and_conditional(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+    storage: MemoryStorage,
+) -> None:
+    ids = await seed_plate(db_session_maker)
+    async with db_session_maker() as session:
+        image_id = await session.scalar(
+            Image.__table__.select().with_only_columns(Image.id).where(Image.s3_key == "a")
+        )
+    url = f"/api/images/{image_id}/content"
+
+    response = await db_client.get(url)
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["content-type"] == "image/tiff"
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["cache-control"] == "private, no-cache"
+    etag = response.headers["etag"]
+
+    response = await db_client.get(url, headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[10:20]
+    assert response.headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+
+    response = await db_client.get(url, headers={"Range": f"bytes={len(CONTENT)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+    response = await db_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # A stale If-Range validator gets the full object instead of a partial one
+    response = await db_client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    assert len(response.content) == len(CONTENT)
+
+    # Objects missing from storage are reported as not found
+    response = await db_client.get(f"/api/images/{ids['well']}/content")
+    assert response.status_code == 404
+
+
+async def test_thumbnail_requires_generation(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+    storage: MemoryStorage,
+) -> None:
+    await seed_plate(db_session_maker)
+    async with db_session_maker() as session:
+        image_id = await session.scalar(
+            Image.__table__.select().with_only_columns(Image.id).where(Image.s3_key == "a")
+        )
+    url = f"/api/images/{image_id}/thumbnail"
+
+    assert (await db_client.get(url)).status_code == 404
+    assert (await db_client.get(url, params={"size": 100})).status_code == 400
+
+    async with db_session_maker() as session:
+        await session.execute(
+            update(Image)
+            .where(Image.id == image_id)
+            .values(thumbnail_s3_key=thumbnail_key(image_id, 256))
+        )
+        await session.commit()
+    await storage.put(thumbnail_key(image_id, 64), b"png")
+
+    response = await db_client.get(url, params={"size": 64, "redirect": True})
+    assert response.status_code == 200
+    assert response.content == b"png"
+    assert response.headers["content-type"] == "image/png"
+
+    # Regenerated in place: the old ETag no longer matches, so clients get the new bytes
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "private, no-cache"
+    await storage.put(thumbnail_key(image_id, 64), b"new png")
+    response = await db_client.get(url, params={"size": 64}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.content == b"new png"
+
+
+async def test_tiles_require_generation(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+    storage: MemoryStorage,
+) -> None:
+    await seed_plate(db_session_maker)
+    async with db_session_maker() as session:
+        image_id = await session.scalar(
+            Image.__table__.select().with_only_columns(Image.id).where(Image.s3_key == "a")
+        )
+    url = f"/api/images/{image_id}/tiles"
+
+    assert (await db_client.get(url)).status_code == 404
+    assert (await db_client.get(f"{url}/0/0/0")).status_code == 404
+
+    async with db_session_maker() as session:
+        await session.execute(
+            update(Image).where(Image.id == image_id).values(width=600, height=300, tile_levels=11)
+        )
+        await session.commit()
+    await storage.put(tile_key(image_id, 10, 2, 1), b"png")
+
+    response = await db_client.get(url)
+    assert response.json()["levels"] == 11
+    assert response.json()["tile_size"] == 256
+    response = await db_client.get(f"{url}/10/2/1")
+    assert response.status_code == 200
+    assert response.content == b"png"
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["cache-control"] == "private, no-cache"
+    # Tiles regenerated in place are revalidated, not served stale
+    etag = response.headers["etag"]
+    assert (
+        await db_client.get(f"{url}/10/2/1", headers={"If-None-Match": etag})
+    ).status_code == 304
+    await storage.put(tile_key(image_id, 10, 2, 1), b"new png")
+    response = await db_client.get(f"{url}/10/2/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.content == b"new png"
+    # Outside the 3x2 grid of the last level, or not yet written
+    assert (await db_client.get(f"{url}/10/3/0")).status_code == 404
+    assert (await db_client.get(f"{url}/11/0/0")).status_code == 404
+    assert (await db_client.get(f"{url}/10/0/0")).status_code == 404
+
+
+async def test_local_storage_is_served_as_file(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+    tmp_path: Path,
+) -> None:
+    await seed_plate(db_session_maker)
+    storage = LocalStorage(tmp_path)
+    await storage.put("a", CONTENT)
+    app.dependency_overrides[get_storage] = lambda: storage
+    async with db_session_maker() as session:
+        image_id = await session.scalar(
+            Image.__table__.select().with_only_columns(Image.id).where(Image.s3_key == "a")
+        )
+    url = f"/api/images/{image_id}/content"
+
+    response = await db_client.get(url, headers={"Range": "bytes=-5"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[-5:]
+    etag = response.headers["etag"]
+    assert etag == f'"{(await storage.head("a")).etag}"'
+
+    response = await db_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
@@ -0,0 +1,190 @@
+import asyncio
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+import orjson
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.database import Base
+from app.main import app, lifespan
+from app.models import Job
+from app.services.job_events import experiment_topic, job_events, job_topic
+from app.services.jobs import JobRun, claim_job, enqueue_job, retry_delay, run_job
+from tests.conftest import seed_plate
+
+
+async def succeed(job: JobRun) -> dict[str, Any]:
+    await job.report(0.5, "halfway")
+    return {"plate_id": job.payload["plate_id"]}
+
+
+async def fail(job: JobRun) -> None:
+    raise RuntimeError(f"attempt {job.attempt}")
+
+
+HANDLERS = {"thumbnails": succeed, "tiles": fail}
+
+
+def test_retry_delay_backs_off() -> None:
+    assert [retry_delay(attempt) for attempt in (1, 2, 3)] == [10.0, 20.0, 40.0]
+    assert retry_delay(20) == 3600.0
+
+
+async def test_jobs_run_by_priority_and_retry(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+) -> None:
+    ids = await seed_plate(db_session_maker)
+
+    response = await db_client.post(f"/api/plates/{ids['plate']}/thumbnails")
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    async with db_session_maker() as session:
+        urgent = await enqueue_job(session, "tiles", {"plate_id": "x"}, priority=5, max_attempts=2)
+        await session.commit()
+
+    response = await db_client.get(f"/api/jobs/{job_id}")
+    assert response.json()["status"] == "queued"
+    assert response.json()["payload"] == {"plate_id": str(ids["plate"]), "overwrite": False}
+
+    # The higher priority job is claimed first and fails into a retry
+    job = await claim_job(db_session_maker, "worker-1")
+    assert job is not None and job.id == urgent.id
+    await run_job(db_session_maker, job, HANDLERS)
+    async with db_session_maker() as session:
+        failed = await session.get(Job, urgent.id)
+    assert failed is not None
+    assert (failed.status, failed.attempts, failed.worker) == ("queued", 1, None)
+    assert failed.error == "RuntimeError: attempt 1"
+    assert failed.run_at > failed.started_at
+    async with db_session_maker() as session:
+        # Skip the backoff
+        await session.execute(
+            update(Job).where(Job.id == urgent.id).values(run_at=datetime(2026, 1, 1))
+        )
+        await session.commit()
+
+    job = await claim_job(db_session_maker, "worker-1")
+    assert job is not None and job.id == urgent.id
+    await run_job(db_session_maker, job, HANDLERS)
+
+    job = await claim_job(db_session_maker, "worker-2")
+    assert job is not None and str(job.id) == job_id
+    assert (job.status, job.worker) == ("running", "worker-2")
+    await run_job(db_session_maker, job, HANDLERS)
+    assert await claim_job(db_session_maker, "worker-2") is None
+
+    response = await db_client.get("/api/jobs", params={"status": "failed"})
+    [failed_job] = response.json()["items"]
+    assert (failed_job["id"], failed_job["attempts"]) == (str(urgent.id), 2)
+    assert failed_job["error"] == "RuntimeError: attempt 2"
+    response = await db_client.get(f"/api/jobs/{job_id}")
+    body = response.json()
+    assert (body["status"], body["progress"], body["message"]) == ("succeeded", 1.0, "halfway")
+    assert body["result"] == {"plate_id": str(ids["plate"])}
+
+
+async def test_job_events(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+) -> None:
+    ids = await seed_plate(db_session_maker)
+    subscription = await job_events.subscribe(db_session_maker, experiment_topic(ids["experiment"]))
+
+    response = await db_client.post(f"/api/plates/{ids['plate']}/thumbnails")
+    job_id = response.json()["job_id"]
+    job = await claim_job(db_session_maker, "worker-1")
+    assert job is not None
+    await run_job(db_session_maker, job, HANDLERS)
+
+    events = []
+    while not subscription.queue.empty():
+        message = subscription.queue.get_nowait()
+        assert message is not None
+        events.append(orjson.loads(message[1]))
+    subscription.close()
+    assert [(e["status"], e["progress"], e["message"]) for e in events] == [
+        ("queued", 0.0, None),
+        ("running", 0.0, None),
+        ("running", 0.5, "halfway"),
+        ("succeeded", 1.0, "halfway"),
+    ]
+    assert {(e["id"], e["experiment_id"]) for e in events} == {(job_id, str(ids["experiment"]))}
+    assert events[-1]["result"] == {"plate_id": str(ids["plate"])}
+
+    # The stream of a finished job is its final state
+    response = await db_client.get(f"/api/jobs/{job_id}/events")
+    assert response.headers["content-type"].startswith("text/event-stream")
+    event, data, blank = response.text.split("\n", 2)
+    assert (event, blank) == ("event: job", "\n")
+    assert orjson.loads(data.removeprefix("data: ")) == events[-1]
+    assert (
+        await db_client.get("/api/jobs/00000000-0000-0000-0000-000000000000/events")
+    ).status_code == 404
+
+
+async def test_lost_jobs_stop_their_handler(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # A connection per session: the heartbeat writes while the handler does
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}", poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    monkeypatch.setattr(settings, "job_heartbeat_seconds", 0.01)
+    requeued = asyncio.Event()
+
+    async def requeue_elsewhere(job: JobRun) -> None:
+        # As if the heartbeat had gone stale and another worker claimed the job
+        async with session_maker() as session:
+            await session.execute(
+                update(Job)
+                .where(Job.id == job.id)
+                .values(worker="worker-2", attempts=Job.attempts + 1, message="taken over")
+            )
+            await session.commit()
+        requeued.set()
+
+    async def report_after_requeue(job: JobRun) -> None:
+        await requeue_elsewhere(job)
+        await job.report(0.5, "stale")
+
+    async def run_on_after_requeue(job: JobRun) -> None:
+        await requeue_elsewhere(job)
+        await asyncio.sleep(60)
+
+    for handler in (report_after_requeue, run_on_after_requeue):
+        requeued.clear()
+        async with session_maker() as session:
+            queued = await enqueue_job(session, "thumbnails", {})
+            await session.commit()
+        job = await claim_job(session_maker, "worker-1")
+        assert job is not None and job.id == queued.id
+        # The heartbeat finds the job gone and cancels a handler that never reports
+        await asyncio.wait_for(run_job(session_maker, job, {"thumbnails": handler}), 5)
+        assert requeued.is_set()
+        async with session_maker() as session:
+            lost = await session.get(Job, queued.id)
+        assert lost is not None
+        # Neither the lost run's progress nor its outcome overwrote the new run's
+        assert (lost.status, lost.worker, lost.attempts) == ("running", "worker-2", 2)
+        assert (lost.progress, lost.message, lost.error) == (0.0, "taken over", None)
+    await engine.dispose()
+
+
+async def test_shutdown_ends_event_streams(
+    db_session_maker: async_sessionmaker[AsyncSession], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "create_admin_on_startup", False)
+    subscription = await job_events.subscribe(db_session_maker, job_topic(uuid4()))
+    async with lifespan(app):
+        pass
+    assert await subscription.get(1) is None
+    subscription.close()
@@ -0,0 +1,59 @@
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from tests.conftest import seed_plate
+
+
+async def test_cursor_walks_every_item_once(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+) -> None:
+    ids = await seed_plate(db_session_maker)
+
+    seen: list[str] = []
+    params: dict[str, str | int] = {"plate_id": str(ids["plate"]), "page_size": 5}
+    while True:
+        body = (await db_client.get("/api/wells", params=params)).json()
+        seen.extend(item["id"] for item in body["items"])
+        if body["next_cursor"] is None:
+            break
+        params["cursor"] = body["next_cursor"]
+
+    assert len(seen) == 24
+    assert len(set(seen)) == 24
+
+
+async def test_offset_and_cursor_pages_agree(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+) -> None:
+    await seed_plate(db_session_maker)
+
+    first = (await db_client.get("/api/wells", params={"page_size": 10})).json()
+    by_offset = (await db_client.get("/api/wells", params={"page_size": 10, "page": 2})).json()
+    by_cursor = (
+        await db_client.get("/api/wells", params={"page_size": 10, "cursor": first["next_cursor"]})
+    ).json()
+
+    assert first["total"] == 24
+    assert first["total_pages"] == 3
+    assert [w["id"] for w in by_cursor["items"]] == [w["id"] for w in by_offset["items"]]
+
+
+async def test_total_can_be_skipped(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+) -> None:
+    await seed_plate(db_session_maker)
+
+    body = (await db_client.get("/api/wells", params={"with_total": "false"})).json()
+
+    assert body["total"] is None
+    assert body["total_pages"] is None
+    assert len(body["items"]) == 20
+
+
+async def test_invalid_cursor_is_rejected(db_client: AsyncClient) -> None:
+    response = await db_client.get("/api/wells", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
@@ -0,0 +1,137 @@
+from collections.abc import AsyncIterator
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models import Analysis, Plate, Well, WellAggregate
+from app.services.plate_import import (
+    PlateImportError,
+    import_plate,
+    iter_lines,
+    parse_records,
+    parse_well_position,
+    row_label,
+)
+from tests.conftest import seed_plate
+
+
+async def chunks(data: bytes, size: int = 7) -> AsyncIterator[bytes]:
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+@pytest.mark.parametrize(("row", "label"), [(0, "A"), (25, "Z"), (26, "AA"), (31, "AF")])
+def test_row_labels_round_trip(row: int, label: str) -> None:
+    assert row_label(row) == label
+    assert parse_well_position(f"{label}07") == (row, 6)
+
+
+async def test_parse_csv_records() -> None:
+    data = (
+        b"well,well_type,compound,concentration,viability.mean_intensity,viability.cell_count\r\n"
+        b"A01,negative_control,,,1.5,120\r\n"
+        b"B03,sample,CPD-1,0.1,2.5,\r\n"
+    )
+
+    records = await parse_records(iter_lines(chunks(data)), "csv")
+
+    assert [(r.row, r.column) for r in records] == [(0, 0), (1, 2)]
+    assert records[0].well_type == "negative_control"
+    assert records[0].measurements == {"viability": {"mean_intensity": 1.5, "cell_count": 120}}
+    assert records[1].compound == "CPD-1"
+    assert records[1].concentration == 0.1
+    assert records[1].measurements == {"viability": {"mean_intensity": 2.5}}
+
+
+async def test_parse_csv_quoted_newlines() -> None:
+    data = (
+        b"well,compound,compound_name,viability.mean_intensity\n"
+        b'A01,CPD-1,"Compound one,\nsecond line ""quoted""",1.5\n'
+        b"\n"
+        b'B03,CPD-2,"two",2.5\n'
+        b'B04,CPD-3,"never closed,3.5\n'
+    )
+    lines = iter_lines(chunks(data))
+
+    with pytest.raises(PlateImportError, match="Line 6: unterminated quoted field"):
+        await parse_records(lines, "csv")
+
+    records = await parse_records(iter_lines(chunks(data.rsplit(b"B04", 1)[0])), "csv")
+    assert [(r.row, r.column) for r in records] == [(0, 0), (1, 2)]
+    assert records[0].compound_name == 'Compound one,\nsecond line "quoted"'
+    assert records[1].measurements == {"viability": {"mean_intensity": 2.5}}
+
+
+async def test_parse_jsonl_records() -> None:
+    data = b'{"row": 2, "column": 4, "tox.z_score": -1.2}\n\n{"well": "P24"}\n'
+
+    records = await parse_records(iter_lines(chunks(data)), "jsonl")
+
+    assert [(r.row, r.column) for r in records] == [(2, 4), (15, 23)]
+    assert records[0].measurements == {"tox": {"z_score": -1.2}}
+
+
+async def test_parse_errors_report_line() -> None:
+    data = b"well,viability.brightness\nA01,3\n"
+
+    with pytest.raises(PlateImportError, match="Line 2: Unknown metric 'brightness'"):
+        await parse_records(iter_lines(chunks(data)), "csv")
+
+    with pytest.raises(PlateImportError, match="Line 3: 3 fields for 2 columns"):
+        await parse_records(
+            iter_lines(chunks(b"well,viability.cell_count\nA01,3\nA02,4,5\n")), "csv"
+        )
+
+
+async def test_reimport_replaces_analyses(
+    pg_session_maker: async_sessionmaker[AsyncSession],
+) -> None:
+    ids = await seed_plate(pg_session_maker)
+
+    async def run_import(data: bytes) -> tuple[int, int, int]:
+        records = await parse_records(iter_lines(chunks(data)), "csv")
+        async with pg_session_maker() as session:
+            plate = await session.get(Plate, ids["plate"])
+            assert plate is not None
+            result = await import_plate(session, plate, records)
+            await session.commit()
+        return result.wells, result.compounds_created, result.analyses
+
+    first = b"well,compound,viability.mean_intensity,tox.z_score\nA01,CPD-9,3.0,-1.5\nB02,,2.0,\n"
+    again = b"well,compound,viability.mean_intensity\nA01,CPD-9,5.0\n"
+    assert await run_import(first) == (2, 1, 3)
+    assert await run_import(again) == (1, 0, 1)
+
+    async with pg_session_maker() as session:
+        analyses = (
+            await session.execute(
+                select(
+                    Well.row_label,
+                    Well.column_label,
+                    Analysis.analysis_type,
+                    Analysis.mean_intensity,
+                    Analysis.z_score,
+                )
+                .join(Analysis, Analysis.well_id == Well.id)
+                .where(Well.plate_id == ids["plate"], Well.row_label.in_(["A", "B"]))
+                .where(Well.column_label.in_(["1", "2"]))
+                .order_by(Well.row_label, Well.column_label, Analysis.analysis_type)
+            )
+        ).all()
+        aggregate = await session.scalar(
+            select(WellAggregate).where(
+                WellAggregate.well_id == ids["well"], WellAggregate.analysis_type == "viability"
+            )
+        )
+    # Each import replaces the imported types on the imported wells only: A1's
+    # viability is replaced twice, its tox values and the other wells' are kept
+    assert [tuple(row) for row in analyses] == [
+        ("A", "1", "tox", None, -1.5),
+        ("A", "1", "viability", 5.0, None),
+        ("A", "2", "viability", 1.0, None),
+        ("B", "1", "viability", 1.0, None),
+        ("B", "2", "viability", 2.0, None),
+    ]
+    assert aggregate is not None
+    assert (aggregate.analysis_count, aggregate.mean_intensity) == (1, 5.0)
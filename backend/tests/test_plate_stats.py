@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models import Analysis, Well
+from app.models.well import WellType
+from app.services.plate_stats import compute_plate_statistics
+from tests.conftest import seed_plate
+
+
+def test_control_statistics() -> None:
+    values = np.array([0.0, 2.0, 100.0, 98.0, 50.0, 40.0, 60.0, np.nan])
+    well_types = np.array(
+        [WellType.NEGATIVE_CONTROL] * 2 + [WellType.POSITIVE_CONTROL] * 2 + [WellType.SAMPLE] * 4
+    )
+
+    stats = compute_plate_statistics(values, well_types)
+
+    # Both controls have SD sqrt(2) and the window between their means is 98
+    assert stats.z_prime == pytest.approx(1 - 6 * np.sqrt(2) / 98)
+    assert stats.ssmd == pytest.approx(98 / 2)
+    assert stats.percent_effect[4] == pytest.approx(100 * 49 / 98)
+    assert stats.z_score[4:7] == pytest.approx([0.0, -1.0, 1.0])
+    assert np.isnan(stats.z_score[7])
+    assert stats.sample_count == 3
+
+
+def test_robust_z_score_ignores_outlier() -> None:
+    values = np.array([10.0, 11.0, 9.0, 10.0, 1000.0])
+    well_types = np.array([WellType.SAMPLE] * 5)
+
+    stats = compute_plate_statistics(values, well_types, robust=True)
+
+    assert stats.z_score[0] == pytest.approx(0.0)
+    assert stats.z_score[1] == pytest.approx(1 / 1.4826)
+    assert stats.z_prime is None
+    assert np.isnan(stats.percent_effect).all()
+
+
+async def test_stats_endpoint_writes_back(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+) -> None:
+    ids = await seed_plate(db_session_maker)
+    async with db_session_maker() as session:
+        wells = (await session.scalars(select(Well).where(Well.plate_id == ids["plate"]))).all()
+        for well in wells:
+            if well.column == 0:
+                well.well_type = WellType.NEGATIVE_CONTROL
+            elif well.column == 5:
+                well.well_type = WellType.POSITIVE_CONTROL
+        analyses = (await session.scalars(select(Analysis))).all()
+        for index, analysis in enumerate(analyses):
+            analysis.mean_intensity = float(index)
+        await session.commit()
+
+    response = await db_client.post(
+        f"/api/plates/{ids['plate']}/stats", json={"analysis_type": "viability"}
+    )
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["analyses_updated"] == 24
+    assert body["negative_control_count"] == 4
+    assert body["positive_control_count"] == 4
+    async with db_session_maker() as session:
+        stored = (await session.scalars(select(Analysis.percent_effect))).all()
+    assert all(value is not None for value in stored)
@@ -0,0 +1,84 @@
+"""Guard against relationship loading regressions by counting issued SQL statements."""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from tests.conftest import StatementCounter, seed_plate
+
+
+@pytest.mark.parametrize(
+    ("path", "expected"),
+    [
+        ("/api/projects", 2),
+        ("/api/experiments", 2),
+        ("/api/plates", 2),
+        ("/api/wells", 2),
+        ("/api/images", 2),
+        ("/api/analyses", 2),
+        ("/api/projects/{project}", 1),
+        ("/api/experiments/{experiment}", 1),
+        ("/api/plates/{plate}", 1),
+        ("/api/wells/{well}", 1),
+        ("/api/plates/{plate}/layout?analysis_type=viability", 2),
+        ("/api/projects/{project}?include=experiments", 2),
+        ("/api/experiments/{experiment}?include=plates", 2),
+        ("/api/plates/{plate}?include=wells", 2),
+        ("/api/plates/{plate}?include=wells,analyses", 3),
+        ("/api/wells/{well}?include=compound,images,analyses", 4),
+        ("/api/wells?include=analyses", 3),
+        ("/api/wells?with_total=false", 1),
+    ],
+)
+async def test_statement_count(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+    statement_counter: StatementCounter,
+    path: str,
+    expected: int,
+) -> None:
+    ids = await seed_plate(db_session_maker)
+    statement_counter.reset()
+
+    response = await db_client.get(path.format(**ids))
+
+    assert response.status_code == 200
+    assert statement_counter.count == expected, statement_counter.statements
+
+
+async def test_include_expands_schema(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+) -> None:
+    ids = await seed_plate(db_session_maker)
+
+    plain = (await db_client.get(f"/api/plates/{ids['plate']}")).json()
+    expanded = (await db_client.get(f"/api/plates/{ids['plate']}?include=wells,analyses")).json()
+
+    assert "wells" not in plain
+    assert len(expanded["wells"]) == 24
+    assert len(expanded["wells"][0]["analyses"]) == 1
+    assert expanded["wells"][0]["images"] == []
+
+
+async def test_unknown_include_is_rejected(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+) -> None:
+    ids = await seed_plate(db_session_maker)
+
+    response = await db_client.get(f"/api/plates/{ids['plate']}?include=owner")
+
+    assert response.status_code == 400
+
+
+async def test_delete_project_cascades(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+) -> None:
+    ids = await seed_plate(db_session_maker)
+
+    response = await db_client.delete(f"/api/projects/{ids['project']}")
+
+    assert response.status_code == 204
+    assert (await db_client.get(f"/api/wells/{ids['well']}")).status_code == 404
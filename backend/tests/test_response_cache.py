@@ -0,0 +1,104 @@
+from collections.abc import AsyncGenerator
+
+from fastapi import Request
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.api.deps import READ_METHODS, get_db
+from app.core.database import Base
+from app.core.response_cache import invalidate_committed
+from app.main import app
+from app.models import Analysis
+from tests.conftest import StatementCounter, seed_plate
+
+
+async def test_repeated_plate_reads_are_served_from_the_cache(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+    statement_counter: StatementCounter,
+) -> None:
+    ids = await seed_plate(db_session_maker)
+    url = f"/api/plates/{ids['plate']}?include=wells,analyses"
+
+    first = await db_client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    statement_counter.reset()
+    second = await db_client.get(url)
+    assert statement_counter.count == 0
+    assert second.content == first.content
+    assert second.headers["ETag"] == etag
+
+    not_modified = await db_client.get(url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+
+async def test_writes_invalidate_cached_reads(
+    db_client: AsyncClient, db_session_maker: async_sessionmaker[AsyncSession]
+) -> None:
+    ids = await seed_plate(db_session_maker)
+    plate_url = f"/api/plates/{ids['plate']}"
+    layout_url = f"{plate_url}/layout?analysis_type=viability"
+    old_layout = (await db_client.get(layout_url)).json()
+    old_etag = (await db_client.get(plate_url)).headers["ETag"]
+
+    await db_client.patch(plate_url, json={"name": "Renamed"})
+    response = await db_client.get(plate_url, headers={"If-None-Match": old_etag})
+    assert response.status_code == 200
+    assert response.json()["name"] == "Renamed"
+
+    async with db_session_maker() as session:
+        analysis_id = await session.scalar(
+            select(Analysis.id).where(Analysis.well_id == ids["well"])
+        )
+    await db_client.patch(f"/api/analyses/{analysis_id}", json={"mean_intensity": 5.0})
+    layout = (await db_client.get(layout_url)).json()
+    assert old_layout["values"][0] == 1.0
+    assert layout["values"][0] == 5.0
+
+    await db_client.patch(f"/api/wells/{ids['well']}", json={"concentration": 9.0})
+    wells = (await db_client.get(f"/api/wells?plate_id={ids['plate']}&page_size=1")).json()
+    assert wells["items"][0]["concentration"] == 9.0
+
+
+async def test_missing_plate_is_not_cached(db_client: AsyncClient) -> None:
+    url = "/api/plates/00000000-0000-0000-0000-000000000000"
+    assert (await db_client.get(url)).status_code == 404
+    assert (await db_client.get(url)).status_code == 404
+
+
+async def test_cached_reads_are_built_from_the_primary(
+    db_client: AsyncClient, db_session_maker: async_sessionmaker[AsyncSession]
+) -> None:
+    # An empty read replica: as far behind the primary as a replica can be
+    replica = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with replica.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    replica_session_maker = async_sessionmaker(replica, expire_on_commit=False)
+
+    async def get_db_with_replica(request: Request) -> AsyncGenerator[AsyncSession, None]:
+        session_maker = (
+            replica_session_maker if request.method in READ_METHODS else db_session_maker
+        )
+        async with session_maker() as session:
+            yield session
+            if session_maker is db_session_maker:
+                await session.commit()
+                await invalidate_committed(session)
+
+    app.dependency_overrides[get_db] = get_db_with_replica
+    ids = await seed_plate(db_session_maker)
+    plate_url = f"/api/plates/{ids['plate']}"
+
+    # Uncached reads go to the replica
+    plates = await db_client.get(f"/api/plates?experiment_id={ids['experiment']}")
+    assert plates.json()["items"] == []
+
+    assert (await db_client.get(plate_url)).json()["name"] == "Plate"
+    await db_client.patch(plate_url, json={"name": "Renamed"})
+    assert (await db_client.get(plate_url)).json()["name"] == "Renamed"
+    await replica.dispose()
@@ -0,0 +1,68 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from app.core.storage import LocalStorage, MemoryStorage, ObjectNotFoundError, StorageBackend
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture(params=["local", "memory"])
+def storage(request: pytest.FixtureRequest, tmp_path: Path) -> StorageBackend:
+    if request.param == "local":
+        return LocalStorage(tmp_path)
+    return MemoryStorage()
+
+
+async def test_round_trip(storage: StorageBackend) -> None:
+    await storage.put("plates/1/a.tiff", CONTENT)
+
+    assert await storage.get("plates/1/a.tiff") == CONTENT
+    info = await storage.head("plates/1/a.tiff")
+    assert info.size == len(CONTENT)
+    assert info.content_type == "image/tiff"
+
+
+async def test_stream_range_in_chunks(storage: StorageBackend) -> None:
+    await storage.put("a", CONTENT)
+
+    chunks = [c async for c in storage.stream("a", 5, 5000, chunk_size=1000)]
+
+    assert b"".join(chunks) == CONTENT[5:5000]
+    assert max(map(len, chunks)) == 1000
+    assert b"".join([c async for c in storage.stream("a", len(CONTENT) - 3)]) == CONTENT[-3:]
+
+
+async def test_delete_many_ignores_missing(storage: StorageBackend) -> None:
+    await storage.put("a", b"a")
+    await storage.put("b", b"b")
+
+    await storage.delete_many(["a", "missing"])
+
+    with pytest.raises(ObjectNotFoundError):
+        await storage.head("a")
+    assert await storage.get("b") == b"b"
+
+
+async def test_missing_object(storage: StorageBackend) -> None:
+    with pytest.raises(ObjectNotFoundError):
+        await storage.get("missing")
+    with pytest.raises(ObjectNotFoundError):
+        [c async for c in storage.stream("missing")]
+
+
+async def test_local_concurrent_writes_to_one_key(tmp_path: Path) -> None:
+    storage = LocalStorage(tmp_path)
+    contents = [bytes([i]) * 1_000_000 for i in range(16)]
+
+    await asyncio.gather(*(storage.put("a", content) for content in contents))
+
+    # One whole write wins and no partial files are left behind
+    assert await storage.get("a") in contents
+    assert [path.name for path in tmp_path.iterdir()] == ["a"]
+
+
+def test_local_keys_stay_below_root(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        LocalStorage(tmp_path).path("../outside")
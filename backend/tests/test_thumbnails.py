@@ -0,0 +1,92 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image as PILImage
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.storage import MemoryStorage
+from app.models import Image
+from app.services.imaging import auto_contrast, render_thumbnails, render_tiles, tile_grid
+from app.services.thumbnails import THUMBNAIL_SIZES, generate_plate_thumbnails, thumbnail_key
+from tests.conftest import seed_plate
+
+
+def make_tiff(width: int, height: int) -> bytes:
+    gradient = np.linspace(1000, 3000, width * height, dtype=np.uint16).reshape(height, width)
+    buffer = io.BytesIO()
+    PILImage.fromarray(gradient).save(buffer, format="TIFF")
+    return buffer.getvalue()
+
+
+def test_auto_contrast_is_per_channel() -> None:
+    pixels = np.stack([np.linspace(0, 10, 100), np.linspace(500, 60000, 100)], axis=1)
+    display = auto_contrast(pixels.reshape(10, 10, 2))
+
+    for channel in range(2):
+        assert display[..., channel].min() == 0
+        assert display[..., channel].max() == 255
+
+
+def test_render_thumbnail_pyramid() -> None:
+    rendered = render_thumbnails(make_tiff(1200, 600), THUMBNAIL_SIZES)
+
+    assert (rendered.width, rendered.height) == (1200, 600)
+    sizes = {size: PILImage.open(io.BytesIO(png)).size for size, png in rendered.images.items()}
+    assert sizes == {64: (64, 32), 256: (256, 128), 1024: (1024, 512)}
+    thumbnail = np.asarray(PILImage.open(io.BytesIO(rendered.images[256])))
+    assert thumbnail.dtype == np.uint8
+    assert thumbnail.min() < 5 and thumbnail.max() > 250
+
+
+def test_render_tile_pyramid() -> None:
+    rendered = render_tiles(make_tiff(600, 300), 256)
+
+    # 600 px rounds up to 1024: levels 0 (1x1) to 10 (full size)
+    assert rendered.levels == 11
+    sizes = {tile: PILImage.open(io.BytesIO(png)).size for tile, png in rendered.tiles.items()}
+    assert [tile for tile in sizes if tile[0] == 10] == [
+        (10, 0, 0),
+        (10, 1, 0),
+        (10, 2, 0),
+        (10, 0, 1),
+        (10, 1, 1),
+        (10, 2, 1),
+    ]
+    assert sizes[(10, 2, 1)] == (88, 44)
+    assert sizes[(9, 1, 0)] == (44, 150)
+    assert (sizes[(1, 0, 0)], sizes[(0, 0, 0)]) == ((2, 1), (1, 1))
+    for level in range(rendered.levels):
+        columns, rows = tile_grid(600, 300, level, 256)
+        assert sum(tile[0] == level for tile in sizes) == columns * rows
+
+
+async def test_generate_plate_thumbnails(
+    db_session_maker: async_sessionmaker[AsyncSession],
+) -> None:
+    ids = await seed_plate(db_session_maker)
+    storage = MemoryStorage()
+    # Only the "a" images exist in storage; the "b" images fail without stopping the plate
+    await storage.put("a", make_tiff(80, 40))
+
+    with ThreadPoolExecutor(2) as executor:
+        result = await generate_plate_thumbnails(
+            db_session_maker, storage, ids["plate"], executor=executor
+        )
+
+    assert (result.generated, result.failed) == (24, 24)
+    async with db_session_maker() as session:
+        images = (await session.scalars(select(Image).where(Image.s3_key == "a"))).all()
+    for image in images:
+        assert image.thumbnail_s3_key == thumbnail_key(image.id, 256)
+        assert (image.width, image.height) == (80, 40)
+        # Thumbnails are never upscaled past the source
+        assert PILImage.open(io.BytesIO(storage.objects[image.thumbnail_s3_key])).size == (80, 40)
+        assert thumbnail_key(image.id, 64) in storage.objects
+
+    with ThreadPoolExecutor(2) as executor:
+        again = await generate_plate_thumbnails(
+            db_session_maker, storage, ids["plate"], executor=executor
+        )
+    assert (again.generated, again.failed) == (0, 24)
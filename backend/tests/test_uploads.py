@@ -0,0 +1,121 @@
+import hashlib
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.storage import LocalStorage, MemoryStorage, get_storage
+from app.main import app
+from app.services import uploads
+from app.services.uploads import content_hash
+
+CONTENT = b"0123456789abcdefghij"
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+async def chunks(*parts: bytes) -> AsyncIterator[bytes]:
+    for part in parts:
+        yield part
+
+
+async def test_local_storage_multipart(tmp_path: Path) -> None:
+    storage = LocalStorage(tmp_path)
+    upload_id = await storage.create_multipart("uploads/file")
+
+    second = await storage.put_part("uploads/file", upload_id, 2, chunks(b"de", b"f"))
+
+    async def failing() -> AsyncIterator[bytes]:
+        yield b"xyz"
+        raise ValueError("checksum mismatch")
+
+    with pytest.raises(ValueError):
+        await storage.put_part("uploads/file", upload_id, 2, failing())
+    first = await storage.put_part("uploads/file", upload_id, 1, chunks(b"xyz"))
+    first = await storage.put_part("uploads/file", upload_id, 1, chunks(b"ab", b"c"))
+    await storage.complete_multipart("uploads/file", upload_id, [(1, first), (2, second)])
+
+    assert await storage.get("uploads/file") == b"abcdef"
+    assert not (tmp_path / ".multipart" / upload_id).exists()
+
+
+async def test_resumable_upload(db_client: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    storage = MemoryStorage()
+    app.dependency_overrides[get_storage] = lambda: storage
+    monkeypatch.setattr(uploads, "UPLOAD_PART_SIZE", 8)
+    parts = [CONTENT[:8], CONTENT[8:16], CONTENT[16:]]
+    digest = content_hash(hashlib.sha256(part).digest() for part in parts)
+    body = {"filename": "A01_DAPI.tif", "size": len(CONTENT), "content_hash": digest}
+
+    response = await db_client.post("/api/uploads", json=body)
+    assert response.status_code == 201
+    upload = response.json()
+    assert (upload["part_size"], upload["part_count"]) == (8, 3)
+    url = f"/api/uploads/{upload['id']}"
+
+    response = await db_client.put(
+        f"{url}/parts/3", content=parts[2], headers={"X-Checksum-SHA256": sha256(parts[2])}
+    )
+    assert response.json()["size"] == 4
+    # Corrupted, short and unknown parts are rejected; a corrupted resend keeps the
+    # part already received
+    response = await db_client.put(
+        f"{url}/parts/3", content=b"x" * 4, headers={"X-Checksum-SHA256": sha256(parts[2])}
+    )
+    assert response.status_code == 400
+    response = await db_client.put(
+        f"{url}/parts/1", content=b"x" * 8, headers={"X-Checksum-SHA256": sha256(parts[0])}
+    )
+    assert response.status_code == 400
+    response = await db_client.put(
+        f"{url}/parts/1", content=b"x", headers={"X-Checksum-SHA256": sha256(b"x")}
+    )
+    assert response.status_code == 400
+    response = await db_client.put(
+        f"{url}/parts/4", content=b"x", headers={"X-Checksum-SHA256": sha256(b"x")}
+    )
+    assert response.status_code == 400
+    response = await db_client.put(f"{url}/parts/1", content=parts[0])
+    assert response.status_code == 422
+
+    response = await db_client.post(f"{url}/complete")
+    assert response.status_code == 409
+    assert response.json()["detail"].startswith("2 parts are missing")
+
+    # Starting the same content again resumes the upload
+    response = await db_client.post("/api/uploads", json=body)
+    assert response.status_code == 200
+    assert response.json()["id"] == upload["id"]
+    assert response.json()["parts_received"] == [3]
+
+    for number, part in enumerate(parts[:2], start=1):
+        response = await db_client.put(
+            f"{url}/parts/{number}", content=part, headers={"X-Checksum-SHA256": sha256(part)}
+        )
+        assert response.status_code == 200
+    response = await db_client.post(f"{url}/complete")
+    assert response.status_code == 200
+    assert response.json()["completed_at"] is not None
+    assert await storage.get(upload["storage_key"]) == CONTENT
+    assert storage.multipart == {}
+
+    # Finished content is not sent again
+    response = await db_client.post("/api/uploads", json={**body, "filename": "copy.tif"})
+    assert response.status_code == 200
+    assert response.json()["storage_key"] == upload["storage_key"]
+    assert response.json()["parts_received"] == [1, 2, 3]
+    assert (await db_client.delete(url)).status_code == 409
+
+    response = await db_client.post(
+        "/api/uploads", json={**body, "content_hash": sha256(b"other"), "size": 1}
+    )
+    other = response.json()
+    response = await db_client.post(
+        f"/api/uploads/{other['id']}/complete",
+    )
+    assert response.status_code == 409
+    assert (await db_client.delete(f"/api/uploads/{other['id']}")).status_code == 204
+    assert (await db_client.get(f"/api/uploads/{other['id']}")).status_code == 404
@@ -0,0 +1,121 @@
+from collections.abc import AsyncGenerator
+from datetime import timedelta
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.deps import get_db, user_cache
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.main import app
+from app.models import User
+from tests.conftest import StatementCounter, seed_plate
+
+
+@pytest.fixture
+async def auth_client(
+    db_session_maker: async_sessionmaker[AsyncSession],
+) -> AsyncGenerator[AsyncClient, None]:
+    """API client backed by SQLite that authenticates with real tokens."""
+
+    async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
+        async with db_session_maker() as session:
+            yield session
+            await session.commit()
+
+    user_cache.clear()
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            yield ac
+    finally:
+        app.dependency_overrides.clear()
+        user_cache.clear()
+
+
+def user_queries(counter: StatementCounter) -> int:
+    return sum("FROM users" in statement for statement in counter.statements)
+
+
+def test_ttl_cache_evicts_least_recently_used() -> None:
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+    expired: TTLCache[str, int] = TTLCache(maxsize=2, ttl=-1)
+    expired.set("a", 1)
+    assert expired.get("a") is None
+
+
+async def test_active_user_is_cached_until_changed(
+    auth_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+    statement_counter: StatementCounter,
+) -> None:
+    ids = await seed_plate(db_session_maker)
+    async with db_session_maker() as session:
+        user = User(email="cached@example.com", hashed_password="x")
+        session.add(user)
+        await session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(str(user.id))}"}
+    url = f"/api/wells/{ids['well']}"
+
+    statement_counter.reset()
+    assert (await auth_client.get(url, headers=headers)).status_code == 200
+    assert (await auth_client.get(url, headers=headers)).status_code == 200
+    assert user_queries(statement_counter) == 1
+
+    async with db_session_maker() as session:
+        db_user = await session.get(User, user.id)
+        assert db_user is not None
+        db_user.is_active = False
+        await session.commit()
+
+    assert (await auth_client.get(url, headers=headers)).status_code == 403
+
+    async with db_session_maker() as session:
+        await session.execute(update(User).where(User.id == user.id).values(is_active=True))
+        await session.commit()
+    response = await auth_client.get("/api/auth/me", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == "cached@example.com"
+
+
+async def test_trusted_claims_skip_user_lookup(
+    auth_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+    statement_counter: StatementCounter,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "auth_trust_token_claims", True)
+    ids = await seed_plate(db_session_maker)
+    async with db_session_maker() as session:
+        user = User(email="trusted@example.com", hashed_password="x")
+        session.add(user)
+        await session.commit()
+
+    def token(active: bool) -> dict[str, str]:
+        access_token = create_access_token(
+            str(user.id), timedelta(minutes=5), claims={"active": active, "superuser": False}
+        )
+        return {"Authorization": f"Bearer {access_token}"}
+
+    statement_counter.reset()
+    response = await auth_client.get(f"/api/wells/{ids['well']}", headers=token(True))
+    assert response.status_code == 200
+    assert user_queries(statement_counter) == 0
+
+    response = await auth_client.get(f"/api/wells/{ids['well']}", headers=token(False))
+    assert response.status_code == 403
+
+    response = await auth_client.get("/api/auth/me", headers=token(True))
+    assert response.json()["email"] == "trusted@example.com"
@@ -0,0 +1,103 @@
+import json
+import struct
+from uuid import uuid4
+
+import numpy as np
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from tests.conftest import seed_plate
+
+
+async def test_aggregates_follow_analysis_writes(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+) -> None:
+    ids = await seed_plate(db_session_maker)
+    heatmap_url = f"/api/experiments/{ids['experiment']}/heatmap"
+    layout_url = f"/api/plates/{ids['plate']}/layout"
+
+    response = await db_client.get(heatmap_url, params={"analysis_type": "viability"})
+    assert response.status_code == 200
+    [plate] = response.json()["plates"]
+    assert (plate["rows"], plate["columns"]) == (4, 6)
+    assert plate["values"] == [1.0] * 24
+
+    # A second analysis of the well is averaged in, a new type gets its own aggregate
+    created = await db_client.post(
+        "/api/analyses",
+        json={
+            "name": "Viability",
+            "analysis_type": "viability",
+            "mean_intensity": 3.0,
+            "well_id": str(ids["well"]),
+        },
+    )
+    await db_client.post(
+        "/api/analyses",
+        json={
+            "name": "Nuclei",
+            "analysis_type": "nuclei",
+            "cell_count": 120,
+            "well_id": str(ids["well"]),
+        },
+    )
+    layout = (await db_client.get(layout_url, params={"analysis_type": "viability"})).json()
+    assert layout["values"][:2] == [2.0, 1.0]
+    response = await db_client.get(
+        heatmap_url, params={"analysis_type": "nuclei", "metric": "cell_count"}
+    )
+    assert response.json()["plates"][0]["values"][:2] == [120.0, None]
+
+    analysis_id = created.json()["id"]
+    await db_client.patch(f"/api/analyses/{analysis_id}", json={"mean_intensity": 5.0})
+    layout = (await db_client.get(layout_url, params={"analysis_type": "viability"})).json()
+    assert layout["values"][0] == 3.0
+
+    await db_client.delete(f"/api/analyses/{analysis_id}")
+    layout = (await db_client.get(layout_url, params={"analysis_type": "viability"})).json()
+    assert layout["values"][0] == 1.0
+
+    response = await db_client.get(heatmap_url, params={"analysis_type": "missing"})
+    assert response.json()["plates"][0]["values"] == [None] * 24
+    response = await db_client.get(
+        f"/api/experiments/{uuid4()}/heatmap", params={"analysis_type": "viability"}
+    )
+    assert response.status_code == 404
+
+
+async def test_binary_experiment_heatmap(
+    db_client: AsyncClient,
+    db_session_maker: async_sessionmaker[AsyncSession],
+) -> None:
+    ids = await seed_plate(db_session_maker)
+    # A plate without analyses keeps its place, all NaN
+    await db_client.post(
+        "/api/plates",
+        json={"name": "Empty", "rows": 2, "columns": 3, "experiment_id": str(ids["experiment"])},
+    )
+    response = await db_client.get(
+        f"/api/experiments/{ids['experiment']}/heatmap",
+        params={"analysis_type": "viability", "format": "binary"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    body = response.content
+    (length,) = struct.unpack_from("<I", body)
+    assert length % 4 == 0
+    header = json.loads(body[4 : 4 + length])
+    assert header["dtype"] == "<f4"
+    # Both plates were created within SQLite's one-second timestamp resolution, so
+    # their order is not fixed; each is read at its offset
+    plates = {plate["name"]: plate for plate in header["plates"]}
+    assert [(plates[name]["rows"], plates[name]["columns"]) for name in ("Plate", "Empty")] == [
+        (4, 6),
+        (2, 3),
+    ]
+    values = np.frombuffer(body, dtype="<f4", offset=4 + length)
+    assert len(values) == 30
+    offset = plates["Plate"]["offset"]
+    assert values[offset : offset + 24].tolist() == [1.0] * 24
+    offset = plates["Empty"]["offset"]
+    assert np.isnan(values[offset : offset + 6]).all()